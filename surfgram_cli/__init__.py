@@ -1,6 +1,30 @@
-from surfgram_cli.utils import debugger, ReloadHandler, monitor_changes
-from surfgram_cli.enums import LevelsEnum
-from surfgram_cli.manager import BotManager
-from surfgram_cli.cli import app
+from importlib import import_module
 
-__version__ = "1.2.0" 
\ No newline at end of file
+__version__ = "1.2.0"
+
+# Public names are resolved on first access so that `surfgram-cli --version`
+# and `--help` don't pay for jinja2, watchdog or surfgram.
+_LAZY_ATTRS = {
+    "debugger": "surfgram_cli.utils",
+    "ReloadHandler": "surfgram_cli.utils",
+    "monitor_changes": "surfgram_cli.utils",
+    "LevelsEnum": "surfgram_cli.enums",
+    "BotManager": "surfgram_cli.manager",
+    "app": "surfgram_cli.cli",
+}
+
+# surfgram does `from surfgram_cli import *`; star-imports resolve these
+# through `__getattr__`, so they still export what the eager imports did
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
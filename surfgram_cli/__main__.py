@@ -1,4 +1,11 @@
-from surfgram_cli import app
+import sys
+
+from surfgram_cli.daemon.client import import_typer_without_rich, wants_json
+
+if wants_json(sys.argv):
+    import_typer_without_rich()
+
+from surfgram_cli import app  # noqa: E402
 
 if __name__ == "__main__":
     app()
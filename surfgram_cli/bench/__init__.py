@@ -0,0 +1,242 @@
+import asyncio
+import gc
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from surfgram_cli.config import BenchConfig
+from surfgram_cli.utils.dispatch import (
+    dispatch_update,
+    find_dispatcher,
+    replace_api_client,
+)
+from surfgram_cli.utils.telegram import OfflineBotClient
+
+
+def synthetic_update(
+    update_id: int,
+    kind: str,
+    rng: random.Random,
+    texts: Sequence[str] = BenchConfig.TEXTS,
+    chats: int = BenchConfig.CHATS,
+) -> Dict[str, Any]:
+    """
+    Builds one raw Telegram update shaped like the ones `getUpdates` returns.
+
+    Args:
+        update_id: The update's id.
+        kind: `message`, `callback_query` or `inline_query`.
+        rng: Source of the random choices.
+        texts: Message texts and callback data, picked at random.
+        chats: Number of distinct chats and users.
+    """
+    user_id = rng.randrange(chats) + 1
+    user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+    chat = {"id": user_id, "type": "private", "first_name": user["first_name"]}
+    message = {
+        "message_id": update_id,
+        "from": user,
+        "chat": chat,
+        "date": int(time.time()),
+        "text": rng.choice(texts),
+    }
+    if message["text"].startswith("/"):
+        command = message["text"].split()[0]
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": len(command)}
+        ]
+
+    if kind == "message":
+        payload = message
+    elif kind == "callback_query":
+        payload = {
+            "id": str(update_id),
+            "from": user,
+            "message": dict(message, text="Press me"),
+            "chat_instance": str(user_id),
+            "data": rng.choice(texts),
+        }
+    elif kind == "inline_query":
+        payload = {
+            "id": str(update_id),
+            "from": user,
+            "query": rng.choice(texts),
+            "offset": "",
+        }
+    else:
+        raise ValueError(
+            f"Unknown update kind: {kind}\n"
+            f"Expected: {', '.join(BenchConfig.UPDATE_KINDS)}"
+        )
+    return {"update_id": update_id, kind: payload}
+
+
+def synthetic_updates(
+    count: int,
+    kinds: Sequence[str] = BenchConfig.UPDATE_KINDS,
+    texts: Sequence[str] = BenchConfig.TEXTS,
+    chats: int = BenchConfig.CHATS,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Builds a stream of synthetic updates.
+
+    Args:
+        count: Number of updates.
+        kinds: Update types to mix, cycled in order.
+        texts: Message texts and callback data, picked at random.
+        chats: Number of distinct chats and users.
+        seed: Seed for the random choices, so runs are comparable.
+
+    Returns:
+        The updates, with increasing `update_id`s.
+    """
+    rng = random.Random(seed)
+    return [
+        synthetic_update(
+            update_id, kinds[(update_id - 1) % len(kinds)], rng, texts, chats
+        )
+        for update_id in range(1, count + 1)
+    ]
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = round(fraction * len(sorted_values))
+    index = min(len(sorted_values) - 1, max(0, rank - 1))
+    return sorted_values[index]
+
+
+def check_errors(errors: Dict[str, int], updates: int) -> None:
+    """
+    Fails a measurement in which no update was handled successfully.
+
+    Raises:
+        RuntimeError: If every one of `updates` raised in the handlers.
+    """
+    if not updates or sum(errors.values()) < updates:
+        return
+    summary = ", ".join(f"{name}: {count}" for name, count in errors.items())
+    raise RuntimeError(
+        f"Every update failed in the handlers ({summary})\n"
+        f"Run the bot with --debug to see the tracebacks"
+    )
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the process in MiB, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Benchmark:
+    """
+    Feeds updates straight to a bot's handlers and measures them.
+
+    Updates go through the bot's listener like in the CLI's runners, with no
+    polling in between, and the bot's API client is replaced with an
+    `OfflineBotClient`, so handler calls such as `sendMessage` are answered
+    in-process and never reach Telegram. Handlers run with bounded
+    concurrency; each one is timed from dispatch until it returns.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        updates: List[Dict[str, Any]],
+        concurrency: int = BenchConfig.CONCURRENCY,
+        warmup: int = BenchConfig.WARMUP,
+    ) -> None:
+        """
+        Initializes the Benchmark.
+
+        Args:
+            bot: The surfgram bot instance.
+            updates: Updates to measure.
+            concurrency: Maximum number of handlers running at once.
+            warmup: Updates dispatched before measuring, from the start of
+                `updates`, to fill caches and lazy imports.
+        """
+        self.dispatcher = find_dispatcher(bot)
+        self.api = OfflineBotClient()
+        replace_api_client(bot, self.api)
+        self.updates = updates
+        self.concurrency = max(1, concurrency)
+        self.warmup = warmup
+
+    async def _measure(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        slots = asyncio.Semaphore(self.concurrency)
+        latencies: List[float] = []
+        errors: Dict[str, int] = {}
+
+        async def handle(update: Dict[str, Any]) -> None:
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    await dispatch_update(self.dispatcher, update)
+                except Exception as e:
+                    name = type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(handle(update) for update in updates))
+        return {
+            "seconds": time.perf_counter() - started,
+            "latencies": latencies,
+            "errors": errors,
+        }
+
+    async def _run(self) -> Dict[str, Any]:
+        if self.warmup:
+            warmup_updates = [
+                self.updates[i % len(self.updates)] for i in range(self.warmup)
+            ]
+            await self._measure(warmup_updates)
+
+        gc.collect()
+        self.api.calls.clear()
+        result = await self._measure(self.updates)
+        check_errors(result["errors"], len(self.updates))
+        latencies = sorted(result["latencies"])
+        seconds = result["seconds"]
+        throughput = len(latencies) / seconds if seconds else 0.0
+        return {
+            "updates": len(self.updates),
+            "concurrency": self.concurrency,
+            "seconds": round(seconds, 6),
+            "updates_per_second": round(throughput, 2),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 4)
+                if latencies
+                else 0.0,
+                "p50": round(percentile(latencies, 0.50) * 1000, 4),
+                "p95": round(percentile(latencies, 0.95) * 1000, 4),
+                "p99": round(percentile(latencies, 0.99) * 1000, 4),
+                "max": round(latencies[-1] * 1000, 4) if latencies else 0.0,
+            },
+            "errors": result["errors"],
+            "api_calls": dict(self.api.calls),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Runs the warmup and the measured pass on a new event loop.
+
+        Returns:
+            Throughput, latency percentiles, handler errors by exception type,
+            Bot API calls by method and peak memory.
+
+        Raises:
+            RuntimeError: If every measured update failed in the handlers.
+        """
+        return asyncio.run(self._run())
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from array import array
+from typing import Any, Dict, Optional
+
+from surfgram_cli.bench import check_errors, peak_rss_mb, percentile
+from surfgram_cli.config import BenchConfig
+from surfgram_cli.utils.capture import read_updates
+from surfgram_cli.utils.dispatch import (
+    dispatch_update,
+    find_dispatcher,
+    replace_api_client,
+)
+from surfgram_cli.utils.telegram import OfflineBotClient
+
+
+class Replayer:
+    """
+    Feeds a recorded capture into a bot's handlers.
+
+    Updates are read from the capture as they are dispatched, never all at
+    once. Without a speed they are dispatched as fast as the handlers take
+    them; with a speed the recorded gaps between updates are kept, divided
+    by that factor. As in `Benchmark`, the bot's API calls are answered by an
+    `OfflineBotClient`, so replaying never messages the recorded chats.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        path: str,
+        speed: Optional[float] = None,
+        concurrency: int = BenchConfig.CONCURRENCY,
+        limit: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes the Replayer.
+
+        Args:
+            bot: The surfgram bot instance.
+            path: The capture file.
+            speed: Time scale; 2.0 replays twice as fast as recorded. None
+                replays as fast as possible.
+            concurrency: Maximum number of handlers running at once.
+            limit: Stop after this many updates.
+        """
+        self.dispatcher = find_dispatcher(bot)
+        self.api = OfflineBotClient()
+        replace_api_client(bot, self.api)
+        self.path = path
+        self.speed = speed
+        self.concurrency = max(1, concurrency)
+        self.limit = limit
+
+    async def _run(self) -> Dict[str, Any]:
+        slots = asyncio.Semaphore(self.concurrency)
+        latencies = array("d")
+        errors: Dict[str, int] = {}
+        tasks = set()
+
+        async def handle(update: Dict[str, Any]) -> None:
+            started = time.perf_counter()
+            try:
+                await dispatch_update(self.dispatcher, update)
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+            finally:
+                latencies.append(time.perf_counter() - started)
+                slots.release()
+
+        started = time.perf_counter()
+        first_received = None
+        for count, (received, update) in enumerate(read_updates(self.path)):
+            if self.limit is not None and count >= self.limit:
+                break
+            if self.speed:
+                if first_received is None:
+                    first_received = received
+                due = started + (received - first_received) / 1e9 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await slots.acquire()
+            task = asyncio.ensure_future(handle(update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(set(tasks))
+        seconds = time.perf_counter() - started
+        check_errors(errors, len(latencies))
+
+        ordered = sorted(latencies)
+        return {
+            "updates": len(ordered),
+            "concurrency": self.concurrency,
+            "speed": self.speed,
+            "seconds": round(seconds, 6),
+            "updates_per_second": round(len(ordered) / seconds, 2) if seconds else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / len(ordered) * 1000, 4) if ordered else 0.0,
+                "p50": round(percentile(ordered, 0.50) * 1000, 4),
+                "p95": round(percentile(ordered, 0.95) * 1000, 4),
+                "p99": round(percentile(ordered, 0.99) * 1000, 4),
+                "max": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+            },
+            "errors": errors,
+            "api_calls": dict(self.api.calls),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Replays the capture on a new event loop.
+
+        Returns:
+            The same report as `bench`, plus the replay speed.
+
+        Raises:
+            RuntimeError: If every replayed update failed in the handlers.
+        """
+        return asyncio.run(self._run())
@@ -0,0 +1,321 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from surfgram_cli.config import BenchSuiteConfig, CacheConfig
+
+# Takes a work directory and the repeat count, returns samples in seconds
+Case = Callable[[Path, int], List[float]]
+# name -> (description, case)
+CASES: Dict[str, Tuple[str, Case]] = {}
+
+CONFIG_MODULE = """from surfgram import configs
+
+
+class Config(configs.BaseConfig):
+    __bot_token__ = "123:bench"
+"""
+
+
+def case(name: str, description: str) -> Callable[[Case], Case]:
+    """Registers a benchmark case under `name`."""
+
+    def register(function: Case) -> Case:
+        CASES[name] = (description, function)
+        return function
+
+    return register
+
+
+def _time(function: Callable[[], Any], repeat: int) -> List[float]:
+    """Calls `function` once to warm up, then `repeat` times measured."""
+    function()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@contextmanager
+def _environment(**values: Optional[str]) -> Iterator[None]:
+    """Temporarily sets (or, for None, removes) environment variables."""
+    previous = {name: os.environ.get(name) for name in values}
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def synthetic_package(root: Path, name: str, modules: int) -> Path:
+    """
+    Writes a bot package with one config and `modules` handler modules.
+
+    Args:
+        root: Directory the package is created in.
+        name: Package name.
+        modules: Number of handler modules besides the config.
+
+    Returns:
+        The package directory.
+    """
+    package = root / name
+    (package / "handlers").mkdir(parents=True, exist_ok=True)
+    imports = ["from .config import Config"]
+    for index in range(modules):
+        (package / "handlers" / f"handler_{index}.py").write_text(
+            f"class Handler{index}:\n"
+            f"    command = 'cmd{index}'\n\n"
+            f"    async def callback(self, update):\n"
+            f"        return update\n"
+        )
+        imports.append(f"from .handlers.handler_{index} import Handler{index}")
+    (package / "handlers" / "__init__.py").write_text("")
+    (package / "config.py").write_text(CONFIG_MODULE)
+    (package / "__init__.py").write_text("\n".join(imports) + "\n")
+    return package
+
+
+@case("cold_start_version", "`surfgram-cli --version` in a new interpreter")
+def _cold_start(workdir: Path, repeat: int) -> List[float]:
+    command = [sys.executable, "-m", "surfgram_cli", "--version"]
+    environment = dict(os.environ)
+
+    def run() -> None:
+        subprocess.run(
+            command,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+
+    return _time(run, repeat)
+
+
+def _find_config(package: Path, repeat: int, cached: bool) -> List[float]:
+    from surfgram_cli.manager import BotManager
+
+    disabled = None if cached else "1"
+    with _environment(**{CacheConfig.DISABLE_ENV_VAR: disabled}):
+        return _time(
+            lambda: BotManager.find_config(str(package), interactive=False), repeat
+        )
+
+
+@case("find_config_small", "`find_config` on a package with 5 modules")
+def _find_config_small(workdir: Path, repeat: int) -> List[float]:
+    package = synthetic_package(workdir, "small_bot", 5)
+    return _find_config(package, repeat, cached=False)
+
+
+@case(
+    "find_config_large",
+    f"`find_config` on a package with {BenchSuiteConfig.LARGE_PACKAGE_MODULES} "
+    f"modules",
+)
+def _find_config_large(workdir: Path, repeat: int) -> List[float]:
+    package = synthetic_package(
+        workdir, "large_bot", BenchSuiteConfig.LARGE_PACKAGE_MODULES
+    )
+    return _find_config(package, repeat, cached=False)
+
+
+@case("find_config_large_cached", "`find_config` on the large package, cached")
+def _find_config_large_cached(workdir: Path, repeat: int) -> List[float]:
+    package = synthetic_package(
+        workdir, "large_bot", BenchSuiteConfig.LARGE_PACKAGE_MODULES
+    )
+    return _find_config(package, repeat, cached=True)
+
+
+@case("create_bot_render", "Rendering and writing the bot templates")
+def _create_bot_render(workdir: Path, repeat: int) -> List[float]:
+    from surfgram_cli.manager import scaffold
+
+    target = workdir / "rendered_bot"
+
+    def create() -> None:
+        templates = scaffold.compile_templates()
+        files = scaffold.render_bot(templates, "rendered_bot", "123:bench")
+        scaffold.write_bot(target, files, overwrite=True)
+
+    return _time(create, repeat)
+
+
+@case("banner_render", "Rendering the figlet banner")
+def _banner_render(workdir: Path, repeat: int) -> List[float]:
+    from surfgram_cli.ui_components.banner import BannerComponent
+
+    return _time(lambda: BannerComponent()._render_figlet("Surfgram"), repeat)
+
+
+@case("banner_render_cached", "Loading the banner from the cache")
+def _banner_render_cached(workdir: Path, repeat: int) -> List[float]:
+    from surfgram_cli.ui_components.banner import BannerComponent
+
+    return _time(lambda: BannerComponent().render_banner(), repeat)
+
+
+@case("reload_latency", "File change to reload through `ReloadHandler`")
+def _reload_latency(workdir: Path, repeat: int) -> List[float]:
+    import watchdog.observers
+    from surfgram_cli.utils.reloader import ReloadHandler
+
+    package = synthetic_package(workdir, "reload_bot", 5)
+    target = package / "handlers" / "handler_0.py"
+    reloaded = threading.Event()
+    handler = ReloadHandler(None, str(package), callback=lambda _: reloaded.set())
+    observer = watchdog.observers.Observer()
+    observer.schedule(handler, str(package), recursive=True)
+    observer.start()
+
+    counter = iter(range(sys.maxsize))
+
+    def change() -> float:
+        reloaded.clear()
+        started = time.perf_counter()
+        target.write_text(f"VERSION = {next(counter)}\n")
+        if not reloaded.wait(BenchSuiteConfig.RELOAD_TIMEOUT):
+            raise TimeoutError(f"No reload within {BenchSuiteConfig.RELOAD_TIMEOUT}s")
+        return time.perf_counter() - started
+
+    try:
+        change()
+        return [change() for _ in range(repeat)]
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Median, minimum and spread of a case's samples, in milliseconds."""
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "min_ms": round(min(samples) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4),
+        "stdev_ms": round(
+            statistics.stdev(samples) * 1000 if len(samples) > 1 else 0.0, 4
+        ),
+        "samples": len(samples),
+    }
+
+
+def run_suite(
+    names: Optional[Sequence[str]] = None,
+    repeat: int = BenchSuiteConfig.REPEAT,
+) -> Dict[str, Any]:
+    """
+    Runs the benchmark cases of the CLI's own hot paths.
+
+    The cases run in a temporary directory with a private cache directory,
+    so results don't depend on (or change) the user's caches.
+
+    Args:
+        names: Cases to run; all of them by default.
+        repeat: Measured runs per case, after one warm-up run.
+
+    Returns:
+        Environment details and a summary per case.
+
+    Raises:
+        ValueError: If an unknown case is requested.
+    """
+    from surfgram_cli import __version__
+
+    names = list(names or CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        raise ValueError(
+            f"Unknown benchmark case(s): {', '.join(unknown)}\n"
+            f"Available: {', '.join(CASES)}"
+        )
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="surfgram-bench-") as directory:
+        workdir = Path(directory)
+        with _environment(**{CacheConfig.DIR_ENV_VAR: str(workdir / "cache")}):
+            for name in names:
+                description, function = CASES[name]
+                case_dir = workdir / name
+                case_dir.mkdir()
+                results[name] = dict(
+                    summarize(function(case_dir, repeat)), description=description
+                )
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = BenchSuiteConfig.REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compares results against a baseline by median.
+
+    Args:
+        results: Output of `run_suite`.
+        baseline: A previously saved `run_suite` output.
+        threshold: Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+
+    Returns:
+        One row per measured case, with the change in percent and whether it
+        exceeds the threshold. Cases missing from the baseline are not
+        regressions.
+    """
+    rows = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        row = {
+            "case": name,
+            "baseline_ms": previous["median_ms"] if previous else None,
+            "median_ms": current["median_ms"],
+            "change_pct": None,
+            "regressed": False,
+        }
+        if previous and previous["median_ms"] > 0:
+            ratio = current["median_ms"] / previous["median_ms"]
+            row["change_pct"] = round((ratio - 1) * 100, 1)
+            row["regressed"] = ratio > 1 + threshold
+        rows.append(row)
+    return rows
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """Reads a baseline file, or returns None if it doesn't exist."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: Dict[str, Any]) -> None:
+    """Writes results as the new baseline."""
+    Path(path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
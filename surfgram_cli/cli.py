@@ -1,16 +1,31 @@
+import sys
 import typer
-from .ui_components import BannerComponent
+from typing import List
 from .ui_components import ConsoleComponent
 from .error_handler import handle_exceptions
+from .enums import LoopEnum, OutputEnum, ReloadModeEnum
+from .config import (
+    BenchConfig,
+    BenchSuiteConfig,
+    MemoryConfig,
+    MetricsConfig,
+    MockAPIConfig,
+    ProfilerConfig,
+    ReloadConfig,
+    RunnerConfig,
+    ScaffoldConfig,
+    WebhookConfig,
+)
 
 app = typer.Typer(help="Surfgram CLI - A modern Telegram bot framework")
-banner = BannerComponent()
 console = ConsoleComponent()
 
 
 def print_banner():
     """Print a banner"""
-    banner.print_banner()
+    from .ui_components.banner import BannerComponent
+
+    BannerComponent().print_banner()
 
 def _version_callback(value: bool):
     if value:
@@ -24,11 +39,28 @@ def _version_callback(value: bool):
         raise typer.Exit()
 
 
+def _profile_startup_callback(value: bool):
+    if value:
+        from .utils.startup import profile_startup
+
+        argv = [arg for arg in sys.argv[1:] if arg != "--profile-startup"]
+        raise typer.Exit(profile_startup(argv))
+
+
 @app.callback()
 def callback(
     no_graphics: bool = typer.Option(
         False, "--no-graphics", help="Disable ASCII banner display and all the graphics"
     ),
+    output: OutputEnum = typer.Option(
+        OutputEnum.TEXT,
+        "--output",
+        "-o",
+        help="'json' writes one JSON object per event (operations, results, "
+        "errors) to stdout, debug logs as JSON lines to stderr, and never loads "
+        "the terminal UI.",
+        show_default=True,
+    ),
     version: bool = typer.Option(
         False,
         "--version",
@@ -37,8 +69,22 @@ def callback(
         callback=_version_callback,
         is_eager=True,
     ),
+    profile_startup: bool = typer.Option(
+        False,
+        "--profile-startup",
+        help="Print a per-module import-time breakdown of a cold start",
+        callback=_profile_startup_callback,
+        is_eager=True,
+    ),
 ):
     """Global options for Surfgram CLI"""
+    if output == OutputEnum.JSON:
+        from .utils import debugger
+        from .utils.debug import JsonLinesSink
+
+        console.set_output(output)
+        debugger.replace_console(JsonLinesSink(sys.stderr))
+        return
     if not no_graphics:
         console.set_status(graphics=True)
         print_banner()
@@ -47,13 +93,46 @@ def callback(
 @app.command()
 @handle_exceptions("Bot creation")
 def new(
-    bot_name: str,
+    bot_name: str = typer.Argument(None, show_default=False),
+    manifest: str = typer.Option(
+        None,
+        "--manifest",
+        "-m",
+        help="JSON/YAML file listing bots ('name' and 'token') to create in one go.",
+        show_default=False,
+    ),
+    jobs: int = typer.Option(
+        ScaffoldConfig.JOBS,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Bots rendered in parallel with --manifest.",
+        show_default=True,
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Replace existing bot directories with --manifest instead of skipping them.",
+        show_default=True,
+    ),
     full_trace: bool = typer.Option(False, help="Show full error traceback"),
 ):
-    """Create a new bot"""
-    
+    """Create a new bot, or many bots from a manifest"""
+
     from surfgram_cli.manager import BotManager
-    
+
+    if manifest:
+        console.print_operation_header("🤖 Creating Bots From Manifest")
+        summary = BotManager.create_bots(manifest, jobs=jobs, overwrite=force)
+        console.print_batch_summary(summary)
+        failed = [r for r in summary["results"] if r["status"] == "failed"]
+        if failed:
+            raise typer.Exit(1)
+        return
+
+    if not bot_name:
+        raise typer.BadParameter("Provide a bot name or --manifest")
+
     console.print_operation_header("🤖 Creating New Bot")
     token = console.prompt("🔑 Please enter your bot token", hide_input=True)
 
@@ -111,12 +190,195 @@ def run(
         help="Enable debug mode with verbose logging.",
         show_default=True,
     ),
+    log_json: str = typer.Option(
+        None,
+        "--log-json",
+        help="Also write debug messages as JSON lines to this file.",
+        show_default=False,
+    ),
     autoreload: bool = typer.Option(
         False,
         "--autoreload",
         help="Automatically reload bot on source changes.",
         show_default=True,
     ),
+    reload_mode: ReloadModeEnum = typer.Option(
+        ReloadModeEnum.RESTART,
+        "--reload-mode",
+        help="How --autoreload applies changes: restart the process, or reload "
+        "changed modules in place and restart only on failure.",
+        show_default=True,
+    ),
+    reload_debounce: float = typer.Option(
+        ReloadConfig.DEBOUNCE_SECONDS,
+        "--reload-debounce",
+        help="Seconds to wait for further file events before reloading.",
+        show_default=True,
+    ),
+    reload_include: List[str] = typer.Option(
+        list(ReloadConfig.INCLUDE_PATTERNS),
+        "--reload-include",
+        help="Glob pattern of files that trigger a reload. Repeatable.",
+        show_default=True,
+    ),
+    reload_exclude: List[str] = typer.Option(
+        [],
+        "--reload-exclude",
+        help="Glob pattern of paths to ignore, in addition to caches, editor "
+        "files and .gitignore. Repeatable.",
+        show_default=False,
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of worker processes. More than one starts a supervisor "
+        "that polls for updates and distributes them between forked workers.",
+        show_default=True,
+    ),
+    api_url: str = typer.Option(
+        None,
+        "--api-url",
+        help="Use this Bot API server instead of Telegram for updates and the "
+        "bot's own calls, e.g. one started with 'surfgram-cli mock-api'.",
+        show_default=False,
+    ),
+    profile: str = typer.Option(
+        None,
+        "--profile",
+        help="Sample the bot while it runs and write a profile to this file on "
+        "exit or SIGUSR1: speedscope for .json, collapsed stacks otherwise.",
+        show_default=False,
+    ),
+    memory_report: str = typer.Option(
+        None,
+        "--memory-report",
+        help="Trace allocations and append a report of the top growing sites "
+        "per bot module to this file every --memory-interval seconds or on "
+        "SIGUSR2.",
+        show_default=False,
+    ),
+    memory_interval: float = typer.Option(
+        MemoryConfig.INTERVAL,
+        "--memory-interval",
+        min=1,
+        help="Seconds between --memory-report reports.",
+        show_default=True,
+    ),
+    memory_rss_limit: float = typer.Option(
+        None,
+        "--memory-rss-limit",
+        min=1,
+        help="With --memory-report, log an error and take a report when "
+        "resident memory exceeds this many MiB.",
+        show_default=False,
+    ),
+    metrics_port: int = typer.Option(
+        None,
+        "--metrics-port",
+        min=0,
+        max=65535,
+        help="Serve Prometheus metrics (updates, handler latency, polling, "
+        "event-loop lag, memory, reloads) on this port at /metrics.",
+        show_default=False,
+    ),
+    metrics_host: str = typer.Option(
+        MetricsConfig.HOST,
+        "--metrics-host",
+        help="Interface the metrics endpoint listens on.",
+        show_default=True,
+    ),
+    record: str = typer.Option(
+        None,
+        "--record",
+        help="Append every received update to this capture file, for replay.",
+        show_default=False,
+    ),
+    webhook: bool = typer.Option(
+        False,
+        "--webhook",
+        help="Receive updates on a built-in webhook server instead of polling.",
+        show_default=True,
+    ),
+    webhook_host: str = typer.Option(
+        WebhookConfig.HOST,
+        "--webhook-host",
+        help="Interface the webhook server listens on.",
+        show_default=True,
+    ),
+    webhook_port: int = typer.Option(
+        WebhookConfig.PORT,
+        "--webhook-port",
+        min=0,
+        max=65535,
+        help="Port the webhook server listens on.",
+        show_default=True,
+    ),
+    webhook_path: str = typer.Option(
+        WebhookConfig.PATH,
+        "--webhook-path",
+        help="URL path updates are posted to.",
+        show_default=True,
+    ),
+    webhook_secret: str = typer.Option(
+        None,
+        "--webhook-secret",
+        envvar=WebhookConfig.SECRET_ENV_VAR,
+        help="Secret token requests must carry in X-Telegram-Bot-Api-Secret-Token. "
+        "Generated when --webhook-url is given without one.",
+        show_default=False,
+    ),
+    webhook_url: str = typer.Option(
+        None,
+        "--webhook-url",
+        help="Public HTTPS URL to register with setWebhook on startup.",
+        show_default=False,
+    ),
+    loop: LoopEnum = typer.Option(
+        LoopEnum.AUTO,
+        "--loop",
+        help="Event loop: uvloop if installed (auto), asyncio, or uvloop.",
+        show_default=True,
+    ),
+    executor_workers: int = typer.Option(
+        None,
+        "--executor-workers",
+        min=1,
+        help="Threads of the default executor that runs blocking handlers. "
+        "Defaults to asyncio's size (CPU count + 4, at most 32).",
+        show_default=False,
+    ),
+    max_concurrency: int = typer.Option(
+        None,
+        "--max-concurrency",
+        min=1,
+        help="Maximum number of handlers running at once (per worker). "
+        f"[default: {RunnerConfig.MAX_CONCURRENT_HANDLERS}]",
+        show_default=False,
+    ),
+    state_file: str = typer.Option(
+        None,
+        "--state-file",
+        help="Save the offset of the first update not handled yet to this file "
+        "and resume polling from it on start.",
+        show_default=False,
+    ),
+    drain_timeout: float = typer.Option(
+        RunnerConfig.DRAIN_TIMEOUT,
+        "--drain-timeout",
+        min=0,
+        help="Seconds in-flight handlers get to finish on Ctrl-C, SIGTERM or "
+        "an autoreload restart. A second Ctrl-C cancels them.",
+        show_default=True,
+    ),
+    profile_interval: float = typer.Option(
+        ProfilerConfig.INTERVAL * 1000,
+        "--profile-interval",
+        min=0.1,
+        help="Milliseconds between profiler samples.",
+        show_default=True,
+    ),
     full_trace: bool = typer.Option(
         False,
         "--full-trace",
@@ -144,10 +406,557 @@ def run(
             f"Expected format: 'module_name.ConfigClass'"
         )
 
+    from surfgram_cli.utils.runtime import default_executor_workers, resolve_loop
+
     console.print_config_status(
-        debug=debug, on_reload=autoreload, bot=str(bot_dir), config=config
+        debug=debug,
+        on_reload=autoreload,
+        bot=str(bot_dir),
+        config=config,
+        reload_mode=reload_mode,
+        workers=workers,
+        api_url=api_url,
+        profile=profile,
+        memory_report=memory_report,
+        metrics_port=metrics_port,
+        record=record,
+        state_file=state_file,
+        webhook=f"{webhook_host}:{webhook_port}{webhook_path}" if webhook else None,
+        loop=resolve_loop(loop).value,
+        executor_workers=executor_workers or default_executor_workers(),
+        max_concurrency=max_concurrency or RunnerConfig.MAX_CONCURRENT_HANDLERS,
     )
 
     BotManager.run_bot(
-        bot=str(bot_dir), config=config, debug=debug, on_reload=autoreload
+        bot=str(bot_dir),
+        config=config,
+        debug=debug,
+        on_reload=autoreload,
+        log_json=log_json,
+        reload_mode=reload_mode,
+        reload_debounce=reload_debounce,
+        reload_include=reload_include,
+        reload_exclude=reload_exclude,
+        workers=workers,
+        api_url=api_url,
+        profile=profile,
+        profile_interval=profile_interval / 1000,
+        metrics_port=metrics_port,
+        metrics_host=metrics_host,
+        record=record,
+        webhook=webhook,
+        webhook_host=webhook_host,
+        webhook_port=webhook_port,
+        webhook_path=webhook_path,
+        webhook_secret=webhook_secret,
+        webhook_url=webhook_url,
+        loop=loop,
+        executor_workers=executor_workers,
+        max_concurrency=max_concurrency,
+        memory_report=memory_report,
+        memory_interval=memory_interval,
+        memory_rss_limit=memory_rss_limit,
+        state_file=state_file,
+        drain_timeout=drain_timeout,
+    )
+
+
+@app.command()
+@handle_exceptions("Benchmark")
+def bench(
+    bot: str = typer.Option(
+        None,
+        "--bot",
+        "-b",
+        help="Directory containing the bot. Defaults to current directory.",
+        show_default=False,
+    ),
+    config: str = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Config class in format 'module.ConfigClass'. Auto-detected if not specified.",
+        show_default=False,
+    ),
+    updates: int = typer.Option(
+        BenchConfig.UPDATES,
+        "--updates",
+        "-n",
+        min=1,
+        help="Number of synthetic updates to measure.",
+        show_default=True,
+    ),
+    kinds: List[str] = typer.Option(
+        list(BenchConfig.UPDATE_KINDS),
+        "--kind",
+        help="Update type to generate: message, callback_query or inline_query. "
+        "Repeatable.",
+        show_default=True,
+    ),
+    concurrency: int = typer.Option(
+        BenchConfig.CONCURRENCY,
+        "--concurrency",
+        min=1,
+        help="Maximum number of handlers running at once.",
+        show_default=True,
+    ),
+    warmup: int = typer.Option(
+        BenchConfig.WARMUP,
+        "--warmup",
+        min=0,
+        help="Updates dispatched before measuring.",
+        show_default=True,
+    ),
+    seed: int = typer.Option(
+        0, "--seed", help="Seed for the synthetic updates.", show_default=True
+    ),
+    json_path: str = typer.Option(
+        None,
+        "--json",
+        help="Write the results as JSON to this file, or '-' for stdout "
+        "(a single event with --output json).",
+        show_default=False,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Measure handler throughput and latency on synthetic updates"""
+    import json
+    from pathlib import Path
+    from surfgram_cli.manager import BotManager
+
+    console.print_operation_header("⏱️ Handler Benchmark")
+
+    bot_dir = Path(bot).resolve() if bot else Path.cwd().resolve()
+    if not config:
+        config = BotManager.find_config(str(bot_dir))
+
+    report = BotManager.bench_bot(
+        str(bot_dir),
+        config,
+        updates=updates,
+        kinds=kinds,
+        concurrency=concurrency,
+        warmup=warmup,
+        seed=seed,
+    )
+
+    if json_path == "-" and not console.json_output:
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        if json_path and json_path != "-":
+            Path(json_path).write_text(json.dumps(report, indent=2) + "\n")
+        console.print_bench_report(report)
+
+
+@app.command("bench-cli")
+@handle_exceptions("CLI benchmark")
+def bench_cli(
+    cases: List[str] = typer.Option(
+        None,
+        "--case",
+        help="Case to run; all of them if not given. Repeatable.",
+        show_default=False,
+    ),
+    repeat: int = typer.Option(
+        BenchSuiteConfig.REPEAT,
+        "--repeat",
+        min=1,
+        help="Measured runs per case, after one warm-up run.",
+        show_default=True,
+    ),
+    baseline: str = typer.Option(
+        None,
+        "--baseline",
+        help="JSON baseline to compare against; created if it doesn't exist.",
+        show_default=False,
+    ),
+    update_baseline: bool = typer.Option(
+        False,
+        "--update-baseline",
+        help="Overwrite the baseline with these results.",
+        show_default=True,
+    ),
+    threshold: float = typer.Option(
+        BenchSuiteConfig.REGRESSION_THRESHOLD * 100,
+        "--threshold",
+        min=0,
+        help="Slowdown of a case's median, in percent, that fails the run.",
+        show_default=True,
+    ),
+    json_path: str = typer.Option(
+        None,
+        "--json",
+        help="Write the results as JSON to this file, or '-' for stdout "
+        "(a single event with --output json).",
+        show_default=False,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Benchmark the CLI's own hot paths against a JSON baseline"""
+    import json
+    from pathlib import Path
+    from surfgram_cli.bench import suite
+
+    console.print_operation_header("⏱️ CLI Benchmark")
+
+    results = suite.run_suite(cases, repeat=repeat)
+
+    rows = []
+    previous = suite.load_baseline(baseline) if baseline else None
+    if previous is not None:
+        rows = suite.compare(results, previous, threshold / 100)
+    if baseline and (previous is None or update_baseline):
+        suite.save_baseline(baseline, results)
+
+    if json_path == "-" and not console.json_output:
+        typer.echo(json.dumps(dict(results, comparison=rows), indent=2))
+    else:
+        if json_path and json_path != "-":
+            Path(json_path).write_text(
+                json.dumps(dict(results, comparison=rows), indent=2) + "\n"
+            )
+        console.print_bench_suite(results, rows, baseline)
+
+    regressed = [row["case"] for row in rows if row["regressed"]]
+    if regressed:
+        console.print_error(
+            f"Regressed by more than {threshold:g}%: {', '.join(regressed)}"
+        )
+        raise typer.Exit(1)
+
+
+@app.command()
+@handle_exceptions("Replay")
+def replay(
+    capture: str = typer.Argument(
+        ..., help="Capture file written by 'run --record'.", show_default=False
+    ),
+    bot: str = typer.Option(
+        None,
+        "--bot",
+        "-b",
+        help="Directory containing the bot. Defaults to current directory.",
+        show_default=False,
+    ),
+    config: str = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Config class in format 'module.ConfigClass'. Auto-detected if not specified.",
+        show_default=False,
+    ),
+    speed: float = typer.Option(
+        0,
+        "--speed",
+        min=0,
+        help="Replay at this multiple of the recorded rate; 0 replays as fast "
+        "as possible.",
+        show_default=True,
+    ),
+    concurrency: int = typer.Option(
+        BenchConfig.CONCURRENCY,
+        "--concurrency",
+        min=1,
+        help="Maximum number of handlers running at once.",
+        show_default=True,
+    ),
+    limit: int = typer.Option(
+        None,
+        "--limit",
+        min=1,
+        help="Stop after this many updates.",
+        show_default=False,
+    ),
+    json_path: str = typer.Option(
+        None,
+        "--json",
+        help="Write the results as JSON to this file, or '-' for stdout "
+        "(a single event with --output json).",
+        show_default=False,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Feed recorded updates into the bot's handlers"""
+    import json
+    from pathlib import Path
+    from surfgram_cli.manager import BotManager
+
+    console.print_operation_header("⏯️ Update Replay")
+
+    bot_dir = Path(bot).resolve() if bot else Path.cwd().resolve()
+    if not config:
+        config = BotManager.find_config(str(bot_dir))
+
+    report = BotManager.replay_bot(
+        str(bot_dir),
+        config,
+        capture,
+        speed=speed or None,
+        concurrency=concurrency,
+        limit=limit,
+    )
+
+    if json_path == "-" and not console.json_output:
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        if json_path and json_path != "-":
+            Path(json_path).write_text(json.dumps(report, indent=2) + "\n")
+        console.print_bench_report(report, title="Replay")
+
+
+@app.command("mock-api")
+@handle_exceptions("Mock Bot API")
+def mock_api(
+    host: str = typer.Option(
+        MockAPIConfig.HOST, "--host", help="Interface to listen on."
+    ),
+    port: int = typer.Option(MockAPIConfig.PORT, "--port", help="Port to listen on."),
+    rate: float = typer.Option(
+        MockAPIConfig.RATE,
+        "--rate",
+        min=0.0,
+        help="Updates generated per second for every bot polling the server.",
+        show_default=True,
+    ),
+    kinds: List[str] = typer.Option(
+        list(BenchConfig.UPDATE_KINDS),
+        "--kind",
+        help="Update type to generate: message, callback_query or inline_query. "
+        "Repeatable.",
+        show_default=True,
+    ),
+    latency_ms: float = typer.Option(
+        0.0, "--latency-ms", min=0.0, help="Delay added to every response."
+    ),
+    jitter_ms: float = typer.Option(
+        0.0, "--jitter-ms", min=0.0, help="Random extra delay of up to this much."
+    ),
+    error_rate: float = typer.Option(
+        0.0,
+        "--error-rate",
+        min=0.0,
+        max=1.0,
+        help="Fraction of requests answered with a 500 error.",
+    ),
+    rate_limit_rate: float = typer.Option(
+        0.0,
+        "--rate-limit-rate",
+        min=0.0,
+        max=1.0,
+        help="Fraction of requests answered with a 429 Too Many Requests error.",
+    ),
+    retry_after: int = typer.Option(
+        MockAPIConfig.RETRY_AFTER,
+        "--retry-after",
+        min=0,
+        help="retry_after seconds sent with 429 errors.",
+    ),
+    duration: float = typer.Option(
+        0.0,
+        "--duration",
+        min=0.0,
+        help="Stop after this many seconds; 0 runs until Ctrl-C.",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for updates and injected faults."),
+    json_path: str = typer.Option(
+        None,
+        "--json",
+        help="Write the statistics as JSON to this file on exit, or '-' for "
+        "stdout (a single event with --output json).",
+        show_default=False,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Serve a local Bot API stand-in for offline load tests"""
+    import json
+    from pathlib import Path
+    from surfgram_cli.mock_api import MockBotAPI
+
+    console.print_operation_header("🧪 Mock Bot API")
+    server = MockBotAPI(
+        host,
+        port,
+        rate=rate,
+        kinds=kinds,
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        retry_after=retry_after,
+        seed=seed,
+    )
+    server.start()
+    console.print_success_message(
+        f"🌐 Listening on {server.url}\n"
+        f"🚀 surfgram-cli run --api-url {server.url}",
+        title="Mock Bot API",
+    )
+    try:
+        server.wait(duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+    stats = server.stats()
+    if json_path == "-" and not console.json_output:
+        typer.echo(json.dumps(stats, indent=2))
+    else:
+        if json_path and json_path != "-":
+            Path(json_path).write_text(json.dumps(stats, indent=2) + "\n")
+        console.print_mock_api_stats(stats)
+
+
+fleet_app = typer.Typer(help="Run many bots in one process")
+app.add_typer(fleet_app, name="fleet")
+
+
+@fleet_app.command("run")
+@handle_exceptions("Fleet startup")
+def fleet_run(
+    manifest: str = typer.Option(
+        ...,
+        "--manifest",
+        "-m",
+        help="JSON/YAML file listing bots ('bot' directory, optional 'config').",
+        show_default=False,
+    ),
+    api_url: str = typer.Option(
+        None,
+        "--api-url",
+        help="Use this Bot API server instead of Telegram for updates and the "
+        "bot's own calls, e.g. one started with 'surfgram-cli mock-api'.",
+        show_default=False,
+    ),
+    debug: bool = typer.Option(
+        False,
+        "--debug",
+        help="Enable debug mode with verbose logging.",
+        show_default=True,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Run all bots of a manifest on a shared event loop"""
+    from surfgram_cli.manager import BotManager
+
+    console.print_operation_header("🚀 Fleet Startup")
+    report = BotManager.run_fleet(manifest, debug=debug, api_url=api_url)
+    if report:
+        console.print_worker_health(report, title="Bots")
+
+
+daemon_app = typer.Typer(help="Serve commands from a warm background process")
+app.add_typer(daemon_app, name="daemon")
+
+
+@daemon_app.command("start")
+@handle_exceptions("Daemon startup")
+def daemon_start(
+    foreground: bool = typer.Option(
+        False,
+        "--foreground",
+        help="Serve from this process instead of starting a background one.",
+        show_default=True,
+    ),
+    log_file: str = typer.Option(
+        None,
+        "--log-file",
+        help="File the background daemon writes to. Defaults to daemon.log in "
+        "the user cache directory.",
+        show_default=False,
+    ),
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Start a daemon that runs later commands without interpreter startup"""
+    from surfgram_cli.daemon.server import DaemonServer, start_daemon
+
+    if foreground:
+        DaemonServer().serve_forever()
+        return
+
+    status = start_daemon(log_file)
+    console.print_success_message(
+        f"Daemon {status['pid']} listening on {status['socket']}\n"
+        f"{status['preloaded']} modules preloaded, logging to {status['log_file']}",
+        title="Daemon started",
+    )
+
+
+@daemon_app.command("stop")
+@handle_exceptions("Daemon shutdown")
+def daemon_stop(
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Stop the daemon once its running commands have finished"""
+    from surfgram_cli.daemon.server import stop_daemon
+
+    reply = stop_daemon()
+    if reply is None:
+        console.print_cancel("No daemon is running")
+        return
+    console.print_success_message(
+        f"Daemon {reply['pid']} stopping", title="Daemon stopped"
+    )
+
+
+@daemon_app.command("status")
+@handle_exceptions("Daemon status")
+def daemon_status(
+    full_trace: bool = typer.Option(
+        False,
+        "--full-trace",
+        help="Show complete error tracebacks when enabled.",
+        show_default=True,
+    ),
+):
+    """Show whether the daemon is running and what it has served"""
+    from surfgram_cli.daemon.client import request
+
+    status = request({"cmd": "status"})
+    if status is None:
+        console.print_cancel("No daemon is running")
+        raise typer.Exit(1)
+    console.print_success_message(
+        f"PID: {status['pid']}\n"
+        f"Socket: {status['socket']}\n"
+        f"Version: {status['version']}\n"
+        f"Uptime: {status['uptime']}s\n"
+        f"Commands served: {status['served']} ({status['running']} running)\n"
+        f"Modules preloaded: {status['preloaded']}",
+        title="Daemon running",
     )
@@ -1,6 +1,3 @@
-from rich.style import Style
-
-
 class UIConfig:
     """Centralized configuration for UI styles and settings"""
 
@@ -12,15 +9,326 @@ class UIConfig:
     SEA_GREEN = "rgb(46,139,87)"
     CRIMSON = "rgb(178,34,34)"
 
-    # UI Styles
-    BANNER_STYLE = Style(color=ORANGE, bold=True)
-    BORDER_STYLE = Style(color=DEEP_ORANGE)
-    FRAMEWORK_STYLE = Style(color=CORAL, italic=True)
-    ACCENT_STYLE = Style(color=STEEL_BLUE, bold=True)
-    SUCCESS_STYLE = Style(color=SEA_GREEN, bold=True)
-    ERROR_STYLE = Style(color=CRIMSON, bold=True)
+    # UI Styles, as rich style definitions so that importing the config
+    # doesn't import rich
+    BANNER_STYLE = f"bold {ORANGE}"
+    BORDER_STYLE = DEEP_ORANGE
+    FRAMEWORK_STYLE = f"italic {CORAL}"
+    ACCENT_STYLE = f"bold {STEEL_BLUE}"
+    SUCCESS_STYLE = f"bold {SEA_GREEN}"
+    ERROR_STYLE = f"bold {CRIMSON}"
 
     # Banner settings
     BANNER_FONT = "slant"
+    BANNER_TEXT = "Surfgram"
     SEPARATOR_LENGTH = 50
     FRAMEWORK_DESCRIPTION = "🌊 Like a surfer on the waves"
+
+
+class DebugConfig:
+    """Settings for the background writer of `surfgram_cli.utils.debugger`"""
+
+    # Messages waiting to be written before new ones are dropped
+    QUEUE_SIZE = 10000
+    # Seconds to wait for queued messages on exit
+    FLUSH_TIMEOUT = 2.0
+
+
+class StartupConfig:
+    """Settings for the CLI cold-start budget and `--profile-startup`"""
+
+    # Total import time a cold `surfgram-cli` start is expected to fit into
+    BUDGET_MS = 150
+    BUDGET_ENV_VAR = "SURFGRAM_CLI_STARTUP_BUDGET_MS"
+
+    # Number of slowest modules shown in the startup report
+    PROFILE_TOP_N = 25
+
+
+class ProfilerConfig:
+    """Settings for `run --profile`"""
+
+    # Seconds between stack samples of the bot's thread (200 Hz)
+    INTERVAL = 0.005
+    # Number of hottest functions shown on exit
+    TOP_N = 20
+    # Deepest stack kept per sample
+    MAX_DEPTH = 128
+
+
+class MemoryConfig:
+    """Settings for `run --memory-report`"""
+
+    # Seconds between reports
+    INTERVAL = 60.0
+    # Frames kept per allocation; more attribute better but cost more
+    FRAMES = 8
+    # Number of growing allocation sites reported
+    TOP_N = 10
+    # Seconds between RSS checks against --memory-rss-limit
+    RSS_CHECK_INTERVAL = 1.0
+
+
+class MetricsConfig:
+    """Settings for `run --metrics-port`"""
+
+    HOST = "127.0.0.1"
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    # Histogram buckets in seconds
+    LATENCY_BUCKETS = (
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+    )
+    POLL_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60)
+    # Seconds between event-loop lag probes
+    LOOP_LAG_INTERVAL = 0.5
+    # Carries the restart count across os.exec restarts of --autoreload
+    RESTARTS_ENV_VAR = "SURFGRAM_CLI_RESTARTS"
+    # Carries the time of the file change behind an --autoreload restart
+    CHANGED_AT_ENV_VAR = "SURFGRAM_CLI_CHANGED_AT"
+
+
+class ReloadConfig:
+    """Defaults for the `run --autoreload` file watcher"""
+
+    # Seconds of quiet after the last event before a reload is triggered
+    DEBOUNCE_SECONDS = 0.3
+
+    # File name patterns that trigger a reload
+    INCLUDE_PATTERNS = ("*.py",)
+
+    # Path components that never trigger a reload (caches, editor artifacts)
+    EXCLUDE_PATTERNS = (
+        "__pycache__",
+        "*.py[cod]",
+        ".*",
+        "*~",
+        "*.sw[a-p]",
+        "*.tmp",
+        "4913",
+    )
+
+    # Watchdog event types considered as changes
+    EVENT_TYPES = ("modified", "created", "moved", "deleted")
+
+    # Seconds a reload waits for changed files to be compiled to bytecode
+    PREWARM_TIMEOUT = 5.0
+
+
+class CacheConfig:
+    """Settings for the on-disk caches kept in the user cache directory"""
+
+    DIR_NAME = "surfgram-cli"
+    DIR_ENV_VAR = "SURFGRAM_CLI_CACHE_DIR"
+    DISABLE_ENV_VAR = "SURFGRAM_CLI_NO_CACHE"
+
+    # Subdirectories of the cache entries
+    BANNER_SUBDIR = "banner"
+    DISCOVERY_SUBDIR = "config-discovery"
+    TEMPLATES_SUBDIR = "templates"
+
+
+class CrashConfig:
+    """Settings for error deduplication and crash dumps"""
+
+    # Seconds during which repeats of an error are counted instead of shown
+    WINDOW = 60.0
+    # Seconds between checks for windows that ended with counted repeats,
+    # whose summary is then logged
+    SUMMARY_INTERVAL = 10.0
+    # Innermost frames that, with the exception type, identify an error
+    FINGERPRINT_FRAMES = 3
+    # Overrides the crash dump directory (default: "crashes" in the cache dir)
+    DIR_ENV_VAR = "SURFGRAM_CLI_CRASH_DIR"
+    SUBDIR = "crashes"
+    # Crash dumps kept; older ones are deleted
+    MAX_DUMPS = 50
+    # Longer dumps are truncated
+    MAX_DUMP_BYTES = 64 * 1024
+    # Values of options whose name contains one of these are left out of dumps
+    SECRET_OPTION_WORDS = ("secret", "token", "password", "key")
+
+
+class TelegramConfig:
+    """Settings for the CLI's own Bot API calls (polling outside of surfgram)"""
+
+    API_URL = "https://api.telegram.org"
+    POLL_TIMEOUT = 30
+    POLL_LIMIT = 100
+    # Seconds between retries when getUpdates fails, doubled up to the max
+    RETRY_DELAY = 1.0
+    RETRY_DELAY_MAX = 30.0
+    # Idle keep-alive connections kept per host by the async client
+    POOL_MAX_IDLE = 64
+
+
+class SupervisorConfig:
+    """Defaults for `run --workers`"""
+
+    # Seconds between per-worker health reports in debug mode
+    HEALTH_INTERVAL = 30.0
+    # Seconds between worker heartbeats
+    HEARTBEAT_INTERVAL = 1.0
+    # Restart delay for a crashed worker, doubled on every consecutive crash
+    RESTART_BACKOFF_BASE = 0.5
+    RESTART_BACKOFF_MAX = 30.0
+    # A worker alive for this many seconds has its crash count reset
+    STABLE_AFTER = 10.0
+    # Seconds to wait for workers to finish on shutdown before killing them
+    STOP_TIMEOUT = 10.0
+    # Updates buffered per worker before polling blocks
+    QUEUE_SIZE = 1000
+    # Seconds between polls while the Bot API only returns updates the
+    # workers are still handling
+    BACKLOG_POLL_DELAY = 0.2
+    # Times an update is sent to a worker before it is dropped, when the
+    # workers handling it keep crashing
+    MAX_DELIVERIES = 3
+    # Handlers running at once inside one worker
+    MAX_CONCURRENT_HANDLERS = 100
+
+
+class RunnerConfig:
+    """Defaults for bots whose updates are polled by the CLI itself"""
+
+    # Handlers running at once
+    MAX_CONCURRENT_HANDLERS = 100
+    # Updates received but not handled yet; polling waits for handlers beyond
+    # that, since only handled updates are confirmed to the Bot API
+    MAX_PENDING_UPDATES = 100
+    # Seconds between polls while the Bot API only returns updates whose
+    # handlers are still running, unless one finishes earlier
+    BACKLOG_POLL_DELAY = 0.2
+    # Seconds in-flight handlers get to finish once polling has stopped
+    DRAIN_TIMEOUT = 10.0
+    # Minimum seconds between writes of the update offset state file
+    OFFSET_SAVE_INTERVAL = 1.0
+    # Older saved offsets are ignored: the Bot API may restart update ids
+    # after a week without updates
+    OFFSET_MAX_AGE = 7 * 24 * 3600
+
+
+class DaemonConfig:
+    """Settings for `daemon`"""
+
+    # Imported once by the daemon so forked commands start with them loaded
+    PRELOAD = (
+        "typer",
+        "click",
+        "rich.console",
+        "rich.panel",
+        "rich.table",
+        "rich.text",
+        "jinja2",
+        "pyfiglet",
+        "watchdog.observers",
+        "dotenv",
+        "surfgram",
+        "surfgram.core.bot",
+        "surfgram_cli.cli",
+        "surfgram_cli.manager",
+        "surfgram_cli.manager.config_loader",
+        "surfgram_cli.manager.discovery",
+        "surfgram_cli.manager.scaffold",
+        "surfgram_cli.ui_components.banner",
+        "surfgram_cli.bench",
+        "surfgram_cli.runner",
+        "surfgram_cli.utils.reloader",
+    )
+    LOG_FILE = "daemon.log"
+    BACKLOG = 64
+    # Seconds between checks for a stop request while waiting for clients
+    ACCEPT_TIMEOUT = 0.5
+    START_TIMEOUT = 10.0
+    MAX_REQUEST_BYTES = 4 * 1024 * 1024
+    # Seconds a client has to send its request once connected
+    READ_TIMEOUT = 5.0
+
+
+class WebhookConfig:
+    """Defaults for `run --webhook`"""
+
+    HOST = "127.0.0.1"
+    PORT = 8080
+    PATH = "/webhook"
+    # Header Telegram sends the secret token given to setWebhook in
+    SECRET_HEADER = "x-telegram-bot-api-secret-token"
+    SECRET_ENV_VAR = "SURFGRAM_WEBHOOK_SECRET"
+    # Updates accepted but not yet handled before requests get a 503
+    MAX_QUEUE = 1000
+    # Seconds Telegram is asked to wait before delivering a rejected update again
+    RETRY_AFTER = 1
+    MAX_BODY_BYTES = 1024 * 1024
+    MAX_HEADERS = 100
+    # Seconds an idle keep-alive connection is kept open
+    IDLE_TIMEOUT = 60.0
+    # Seconds requests still being read on shutdown get to be answered with 503
+    SHUTDOWN_TIMEOUT = 5.0
+
+
+class BlueGreenConfig:
+    """Settings for `run --reload-mode bluegreen`"""
+
+    # Environment variable carrying the control socket of a generation process
+    CONTROL_FD_ENV = "SURFGRAM_CLI_CONTROL_FD"
+    # Seconds a replacement process gets to import the bot and report ready
+    READY_TIMEOUT = 60.0
+    # Seconds to wait for the retiring process to hand over its offset
+    HANDOVER_TIMEOUT = 30.0
+    # Long polling timeout; bounds how long an idle handover waits for the
+    # retiring process's last getUpdates request to return
+    POLL_TIMEOUT = 5
+
+
+class ScaffoldConfig:
+    """Defaults for `new --manifest`"""
+
+    # Bots rendered and written at once
+    JOBS = 8
+
+
+class FleetConfig:
+    """Defaults for `fleet run`"""
+
+    # Restart delay for a failed bot, doubled on every consecutive failure
+    RESTART_BACKOFF_BASE = 1.0
+    RESTART_BACKOFF_MAX = 60.0
+
+
+class BenchConfig:
+    """Defaults for `bench`"""
+
+    UPDATES = 1000
+    WARMUP = 50
+    CONCURRENCY = 1
+    UPDATE_KINDS = ("message", "callback_query", "inline_query")
+    # Message texts cycled through by synthetic updates
+    TEXTS = ("/start", "/help", "hello")
+    # Distinct chats/users the synthetic updates are spread over
+    CHATS = 100
+
+
+class BenchSuiteConfig:
+    """Defaults for `bench-cli`"""
+
+    REPEAT = 10
+    # Allowed slowdown of a case's median against the baseline
+    REGRESSION_THRESHOLD = 0.25
+    # Handler modules of the large synthetic bot package
+    LARGE_PACKAGE_MODULES = 200
+    RELOAD_TIMEOUT = 10.0
+
+
+class MockAPIConfig:
+    """Defaults for `mock-api`"""
+
+    HOST = "127.0.0.1"
+    PORT = 8081
+    # Updates generated per second for every bot token seen by the server
+    RATE = 10.0
+    # Pending updates kept per bot; older ones are dropped like Telegram does
+    MAX_PENDING = 100000
+    # Longest getUpdates wait the server honours, in seconds
+    MAX_POLL_TIMEOUT = 50
+    RETRY_AFTER = 5
+    # Response times kept per method for percentiles (reservoir sample)
+    SAMPLE_LIMIT = 100000
@@ -0,0 +1,250 @@
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+# Imported on every `surfgram-cli` invocation, so only the standard library
+# is used here.
+
+# Overrides the socket path
+SOCKET_ENV_VAR = "SURFGRAM_CLI_DAEMON_SOCKET"
+# Set to run the command in this process even if a daemon is running
+NO_DAEMON_ENV_VAR = "SURFGRAM_CLI_NO_DAEMON"
+# Length prefix of a request
+HEADER = struct.Struct("!I")
+FORWARDED_SIGNALS = ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT")
+
+
+def private_dir() -> str:
+    """Directory of the socket when there is no `XDG_RUNTIME_DIR`."""
+    return os.path.join(tempfile.gettempdir(), f"surfgram-cli-{os.getuid()}")
+
+
+def socket_path() -> str:
+    """
+    Path of the daemon's Unix socket for the current user.
+
+    Without `XDG_RUNTIME_DIR` the socket lives in `private_dir()`, which
+    the daemon creates with mode 0700.
+    """
+    override = os.environ.get(SOCKET_ENV_VAR)
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "surfgram-cli.sock")
+    return os.path.join(private_dir(), "daemon.sock")
+
+
+def is_private(path: str) -> bool:
+    """
+    Whether a socket path belongs to the current user alone.
+
+    The socket itself must be a socket owned by the user, and so must its
+    directory unless that is a sticky shared one like /tmp; a directory of
+    the user's must not be writable by anyone else either.
+    """
+    try:
+        info = os.lstat(path)
+        parent = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return False
+    if parent.st_mode & stat.S_ISVTX:
+        return True
+    return parent.st_uid == os.getuid() and not parent.st_mode & 0o022
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """User id of the process at the other end, where the platform tells."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = struct.Struct("3i")
+    data = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size)
+    return credentials.unpack(data)[1]
+
+
+def connect(path: Optional[str] = None) -> Optional[socket.socket]:
+    """
+    Connects to the daemon; None if none is listening.
+
+    Commands send their environment and standard streams to the daemon, so
+    a socket that another user could have created or is listening on is
+    never used.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or socket_path()
+    if not is_private(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        uid = peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if uid is not None and uid != os.getuid():
+        sock.close()
+        return None
+    return sock
+
+
+def send_request(
+    sock: socket.socket, message: Dict[str, Any], fds: Sequence[int] = ()
+) -> None:
+    """Sends a length-prefixed JSON request, passing `fds` along with it."""
+    body = json.dumps(message).encode("utf-8")
+    if fds:
+        socket.send_fds(sock, [HEADER.pack(len(body))], list(fds))
+    else:
+        sock.sendall(HEADER.pack(len(body)))
+    sock.sendall(body)
+
+
+def read_messages(sock: socket.socket):
+    """Yields the JSON-lines replies of the daemon until it closes the socket."""
+    with sock.makefile("r", encoding="utf-8") as reader:
+        for line in reader:
+            yield json.loads(line)
+
+
+def request(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Sends a control request (`status`, `stop`) and returns the first reply.
+
+    Returns:
+        The reply, or None if no daemon is listening.
+    """
+    sock = connect()
+    if sock is None:
+        return None
+    with sock:
+        send_request(sock, message)
+        return next(read_messages(sock), None)
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Runs a command in the daemon.
+
+    Signals received meanwhile (Ctrl-C, SIGTERM) are passed on to the
+    command's process.
+
+    Args:
+        argv: The full command line, `sys.argv` style.
+
+    Returns:
+        The command's exit code, or None if it has to run locally.
+    """
+    if not hasattr(socket, "send_fds"):
+        return None
+    sock = connect()
+    if sock is None:
+        return None
+
+    from surfgram_cli import __version__
+
+    started = False
+    try:
+        send_request(
+            sock,
+            {
+                "cmd": "exec",
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "version": __version__,
+            },
+            [0, 1, 2],
+        )
+        replies = read_messages(sock)
+        reply = next(replies, None)
+        if not reply or reply.get("event") != "started":
+            return None
+        started = True
+
+        def relay(signum: int, frame: Any) -> None:
+            sock.sendall((json.dumps({"signal": signum}) + "\n").encode("utf-8"))
+
+        for name in FORWARDED_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), relay)
+
+        for reply in replies:
+            if reply.get("event") == "exit":
+                return reply["code"]
+        # The daemon went away while the command was running
+        return 1
+    except OSError:
+        return 1 if started else None
+    finally:
+        sock.close()
+
+
+def wants_json(argv: Sequence[str]) -> bool:
+    """Whether a command line asks for `--output json`."""
+    for arg, value in zip(argv, list(argv[1:]) + [""]):
+        if arg in ("--output", "-o") and value == "json":
+            return True
+        if arg in ("--output=json", "-ojson"):
+            return True
+    return False
+
+
+def import_typer_without_rich() -> None:
+    """
+    Imports typer so that it doesn't load rich, for JSON runs.
+
+    typer 0.16 imports rich along with itself whenever it is installed; a
+    None entry in `sys.modules` makes that import fail as if it weren't, so
+    typer falls back to plain help and error output. Newer typer versions
+    read `TYPER_USE_RICH` instead.
+    """
+    if "typer" in sys.modules:
+        return
+    previous = os.environ.get("TYPER_USE_RICH")
+    blocked = "rich" not in sys.modules
+    os.environ["TYPER_USE_RICH"] = "0"
+    if blocked:
+        sys.modules["rich"] = None  # type: ignore[assignment]
+    try:
+        import typer  # noqa: F401
+    finally:
+        if blocked:
+            del sys.modules["rich"]
+        if previous is None:
+            del os.environ["TYPER_USE_RICH"]
+        else:
+            os.environ["TYPER_USE_RICH"] = previous
+
+
+def main() -> None:
+    """
+    Entry point of the `surfgram-cli` script.
+
+    When a daemon started with `surfgram-cli daemon start` is listening, the
+    command line, working directory, environment and standard streams are
+    handed to it and the command runs in a process forked from the warm
+    daemon. Otherwise, or when the daemon can't serve the request, the
+    command runs in this process as usual.
+    """
+    argv = sys.argv
+    command = next((arg for arg in argv[1:] if not arg.startswith("-")), None)
+    if command != "daemon" and not os.environ.get(NO_DAEMON_ENV_VAR):
+        code = forward(argv)
+        if code is not None:
+            sys.exit(code)
+
+    if wants_json(argv):
+        import_typer_without_rich()
+
+    from surfgram_cli.cli import app
+
+    app()
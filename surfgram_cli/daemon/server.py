@@ -0,0 +1,381 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from surfgram_cli.config import DaemonConfig
+from surfgram_cli.daemon.client import (
+    HEADER,
+    NO_DAEMON_ENV_VAR,
+    connect,
+    private_dir,
+    request,
+    socket_path,
+)
+from surfgram_cli.supervisor.bluegreen import ControlChannel
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Client closed the connection")
+        data += chunk
+    return data
+
+
+def _run_command(
+    message: Dict[str, Any], fds: List[int], sockets: List[socket.socket]
+) -> None:
+    """
+    Runs a forwarded command in a forked child and exits with its code.
+
+    The child gets the client's standard streams, working directory,
+    environment and command line, and a session of its own so it may read
+    from the client's terminal.
+    """
+    code = 1
+    try:
+        for sock in sockets:
+            sock.close()
+        os.setsid()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+
+        os.chdir(message["cwd"])
+        os.environ.clear()
+        os.environ.update(message["env"])
+        # Processes the command starts itself (restarts) run directly
+        os.environ[NO_DAEMON_ENV_VAR] = "1"
+        sys.argv = list(message["argv"])
+
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for signum in (signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT):
+            signal.signal(signum, signal.SIG_DFL)
+
+        # Consoles created while preloading detected the daemon's streams
+        from surfgram_cli import error_handler
+
+        error_handler.console = None
+
+        from surfgram_cli.cli import app
+
+        app(args=sys.argv[1:], prog_name=os.path.basename(sys.argv[0]))
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+
+class DaemonServer:
+    """
+    Serves `surfgram-cli` commands from a process with the CLI preloaded.
+
+    The daemon imports typer, rich, jinja2, surfgram and the CLI's own
+    modules once, then listens on a Unix socket only the current user can
+    connect to. For every command it forks a child, which starts with all
+    of that already imported, so a command costs a `fork()` instead of an
+    interpreter start. The client's standard streams are passed over the
+    socket, signals it receives are relayed to the child, and the child's
+    exit code is sent back. Every connection is handled on a thread of its
+    own, and a client has `DaemonConfig.READ_TIMEOUT` seconds to send its
+    request, so a stuck client can't block the others.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initializes the DaemonServer.
+
+        Args:
+            path: Socket path; defaults to the per-user path the client uses.
+        """
+        from surfgram_cli import __version__
+
+        self.path = path or socket_path()
+        self.version = __version__
+        self.started = time.time()
+        self.served = 0
+        self.preloaded: List[str] = []
+        self._stopping = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        self._commands: List[threading.Thread] = []
+        # Guards the counters, the command threads and the open connections,
+        # which a forked command closes
+        self._lock = threading.Lock()
+        self._connections: Set[socket.socket] = set()
+
+    def preload(self) -> None:
+        """Imports the modules commands need and compiles the bot templates."""
+        for name in DaemonConfig.PRELOAD:
+            try:
+                import_module(name)
+            except ImportError:
+                continue
+            self.preloaded.append(name)
+        try:
+            from surfgram_cli.manager import scaffold
+
+            scaffold.compile_templates()
+        except Exception:
+            pass
+
+    def _bind(self) -> socket.socket:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if directory == private_dir():
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            info = os.stat(directory)
+            if info.st_uid != os.getuid() or info.st_mode & 0o077:
+                raise RuntimeError(
+                    f"{directory} must be a directory only you can access"
+                )
+        if os.path.lexists(self.path):
+            running = connect(self.path)
+            if running is not None:
+                running.close()
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            os.unlink(self.path)
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previous_umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(previous_umask)
+        listener.listen(DaemonConfig.BACKLOG)
+        listener.settimeout(DaemonConfig.ACCEPT_TIMEOUT)
+        return listener
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "event": "status",
+            "pid": os.getpid(),
+            "version": self.version,
+            "socket": self.path,
+            "uptime": round(time.time() - self.started, 1),
+            "served": self.served,
+            "running": sum(thread.is_alive() for thread in self._commands),
+            "preloaded": len(self.preloaded),
+        }
+
+    @staticmethod
+    def _read_request(conn: socket.socket) -> Tuple[Dict[str, Any], List[int]]:
+        header, fds, _, _ = socket.recv_fds(conn, HEADER.size, 3)
+        if not header:
+            raise ConnectionError("Client closed the connection")
+        header += _recv_exactly(conn, HEADER.size - len(header))
+        (length,) = HEADER.unpack(header)
+        if length > DaemonConfig.MAX_REQUEST_BYTES:
+            for fd in fds:
+                os.close(fd)
+            raise ValueError(f"Request of {length} bytes is too large")
+        return json.loads(_recv_exactly(conn, length)), list(fds)
+
+    def _supervise(self, channel: ControlChannel, pid: int) -> None:
+        """Relays signals to a command's process and reports its exit code."""
+        finished = threading.Event()
+
+        def relay() -> None:
+            while True:
+                message = channel.receive()
+                if finished.is_set():
+                    return
+                try:
+                    if message is None:
+                        # The client is gone; nobody reads the output anymore
+                        os.kill(pid, signal.SIGHUP)
+                        return
+                    if "signal" in message:
+                        os.kill(pid, int(message["signal"]))
+                except (ProcessLookupError, ValueError):
+                    return
+
+        threading.Thread(target=relay, daemon=True).start()
+        _, status = os.waitpid(pid, 0)
+        finished.set()
+        code = os.waitstatus_to_exitcode(status)
+        try:
+            channel.send(event="exit", code=128 - code if code < 0 else code)
+            channel.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        channel.close()
+
+    def _serve(self, conn: socket.socket) -> None:
+        try:
+            self._handle(conn)
+        finally:
+            with self._lock:
+                self._connections.discard(conn)
+
+    def _handle(self, conn: socket.socket) -> None:
+        try:
+            conn.settimeout(DaemonConfig.READ_TIMEOUT)
+            message, fds = self._read_request(conn)
+            conn.settimeout(None)
+        except (OSError, ValueError):
+            conn.close()
+            return
+
+        channel = ControlChannel(conn)
+        command = message.get("cmd")
+        if command == "exec" and (
+            message.get("version") != self.version or len(fds) != 3
+        ):
+            # A client of another CLI version runs the command itself
+            for fd in fds:
+                os.close(fd)
+            channel.send(event="rejected", reason="version mismatch")
+            channel.close()
+            return
+        if command != "exec":
+            for fd in fds:
+                os.close(fd)
+            if command == "stop":
+                self._stopping.set()
+                channel.send(event="stopping", pid=os.getpid())
+            else:
+                channel.send(**self.status())
+            channel.close()
+            return
+
+        with self._lock:
+            pid = os.fork()
+            if pid == 0:
+                _run_command(message, fds, [self._listener, *self._connections])
+            self.served += 1
+        for fd in fds:
+            os.close(fd)
+        channel.send(event="started", pid=pid)
+        thread = threading.Thread(
+            target=self._supervise, args=(channel, pid), daemon=True
+        )
+        thread.start()
+        with self._lock:
+            self._commands = [t for t in self._commands if t.is_alive()] + [thread]
+
+    def serve_forever(self) -> None:
+        """
+        Preloads, then serves commands until SIGINT, SIGTERM or `daemon stop`.
+
+        Commands still running when the daemon stops are waited for, so their
+        clients get an exit code.
+        """
+        self.preload()
+        self._listener = self._bind()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self._stopping.set())
+        print(
+            f"Daemon {os.getpid()} listening on {self.path} "
+            f"({len(self.preloaded)} modules preloaded)",
+            flush=True,
+        )
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                except InterruptedError:
+                    continue
+                with self._lock:
+                    self._connections.add(conn)
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            with self._lock:
+                running = [thread for thread in self._commands if thread.is_alive()]
+            if running:
+                print(f"Waiting for {len(running)} running command(s)", flush=True)
+            for thread in running:
+                thread.join()
+            print(f"Daemon {os.getpid()} stopped", flush=True)
+
+
+def start_daemon(log_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Starts a daemon in the background and waits until it accepts commands.
+
+    Args:
+        log_file: File the daemon's output goes to; defaults to `daemon.log`
+            in the user cache directory.
+
+    Returns:
+        The daemon's status.
+
+    Raises:
+        RuntimeError: If a daemon is already running or the new one doesn't
+            come up.
+    """
+    from surfgram_cli.utils import cache
+
+    status = request({"cmd": "status"})
+    if status is not None:
+        raise RuntimeError(
+            f"A daemon is already running (pid {status['pid']}, {status['socket']})"
+        )
+
+    if log_file is None:
+        log_dir = cache.user_cache_dir()
+        log_dir.mkdir(parents=True, exist_ok=True)
+        log_file = str(log_dir / DaemonConfig.LOG_FILE)
+
+    with open(log_file, "ab") as log:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "surfgram_cli",
+                "--no-graphics",
+                "daemon",
+                "start",
+                "--foreground",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+            env={**os.environ, NO_DAEMON_ENV_VAR: "1"},
+        )
+
+    deadline = time.monotonic() + DaemonConfig.START_TIMEOUT
+    while time.monotonic() < deadline:
+        status = request({"cmd": "status"})
+        if status is not None:
+            return dict(status, log_file=log_file)
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    raise RuntimeError(f"The daemon didn't start, see {log_file}")
+
+
+def stop_daemon() -> Optional[Dict[str, Any]]:
+    """Asks a running daemon to stop; None if none is running."""
+    return request({"cmd": "stop"})
@@ -42,3 +42,49 @@ class LevelsEnum(Enum):
             The ANSI reset code.
         """
         return "\033[0m"
+
+
+class ReloadModeEnum(str, Enum):
+    """
+    Enum representing how `run --autoreload` applies source changes.
+
+    Attributes:
+        RESTART (str): Restart the whole interpreter with `os.execve`.
+        INPLACE (str): Reload only the changed modules and their dependents
+            inside the running process, restarting only if that fails.
+        BLUEGREEN (str): Start a replacement process, hand the polling offset
+            over once it is ready, then retire the old process. Also
+            triggered by SIGHUP.
+    """
+
+    RESTART = "restart"
+    INPLACE = "inplace"
+    BLUEGREEN = "bluegreen"
+
+
+class LoopEnum(str, Enum):
+    """
+    Enum representing the event loop implementation `run` uses.
+
+    Attributes:
+        AUTO (str): uvloop when it is installed, asyncio's loop otherwise.
+        ASYNCIO (str): The standard library event loop.
+        UVLOOP (str): uvloop; fails if it is not installed.
+    """
+
+    AUTO = "auto"
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+class OutputEnum(str, Enum):
+    """
+    Enum representing how commands report their results.
+
+    Attributes:
+        TEXT (str): Panels and tables for a terminal (rich).
+        JSON (str): One JSON object per event on stdout, without rich.
+    """
+
+    TEXT = "text"
+    JSON = "json"
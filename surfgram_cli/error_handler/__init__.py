@@ -1,11 +1,36 @@
-from rich.console import Console
-from rich.panel import Panel
 from functools import wraps
+import time
 import traceback
 import sys
+import typer
 from ..config import UIConfig
+from ..utils.crash import errors
+from ..utils.debug import debugger
 
-console = Console()
+# The rich console, created on first use so that JSON output never imports rich
+console = None
+
+
+def _console():
+    global console
+    # Queued debug messages come before the error
+    debugger.flush()
+    if console is None:
+        from rich.console import Console
+
+        console = Console()
+    return console
+
+
+def _ui():
+    from surfgram_cli.cli import console as ui
+
+    return ui
+
+
+# Raised by the CLI for bad input, like a missing bot directory or an invalid
+# option; the message says everything, so no crash dump is written
+USER_ERRORS = (OSError, ValueError, ImportError)
 
 
 class ErrorHandler:
@@ -13,32 +38,91 @@ class ErrorHandler:
 
     @staticmethod
     def handle_error(e: Exception, full_trace: bool = False, context: str = ""):
-        """Handle exceptions with proper error messages and optional context"""
-        error_message = f"❌ {context + ': ' if context else ''}{str(e)}"
-        console.print(Panel(error_message, title="Error", style=UIConfig.ERROR_STYLE))
+        """
+        Handle exceptions with proper error messages and optional context.
+
+        Repeats of the same error are counted instead of printed. The
+        traceback of an unexpected error goes to a crash dump; `full_trace`
+        also prints it.
+        """
+        report = errors.record(
+            e,
+            f"{context + ': ' if context else ''}{str(e)}",
+            dump=not isinstance(e, USER_ERRORS),
+        )
+        if report is None:
+            return
+        message, dump = report
+        ui = _ui()
+        if ui.json_output:
+            ui.emit(
+                "error",
+                operation=context,
+                error=message,
+                type=type(e).__name__,
+                crash_dump=dump,
+            )
+            return
+
+        from rich.panel import Panel
+
+        _console().print(
+            Panel(f"❌ {message}", title="Error", style=UIConfig.ERROR_STYLE)
+        )
         if full_trace:
-            console.print(traceback.format_exc())
+            _console().print(traceback.format_exc())
+            if dump is not None:
+                _console().print(f"Crash dump: {dump}", style="dim")
 
     @staticmethod
     def handle_keyboard_interrupt(operation: str):
         """Handle keyboard interruption with a consistent message"""
-        console.print(f"\nOperation canceled", style=UIConfig.SUCCESS_STYLE)
+        if not _ui().json_output:
+            _console().print(f"\nOperation canceled", style=UIConfig.SUCCESS_STYLE)
         sys.exit(0)
 
 
 def handle_exceptions(operation: str):
-    """Decorator for handling common exceptions in CLI commands"""
+    """
+    Decorator for handling common exceptions in CLI commands.
+
+    In JSON output mode, the start and the outcome of the command are also
+    emitted as `operation` events, the latter with its duration.
+    """
 
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            ui = _ui()
+            ui.emit("operation", operation=operation, status="started")
+            started = time.perf_counter()
+
+            def finished(status: str, **fields) -> None:
+                ui.emit(
+                    "operation",
+                    operation=operation,
+                    status=status,
+                    seconds=round(time.perf_counter() - started, 6),
+                    **fields,
+                )
+
             try:
-                return func(*args, **kwargs)
-            except KeyboardInterrupt:
+                result = func(*args, **kwargs)
+            except typer.Exit as e:
+                # Deliberate exit codes of commands pass through
+                finished("ok" if not e.exit_code else "failed", code=e.exit_code)
+                raise
+            except (KeyboardInterrupt, typer.Abort):
+                # Ctrl-C, or a prompt the user cancelled: not a crash
+                finished("cancelled")
                 ErrorHandler.handle_keyboard_interrupt(operation)
             except Exception as e:
                 full_trace = kwargs.get("full_trace", False)
                 ErrorHandler.handle_error(e, full_trace, operation)
+                finished("error", error=str(e))
+            else:
+                finished("ok")
+                return result
 
         return wrapper
 
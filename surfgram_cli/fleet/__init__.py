@@ -0,0 +1,212 @@
+import asyncio
+import os
+import signal
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from surfgram_cli.config import FleetConfig, RunnerConfig
+from surfgram_cli.enums import LevelsEnum
+from surfgram_cli.utils import debugger
+
+
+class FleetMember:
+    """One bot of the fleet and its runtime state."""
+
+    def __init__(self, entry: Dict[str, Any]) -> None:
+        if not entry.get("bot"):
+            raise ValueError("Every fleet entry needs a 'bot' directory")
+        self.bot_dir = str(Path(entry["bot"]).resolve())
+        self.config: Optional[str] = entry.get("config")
+        self.name: str = entry.get("name") or Path(self.bot_dir).name
+        self.bot: Any = None
+        self.config_class: Optional[type] = None
+        self.scope: Any = None
+        self.runner: Any = None
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.failures = 0
+        self.restarts = 0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "bot": self.name,
+            "status": self.status,
+            "restarts": self.restarts,
+            "in_flight": self.runner.in_flight if self.runner else 0,
+            "offset": self.runner.offset if self.runner else None,
+            "error": self.error or "",
+        }
+
+
+class Fleet:
+    """
+    Runs many bots in one process, on one event loop.
+
+    Every bot is imported and served under its own `HandlerScope`, so
+    surfgram's handler registries, which are process-global class attributes,
+    hold each bot's own handlers. Each `.env` is applied only while its bot is
+    imported. Polling, and with `api_url` the bots' own API calls, share one
+    `AsyncConnectionPool`. A bot that crashes is restarted with backoff while
+    the others keep running.
+
+    Modules are cached per interpreter, so bots need distinct package names,
+    and a helper module imported by two bots registers its handlers only for
+    the first.
+    """
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        api_url: Optional[str] = None,
+        max_concurrent: int = RunnerConfig.MAX_CONCURRENT_HANDLERS,
+    ) -> None:
+        """
+        Initializes the Fleet.
+
+        Args:
+            entries: Manifest entries with `bot` and optional `config`/`name`.
+            api_url: Bot API server to use instead of the official one.
+            max_concurrent: Maximum number of handlers running at once per bot.
+        """
+        self.members = [FleetMember(entry) for entry in entries]
+        self.api_url = api_url
+        self.max_concurrent = max_concurrent
+        self.pool: Any = None
+        self._stopping = False
+
+    def load(self) -> None:
+        """Imports every bot under its own scope, recording failures."""
+        from surfgram.core.bot import Bot
+        from surfgram_cli.manager import BotManager
+        from surfgram_cli.utils.dispatch import redirect_api_calls
+        from surfgram_cli.utils.registries import HandlerScope, install_scopes
+        from surfgram_cli.utils.telegram import AsyncConnectionPool
+
+        install_scopes()
+        self.pool = AsyncConnectionPool()
+        packages: Dict[str, str] = {}
+        for member in self.members:
+            member.scope = HandlerScope(member.name)
+            try:
+                package = Path(member.bot_dir).name
+                if package in packages:
+                    raise ValueError(
+                        f"bot '{packages[package]}' already uses the package "
+                        f"name '{package}'"
+                    )
+                packages[package] = member.name
+                config = member.config or BotManager.find_config(
+                    member.bot_dir, interactive=False
+                )
+                with member.scope.active(), _own_environ():
+                    _, member.config_class = BotManager._load_config_class(
+                        member.bot_dir, config
+                    )
+                    member.bot = Bot(config=member.config_class)
+                redirect_api_calls(
+                    member.bot, member.config_class, self.api_url, self.pool
+                )
+                member.status = "loaded"
+                debugger.log(
+                    f"{member.name}: {member.scope.handler_count()} handler(s)",
+                    LevelsEnum.INFO,
+                )
+            except Exception as e:
+                member.status = "failed"
+                member.error = f"Loading failed: {e}"
+                debugger.log(f"{member.name}: {member.error}", LevelsEnum.ERROR)
+
+    async def _run_member(self, member: FleetMember) -> None:
+        """Serves one bot, restarting its runner with backoff on failure."""
+        from surfgram_cli.runner import UpdateRunner
+        from surfgram_cli.utils.dispatch import get_bot_token
+        from surfgram_cli.utils.telegram import AsyncTelegramClient
+
+        # Runs as its own task, so the scope stays with this bot's handlers
+        member.scope.enter()
+        offset = None
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                client = AsyncTelegramClient(
+                    get_bot_token(member.config_class), self.api_url, self.pool
+                )
+                member.runner = UpdateRunner(
+                    member.bot,
+                    client,
+                    offset=offset,
+                    max_concurrent=self.max_concurrent,
+                )
+                member.status = "running"
+                await member.runner.serve()
+                if self._stopping:
+                    member.status = "stopped"
+                    return
+                raise RuntimeError("Polling stopped unexpectedly")
+            except Exception as e:
+                offset = member.runner.offset if member.runner else offset
+                if time.monotonic() - started > FleetConfig.RESTART_BACKOFF_MAX:
+                    member.failures = 0
+                backoff = min(
+                    FleetConfig.RESTART_BACKOFF_BASE * 2**member.failures,
+                    FleetConfig.RESTART_BACKOFF_MAX,
+                )
+                member.failures += 1
+                member.restarts += 1
+                member.status = "restarting"
+                member.error = repr(e)
+                debugger.log(
+                    f"{member.name} crashed: {e!r}, restarting in {backoff:.0f}s",
+                    LevelsEnum.ERROR,
+                )
+                await asyncio.sleep(backoff)
+
+    def stop(self) -> None:
+        """Stops all bots; each drains its in-flight handlers."""
+        self._stopping = True
+        for member in self.members:
+            if member.runner is not None:
+                member.runner.request_stop()
+
+    async def serve(self) -> List[Dict[str, Any]]:
+        """
+        Runs the loaded bots until stopped.
+
+        Returns:
+            One status row per bot.
+        """
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        running = [m for m in self.members if m.status == "loaded"]
+        debugger.log(
+            f"Fleet running {len(running)} of {len(self.members)} bot(s)",
+            LevelsEnum.INFO,
+        )
+        try:
+            await asyncio.gather(*(self._run_member(m) for m in running))
+        finally:
+            self.pool.close()
+        return [member.report() for member in self.members]
+
+    def run(self) -> List[Dict[str, Any]]:
+        """Loads and runs the fleet on a new event loop. Blocks."""
+        self.load()
+        return asyncio.run(self.serve())
+
+
+@contextmanager
+def _own_environ() -> Iterator[None]:
+    """Undoes what a bot's `.env` adds to `os.environ` once it is imported."""
+    saved = dict(os.environ)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
@@ -4,12 +4,23 @@ import sys
 import importlib
 import inspect
 import threading
+import time
 from pathlib import Path
-from typing import Optional, Tuple
-from jinja2 import Environment, FileSystemLoader
-from surfgram import configs as surfgram_configs
-from surfgram_cli.utils import monitor_changes, debugger
+from typing import Any, Dict, List, Optional, Tuple
+from surfgram_cli.utils import debugger
+from surfgram_cli.enums import LevelsEnum, LoopEnum, OutputEnum, ReloadModeEnum
+from surfgram_cli.config import (
+    BenchConfig,
+    MemoryConfig,
+    MetricsConfig,
+    ProfilerConfig,
+    ReloadConfig,
+    RunnerConfig,
+    ScaffoldConfig,
+    WebhookConfig,
+)
 from surfgram_cli.cli import console
+from surfgram_cli.manager import config_loader
 
 
 class BotManager:
@@ -18,11 +29,9 @@ class BotManager:
     @staticmethod
     def create_bot(bot_name: str, token: str) -> bool:
         """Creates a bot structure from templates."""
-        templates_dir = Path(__file__).parent.parent / "templates" / "bot_structure"
-        if not templates_dir.exists():
-            raise FileNotFoundError(f"Templates directory not found: {templates_dir}")
+        from surfgram_cli.manager import scaffold
 
-        env = Environment(loader=FileSystemLoader(templates_dir))
+        templates = scaffold.compile_templates()
         bot_path = Path(bot_name)
 
         if bot_path.exists():
@@ -33,17 +42,22 @@ class BotManager:
                 != "y"
             ):
                 return False
-            shutil.rmtree(bot_path)
 
-        bot_path.mkdir()
-        for template in env.list_templates():
-            output = bot_path / template.replace(".j2", "")
-            output.parent.mkdir(parents=True, exist_ok=True)
-            output.write_text(
-                env.get_template(template).render(bot_name=bot_name, token=token)
-            )
+        files = scaffold.render_bot(templates, bot_name, token)
+        scaffold.write_bot(bot_path, files, overwrite=True)
         return True
 
+    @staticmethod
+    def create_bots(
+        manifest: str, jobs: int = ScaffoldConfig.JOBS, overwrite: bool = False
+    ) -> Dict[str, Any]:
+        """Creates every bot listed in a JSON/YAML manifest."""
+        from surfgram_cli.manager import scaffold
+        from surfgram_cli.utils.manifest import load_manifest, manifest_entries
+
+        entries = manifest_entries(load_manifest(manifest))
+        return scaffold.create_bots(entries, jobs=jobs, overwrite=overwrite)
+
     @staticmethod
     def delete_bot(bot_name: str) -> None:
         """Deletes a bot directory."""
@@ -53,8 +67,10 @@ class BotManager:
         shutil.rmtree(path)
 
     @staticmethod
-    def find_config(bot_dir: Optional[str] = None) -> str:
+    def find_config(bot_dir: Optional[str] = None, interactive: bool = True) -> str:
         """Finds and validates the bot config class."""
+        from surfgram_cli.manager.discovery import discover_config_classes
+
         target_dir = Path(bot_dir) if bot_dir else Path.cwd()
         target_dir = target_dir.resolve()
 
@@ -67,28 +83,15 @@ class BotManager:
                 f"Solution: Add __init__.py file to make it a proper package"
             )
 
-        sys.path.insert(0, str(target_dir.parent))
         module_name = target_dir.name
-
-        try:
-            bot_module = importlib.import_module(module_name)
-        except ModuleNotFoundError as e:
-            if e.name == module_name:
-                raise ImportError(
-                    f"Failed to import '{module_name}'\n"
-                    f"Possible causes:\n"
-                    f"1. Missing __init__.py\n"
-                    f"2. Incorrect Python package structure"
-                ) from e
-            raise
-
-        config_classes = [
-            name
-            for name, cls in inspect.getmembers(bot_module, inspect.isclass)
-            if isinstance(cls, type)
-            and issubclass(cls, surfgram_configs.BaseConfig)
-            and cls != surfgram_configs.BaseConfig
-        ]
+        config_classes = discover_config_classes(target_dir)
+        if config_classes:
+            debugger.log(
+                f"Config classes found statically: {', '.join(config_classes)}",
+                LevelsEnum.INFO,
+            )
+        else:
+            config_classes = BotManager._import_config_classes(target_dir)
 
         if not config_classes:
             raise AttributeError(
@@ -101,6 +104,13 @@ class BotManager:
         if len(config_classes) == 1:
             return f"{module_name}.{config_classes[0]}"
 
+        if not interactive:
+            raise ValueError(
+                f"Multiple configs found in {module_name}: "
+                f"{', '.join(config_classes)}\n"
+                f"Specify one explicitly"
+            )
+
         console.print_cancel(f"Multiple configs found in {module_name}:")
         for i, name in enumerate(config_classes, 1):
             console.print_cancel(f"{i}. {module_name}.{name}")
@@ -111,6 +121,34 @@ class BotManager:
         except (ValueError, IndexError) as e:
             raise ValueError("Invalid selection. Please enter a valid number.") from e
 
+    @staticmethod
+    def _import_config_classes(target_dir: Path) -> List[str]:
+        """Imports the bot package and lists its BaseConfig subclasses."""
+        from surfgram import configs as surfgram_configs
+
+        sys.path.insert(0, str(target_dir.parent))
+        module_name = target_dir.name
+
+        try:
+            bot_module = importlib.import_module(module_name)
+        except ModuleNotFoundError as e:
+            if e.name == module_name:
+                raise ImportError(
+                    f"Failed to import '{module_name}'\n"
+                    f"Possible causes:\n"
+                    f"1. Missing __init__.py\n"
+                    f"2. Incorrect Python package structure"
+                ) from e
+            raise
+
+        return [
+            name
+            for name, cls in inspect.getmembers(bot_module, inspect.isclass)
+            if isinstance(cls, type)
+            and issubclass(cls, surfgram_configs.BaseConfig)
+            and cls != surfgram_configs.BaseConfig
+        ]
+
     @staticmethod
     def _parse_config(config: str) -> Tuple[str, str]:
         """Splits config path into module and class name."""
@@ -134,33 +172,21 @@ class BotManager:
         return config_class
 
     @staticmethod
-    def _cast_config_values(config_instance) -> None:
-        """Auto-casts string numbers to int/float in config."""
-        for field, value in vars(config_instance).items():
-            if isinstance(value, str):
-                if value.isdigit():
-                    setattr(config_instance, field, int(value))
-                elif value.replace(".", "", 1).isdigit() and value.count(".") == 1:
-                    setattr(config_instance, field, float(value))
-
-    @staticmethod
-    def run_bot(bot: str, config: str, debug: bool, on_reload: bool) -> None:
-        """Runs the bot with the given configuration."""
-        from surfgram.core.bot import Bot
-
+    def _load_config_class(bot: str, config: str) -> Tuple[Path, type]:
+        """Imports the bot package and returns its directory and config class."""
         bot_dir = Path(bot).resolve() if bot != "." else Path.cwd()
         if not bot_dir.exists():
             raise FileNotFoundError(f"Bot directory not found: {bot_dir}")
 
         sys.path.insert(0, str(bot_dir.parent))
+        started = time.perf_counter()
 
         try:
             module_name, class_name = BotManager._parse_config(config)
+            config_loader.load_env(bot_dir)
             module = importlib.import_module(module_name)
             config_class = BotManager._validate_config_class(module, class_name)
-
-            temp_config = config_class()
-            BotManager._cast_config_values(temp_config)
+            config_loader.validate_config(config_class)
 
         except ModuleNotFoundError as e:
             if e.name == module_name:
@@ -172,12 +198,390 @@ class BotManager:
                 ) from e
             raise
 
+        debugger.log(
+            f"Config {config} loaded in {(time.perf_counter() - started) * 1000:.1f} ms",
+            LevelsEnum.INFO,
+        )
+        return bot_dir, config_class
+
+    @staticmethod
+    def run_bot(
+        bot: str,
+        config: str,
+        debug: bool,
+        on_reload: bool,
+        reload_mode: ReloadModeEnum = ReloadModeEnum.RESTART,
+        reload_debounce: float = ReloadConfig.DEBOUNCE_SECONDS,
+        reload_include: Optional[List[str]] = None,
+        reload_exclude: Optional[List[str]] = None,
+        workers: int = 1,
+        log_json: Optional[str] = None,
+        api_url: Optional[str] = None,
+        profile: Optional[str] = None,
+        profile_interval: float = ProfilerConfig.INTERVAL,
+        metrics_port: Optional[int] = None,
+        metrics_host: str = MetricsConfig.HOST,
+        record: Optional[str] = None,
+        webhook: bool = False,
+        webhook_host: str = WebhookConfig.HOST,
+        webhook_port: int = WebhookConfig.PORT,
+        webhook_path: str = WebhookConfig.PATH,
+        webhook_secret: Optional[str] = None,
+        webhook_url: Optional[str] = None,
+        loop: LoopEnum = LoopEnum.AUTO,
+        executor_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        memory_report: Optional[str] = None,
+        memory_interval: float = MemoryConfig.INTERVAL,
+        memory_rss_limit: Optional[float] = None,
+        state_file: Optional[str] = None,
+        drain_timeout: float = RunnerConfig.DRAIN_TIMEOUT,
+    ) -> None:
+        """Runs the bot with the given configuration."""
+        from surfgram_cli.supervisor.bluegreen import ControlChannel
+
+        if workers > 1 and on_reload:
+            raise ValueError("--workers can't be combined with --autoreload")
+        if workers > 1 and reload_mode == ReloadModeEnum.BLUEGREEN:
+            raise ValueError("--workers can't be combined with --reload-mode bluegreen")
+        if profile and (workers > 1 or reload_mode == ReloadModeEnum.BLUEGREEN):
+            raise ValueError(
+                "--profile samples the bot in this process and can't be combined "
+                "with --workers or --reload-mode bluegreen"
+            )
+        if memory_report and (workers > 1 or reload_mode == ReloadModeEnum.BLUEGREEN):
+            raise ValueError(
+                "--memory-report traces the bot in this process and can't be "
+                "combined with --workers or --reload-mode bluegreen"
+            )
+        if metrics_port is not None and reload_mode == ReloadModeEnum.BLUEGREEN:
+            raise ValueError(
+                "--metrics-port can't be combined with --reload-mode bluegreen"
+            )
+        if record and reload_mode == ReloadModeEnum.BLUEGREEN:
+            raise ValueError("--record can't be combined with --reload-mode bluegreen")
+        if webhook and (workers > 1 or reload_mode == ReloadModeEnum.BLUEGREEN):
+            raise ValueError(
+                "--webhook can't be combined with --workers or --reload-mode bluegreen"
+            )
+        if state_file and (webhook or reload_mode == ReloadModeEnum.BLUEGREEN):
+            raise ValueError(
+                "--state-file keeps the polling offset and can't be combined with "
+                "--webhook or --reload-mode bluegreen"
+            )
+
         debugger.debug_mode = debug
+        if log_json:
+            from surfgram_cli.utils.debug import JsonLinesSink
+
+            debugger.add_sink(JsonLinesSink(log_json))
+
+        channel = ControlChannel.from_environment()
+        if channel is None and reload_mode == ReloadModeEnum.BLUEGREEN:
+            from surfgram_cli.supervisor.bluegreen import BlueGreenLauncher
+
+            runtime_args = ["--loop", loop.value]
+            if executor_workers is not None:
+                runtime_args += ["--executor-workers", str(executor_workers)]
+            if max_concurrency is not None:
+                runtime_args += ["--max-concurrency", str(max_concurrency)]
+            runtime_args += ["--drain-timeout", str(drain_timeout)]
+
+            BlueGreenLauncher(
+                str(Path(bot).resolve()),
+                config,
+                debug=debug,
+                log_json=log_json,
+                autoreload=on_reload,
+                reload_debounce=reload_debounce,
+                reload_include=reload_include,
+                reload_exclude=reload_exclude,
+                api_url=api_url,
+                runtime_args=runtime_args,
+                drain_timeout=drain_timeout,
+                output=OutputEnum.JSON if console.json_output else OutputEnum.TEXT,
+            ).run()
+            return
+
+        from surfgram_cli.utils.runtime import configure_runtime
+
+        configure_runtime(loop, executor_workers)
+        max_concurrent = max_concurrency or RunnerConfig.MAX_CONCURRENT_HANDLERS
+
+        bot_dir, config_class = BotManager._load_config_class(bot, config)
+
+        if metrics_port is not None:
+            from surfgram_cli.utils.metrics import metrics
+
+            url = metrics.serve(metrics_port, metrics_host)
+            debugger.log(f"Serving metrics on {url}", LevelsEnum.INFO)
+
+        recorder = None
+        if record:
+            from surfgram_cli.utils.capture import UpdateRecorder
+
+            recorder = UpdateRecorder(record)
+            debugger.log(f"Recording updates to {record}", LevelsEnum.INFO)
+
+        offsets = None
+        if state_file:
+            from surfgram_cli.utils.dispatch import get_bot_token
+            from surfgram_cli.utils.offsets import OffsetStore
+
+            offsets = OffsetStore(state_file, get_bot_token(config_class))
+
+        if workers > 1:
+            from surfgram_cli.supervisor import Supervisor
+
+            try:
+                report = Supervisor(
+                    config_class,
+                    workers,
+                    debug=debug,
+                    api_url=api_url,
+                    recorder=recorder,
+                    max_concurrent=max_concurrent,
+                    offsets=offsets,
+                    stop_timeout=drain_timeout,
+                ).run()
+            finally:
+                if recorder is not None:
+                    recorder.close()
+            console.print_worker_health(report)
+            return
+
+        from surfgram.core.bot import Bot
+        from surfgram_cli.utils.dispatch import redirect_api_calls
+
         bot_instance = Bot(config=config_class)
+        redirect_api_calls(bot_instance, config_class, api_url)
+
+        if channel is not None:
+            from surfgram_cli.supervisor.bluegreen import run_generation
+            from surfgram_cli.utils.dispatch import get_bot_token
+            from surfgram_cli.utils.telegram import TelegramClient
+
+            client = TelegramClient(get_bot_token(config_class), api_url)
+            run_generation(
+                channel, bot_instance, client, max_concurrent, drain_timeout
+            )
+            return
+
+        runner = None
+        if not webhook:
+            # The CLI polls instead of surfgram's `Bot.listen()`, which can't
+            # bound, observe or drain its handlers
+            from surfgram_cli.runner import UpdateRunner
+            from surfgram_cli.utils.dispatch import get_bot_token
+            from surfgram_cli.utils.telegram import TelegramClient
+
+            if api_url:
+                debugger.log(f"Polling updates from {api_url}", LevelsEnum.INFO)
+            client = TelegramClient(get_bot_token(config_class), api_url)
+            runner = UpdateRunner(
+                bot_instance,
+                client,
+                max_concurrent=max_concurrent,
+                drain_timeout=drain_timeout,
+                recorder=recorder,
+                offsets=offsets,
+            )
 
         if on_reload:
+            from surfgram_cli.utils import monitor_changes
+
             threading.Thread(
-                target=monitor_changes, args=(bot_instance, str(bot_dir)), daemon=True
+                target=monitor_changes,
+                args=(bot_instance, str(bot_dir), reload_mode),
+                kwargs=dict(
+                    debounce=reload_debounce,
+                    include=reload_include,
+                    exclude=reload_exclude,
+                    # A restart drains in-flight handlers and saves the offset
+                    before_restart=runner.shutdown if runner is not None else None,
+                    config_class=config_class,
+                ),
+                daemon=True,
             ).start()
 
-        bot_instance.listen()
+        profiler = None
+        if profile:
+            from surfgram_cli.utils.profiler import SamplingProfiler
+
+            profiler = SamplingProfiler(profile, str(bot_dir), profile_interval)
+            profiler.start()
+
+        memory_reporter = None
+        if memory_report:
+            from surfgram_cli.utils.memory import MemoryReporter
+
+            memory_reporter = MemoryReporter(
+                str(bot_dir), memory_report, memory_interval, memory_rss_limit
+            )
+            memory_reporter.start()
+
+        try:
+            if webhook:
+                BotManager._serve_webhook(
+                    bot_instance,
+                    config_class,
+                    host=webhook_host,
+                    port=webhook_port,
+                    path=webhook_path,
+                    secret=webhook_secret,
+                    url=webhook_url,
+                    api_url=api_url,
+                    recorder=recorder,
+                    max_concurrent=max_concurrent,
+                    drain_timeout=drain_timeout,
+                )
+            else:
+                runner.run(handle_signals=True)
+        finally:
+            if recorder is not None:
+                recorder.close()
+                debugger.log(
+                    f"Recorded {recorder.count} update(s) to {record}", LevelsEnum.INFO
+                )
+            if profiler is not None:
+                profiler.stop()
+                if console.json_output:
+                    console.emit(
+                        "profile",
+                        output=profiler.output,
+                        handlers=dict(profiler.handler_totals()),
+                        idle_samples=profiler.idle,
+                    )
+                else:
+                    from surfgram_cli.utils.profiler import print_profile_report
+
+                    print_profile_report(profiler)
+            if memory_reporter is not None:
+                report = memory_reporter.stop()
+                if console.json_output:
+                    console.emit("memory_report", **report)
+                else:
+                    from surfgram_cli.utils.memory import print_memory_report
+
+                    print_memory_report(memory_reporter, report)
+
+            from surfgram_cli.utils.crash import errors
+
+            for summary in errors.flush():
+                debugger.log(summary, LevelsEnum.ERROR)
+
+    @staticmethod
+    def _serve_webhook(
+        bot_instance: Any,
+        config_class: type,
+        host: str,
+        port: int,
+        path: str,
+        secret: Optional[str],
+        url: Optional[str],
+        api_url: Optional[str],
+        recorder: Any,
+        max_concurrent: int,
+        drain_timeout: float,
+    ) -> None:
+        """Registers the webhook if a public URL is given and serves it."""
+        from surfgram_cli.webhook import WebhookServer
+
+        if url:
+            import secrets
+            from surfgram_cli.utils.dispatch import get_bot_token
+            from surfgram_cli.utils.telegram import TelegramClient
+
+            secret = secret or secrets.token_urlsafe(32)
+            TelegramClient(get_bot_token(config_class), api_url).call(
+                "setWebhook", url=url, secret_token=secret
+            )
+            debugger.log(f"Webhook registered at {url}", LevelsEnum.INFO)
+        elif secret is None:
+            debugger.log(
+                "No --webhook-secret set: requests are not authenticated",
+                LevelsEnum.ERROR,
+            )
+
+        counts = WebhookServer(
+            bot_instance,
+            host=host,
+            port=port,
+            path=path,
+            secret_token=secret,
+            max_concurrent=max_concurrent,
+            drain_timeout=drain_timeout,
+            recorder=recorder,
+        ).run()
+        debugger.log(
+            f"Webhook stopped: {counts['received']} update(s) received, "
+            f"{counts['rejected']} rejected while full or shutting down",
+            LevelsEnum.INFO,
+        )
+
+    @staticmethod
+    def run_fleet(
+        manifest: str,
+        debug: bool = False,
+        api_url: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Runs every bot listed in a manifest in this process, on one event loop."""
+        from surfgram_cli.fleet import Fleet
+        from surfgram_cli.utils.manifest import load_manifest, manifest_entries
+
+        debugger.debug_mode = debug
+        entries = manifest_entries(load_manifest(manifest))
+        if not entries:
+            raise ValueError(f"Manifest {manifest} lists no bots")
+        return Fleet(entries, api_url=api_url).run()
+
+    @staticmethod
+    def bench_bot(
+        bot: str,
+        config: str,
+        updates: int = BenchConfig.UPDATES,
+        kinds: Optional[List[str]] = None,
+        concurrency: int = BenchConfig.CONCURRENCY,
+        warmup: int = BenchConfig.WARMUP,
+        seed: int = 0,
+    ) -> Dict[str, Any]:
+        """Measures the bot's handlers on synthetic updates, without the network."""
+        from surfgram.core.bot import Bot
+        from surfgram_cli.bench import Benchmark, synthetic_updates
+
+        _, config_class = BotManager._load_config_class(bot, config)
+        bot_instance = Bot(config=config_class)
+
+        stream = synthetic_updates(
+            updates, kinds or BenchConfig.UPDATE_KINDS, seed=seed
+        )
+        report = Benchmark(
+            bot_instance, stream, concurrency=concurrency, warmup=warmup
+        ).run()
+        report.update(bot=str(Path(bot).resolve()), config=config)
+        return report
+
+    @staticmethod
+    def replay_bot(
+        bot: str,
+        config: str,
+        capture: str,
+        speed: Optional[float] = None,
+        concurrency: int = BenchConfig.CONCURRENCY,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Feeds updates recorded with `run --record` into the bot's handlers."""
+        from surfgram.core.bot import Bot
+        from surfgram_cli.bench.replay import Replayer
+
+        if not Path(capture).is_file():
+            raise FileNotFoundError(f"Capture {capture} not found")
+
+        _, config_class = BotManager._load_config_class(bot, config)
+        bot_instance = Bot(config=config_class)
+
+        report = Replayer(
+            bot_instance, capture, speed=speed, concurrency=concurrency, limit=limit
+        ).run()
+        report.update(bot=str(Path(bot).resolve()), config=config, capture=capture)
+        return report
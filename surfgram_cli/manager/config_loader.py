@@ -0,0 +1,259 @@
+import os
+import types
+import typing
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Modules whose annotations describe the framework, not the bot's settings
+FRAMEWORK_MODULES = ("surfgram", "builtins")
+
+# `X | None` unions have their own origin on Python 3.10+
+UNION_TYPES = (typing.Union, getattr(types, "UnionType", typing.Union))
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+# path -> (mtime_ns, size, values)
+_env_cache: Dict[str, Tuple[int, int, Dict[str, str]]] = {}
+# config class -> compiled schema
+_schemas: "weakref.WeakKeyDictionary[type, ConfigSchema]" = weakref.WeakKeyDictionary()
+
+
+def parse_env_file(path: Path) -> Dict[str, str]:
+    """
+    Parses a `.env` file with python-dotenv, reusing the previous result
+    while the file's mtime and size are unchanged.
+
+    Args:
+        path: Path to the `.env` file.
+
+    Returns:
+        The variables defined in the file; empty if it doesn't exist.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return {}
+
+    key = str(path)
+    cached = _env_cache.get(key)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    from dotenv import dotenv_values
+
+    values = {k: v for k, v in dotenv_values(path).items() if v is not None}
+    _env_cache[key] = (stat.st_mtime_ns, stat.st_size, values)
+    return values
+
+
+def load_env(bot_dir: Path) -> Dict[str, str]:
+    """
+    Loads the bot's `.env` file into `os.environ` without overriding
+    variables that are already set, like `load_dotenv()` does.
+
+    The file is looked up in the bot directory, then in the current one.
+    Loading it before the config module is imported lets `os.getenv` calls
+    in the config see the values.
+    """
+    for candidate in (bot_dir / ".env", Path.cwd() / ".env"):
+        if candidate.is_file():
+            values = parse_env_file(candidate)
+            for name, value in values.items():
+                os.environ.setdefault(name, value)
+            return values
+    return {}
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.strip().lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"expected one of {', '.join(sorted(_TRUE | _FALSE))}")
+
+
+def _converter(annotation: Any) -> Tuple[Optional[Callable[[Any], Any]], bool]:
+    """
+    Builds a converter for an annotation.
+
+    Returns:
+        The converter, or None for annotations that aren't checked, and
+        whether None is an accepted value.
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin in UNION_TYPES:
+        members = [arg for arg in args if arg is not type(None)]
+        optional = len(members) < len(args)
+        if len(members) == 1:
+            return _converter(members[0])[0], optional
+        return None, optional
+
+    if origin in (list, tuple, set, frozenset) and len(args) <= 2:
+        item = _converter(args[0])[0] if args and args[0] is not Ellipsis else None
+        container = origin
+
+        def convert_sequence(value: Any) -> Any:
+            items = value.split(",") if isinstance(value, str) else value
+            if isinstance(value, str):
+                items = [part.strip() for part in items if part.strip()]
+            return container(item(v) if item else v for v in items)
+
+        return convert_sequence, False
+
+    if annotation is bool:
+
+        def convert_bool(value: Any) -> bool:
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str):
+                return _parse_bool(value)
+            raise TypeError(f"expected bool, got {type(value).__name__}")
+
+        return convert_bool, False
+
+    if annotation in (int, float):
+
+        def convert_number(value: Any) -> Any:
+            if isinstance(value, bool):
+                raise TypeError(f"expected {annotation.__name__}, got bool")
+            if isinstance(value, str):
+                return annotation(value.strip())
+            if isinstance(value, (int, float)):
+                return annotation(value)
+            raise TypeError(
+                f"expected {annotation.__name__}, got {type(value).__name__}"
+            )
+
+        return convert_number, False
+
+    if annotation is str:
+
+        def convert_str(value: Any) -> str:
+            if not isinstance(value, str):
+                raise TypeError(f"expected str, got {type(value).__name__}")
+            return value
+
+        return convert_str, False
+
+    if isinstance(annotation, type) and issubclass(annotation, os.PathLike):
+        return lambda value: annotation(value), False
+
+    if isinstance(annotation, type) and annotation is not Any:
+
+        def check_instance(value: Any) -> Any:
+            if not isinstance(value, annotation):
+                raise TypeError(
+                    f"expected {annotation.__name__}, got {type(value).__name__}"
+                )
+            return value
+
+        return check_instance, False
+
+    return None, True
+
+
+class ConfigSchema:
+    """
+    The typed fields of a config class, compiled from its annotations once.
+
+    Only fields annotated in the bot's own classes are part of the schema;
+    annotations inherited from surfgram's `BaseConfig` are left to surfgram.
+    """
+
+    def __init__(self, config_class: type) -> None:
+        """
+        Initializes the ConfigSchema.
+
+        Args:
+            config_class: The `BaseConfig` subclass.
+        """
+        own_fields = set()
+        for klass in config_class.__mro__:
+            module = getattr(klass, "__module__", "") or ""
+            if module.partition(".")[0] in FRAMEWORK_MODULES:
+                continue
+            own_fields.update(vars(klass).get("__annotations__", {}))
+
+        try:
+            hints = typing.get_type_hints(config_class)
+        except Exception:
+            hints = {
+                name: annotation
+                for klass in reversed(config_class.__mro__)
+                for name, annotation in vars(klass).get("__annotations__", {}).items()
+                if not isinstance(annotation, str)
+            }
+
+        # (name, converter, optional)
+        self.fields: List[Tuple[str, Optional[Callable[[Any], Any]], bool]] = []
+        for name in sorted(own_fields):
+            if name not in hints or typing.get_origin(hints[name]) is typing.ClassVar:
+                continue
+            converter, optional = _converter(hints[name])
+            self.fields.append((name, converter, optional))
+
+    def apply(
+        self, config_class: type, environ: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Checks and converts the field values of `config_class` in place.
+
+        A field declared without a value is read from the environment
+        variable of the same name.
+
+        Raises:
+            ValueError: Listing every missing or invalid field at once.
+        """
+        environ = os.environ if environ is None else environ
+        errors = []
+        converted = {}
+        for name, converter, optional in self.fields:
+            if hasattr(config_class, name):
+                value = getattr(config_class, name)
+            elif name in environ:
+                value = environ[name]
+            else:
+                errors.append(f"{name}: no value and no environment variable {name}")
+                continue
+
+            if value is None:
+                if not optional:
+                    errors.append(f"{name}: is not set")
+                continue
+            if converter is None:
+                continue
+            try:
+                converted[name] = converter(value)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{name}: {e} (value {value!r})")
+
+        if errors:
+            raise ValueError(
+                f"Invalid config {config_class.__name__}:\n"
+                + "\n".join(f"  - {error}" for error in errors)
+            )
+        for name, value in converted.items():
+            setattr(config_class, name, value)
+
+
+def compile_schema(config_class: type) -> ConfigSchema:
+    """Returns the schema of a config class, compiling it on first use."""
+    schema = _schemas.get(config_class)
+    if schema is None:
+        schema = _schemas[config_class] = ConfigSchema(config_class)
+    return schema
+
+
+def validate_config(config_class: type) -> None:
+    """
+    Converts the annotated fields of a config class to their declared types.
+
+    Raises:
+        ValueError: Listing every missing or invalid field at once.
+    """
+    compile_schema(config_class).apply(config_class)
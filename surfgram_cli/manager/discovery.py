@@ -0,0 +1,222 @@
+import ast
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from surfgram_cli.config import CacheConfig
+from surfgram_cli.utils import cache
+
+# Fully qualified names under which surfgram exposes the config base class
+BASE_CONFIG_NAMES = {"surfgram.configs.BaseConfig", "surfgram.BaseConfig"}
+
+
+class _ModuleInfo:
+    """Classes and imported names of one module, as read from its source."""
+
+    def __init__(self) -> None:
+        # class name -> dotted base expressions
+        self.classes: Dict[str, List[str]] = {}
+        # local name -> (module, attribute or None for `import module`)
+        self.imports: Dict[str, Tuple[str, Optional[str]]] = {}
+        # modules imported with `from module import *`
+        self.star_imports: List[str] = []
+
+
+def _dotted(node: ast.expr) -> Optional[str]:
+    """Returns `a.b.c` for Name/Attribute chains, None for anything else."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted(node.value)
+        return f"{parent}.{node.attr}" if parent else None
+    return None
+
+
+def _resolve_relative(module: str, is_package: bool, level: int, target: str) -> str:
+    """Resolves a relative import the way the import system would."""
+    if not level:
+        return target
+    package = module if is_package else module.rpartition(".")[0]
+    for _ in range(level - 1):
+        package = package.rpartition(".")[0]
+    return f"{package}.{target}" if target else package
+
+
+class StaticConfigFinder:
+    """
+    Finds `BaseConfig` subclasses exported by a bot package without importing it.
+
+    Every module of the package is parsed with `ast`. A class counts as a
+    config when one of its bases resolves to surfgram's `BaseConfig`, directly
+    or through other config classes of the package. Like the import-based
+    check, only names reachable from the package's `__init__.py` are returned.
+    """
+
+    def __init__(self, package_dir: Path) -> None:
+        """
+        Initializes the StaticConfigFinder.
+
+        Args:
+            package_dir: The bot package directory.
+        """
+        self.package_dir = package_dir
+        self.package = package_dir.name
+        self.modules: Dict[str, _ModuleInfo] = {}
+
+    def _module_name(self, path: Path) -> Tuple[str, bool]:
+        relative = path.relative_to(self.package_dir).with_suffix("")
+        parts = [self.package, *relative.parts]
+        is_package = parts[-1] == "__init__"
+        if is_package:
+            parts.pop()
+        return ".".join(parts), is_package
+
+    def _parse(self, path: Path) -> None:
+        name, is_package = self._module_name(path)
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+        info = _ModuleInfo()
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                info.classes[node.name] = [
+                    dotted for dotted in map(_dotted, node.bases) if dotted
+                ]
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        info.imports[alias.asname] = (alias.name, None)
+                    else:
+                        head = alias.name.partition(".")[0]
+                        info.imports[head] = (head, None)
+            elif isinstance(node, ast.ImportFrom):
+                source = _resolve_relative(
+                    name, is_package, node.level, node.module or ""
+                )
+                for alias in node.names:
+                    if alias.name == "*":
+                        info.star_imports.append(source)
+                    else:
+                        info.imports[alias.asname or alias.name] = (source, alias.name)
+        self.modules[name] = info
+
+    def _qualify(self, module: str, dotted: str) -> str:
+        """Turns a dotted expression used in a module into a fully qualified name."""
+        head, _, rest = dotted.partition(".")
+        info = self.modules.get(module)
+        if info and head in info.imports:
+            source, attribute = info.imports[head]
+            base = f"{source}.{attribute}" if attribute else source
+        elif info and head in info.classes:
+            base = f"{module}.{head}"
+        else:
+            base = head
+        return f"{base}.{rest}" if rest else base
+
+    def _is_config_name(self, qualified: str, seen: Set[str]) -> bool:
+        if qualified in BASE_CONFIG_NAMES:
+            return True
+        module, _, name = qualified.rpartition(".")
+        return module in self.modules and self._is_config(module, name, seen)
+
+    def _is_config(self, module: str, name: str, seen: Set[str]) -> bool:
+        """Checks whether `name` in `module` is a config class."""
+        key = f"{module}.{name}"
+        if key in seen:
+            return False
+        seen.add(key)
+
+        info = self.modules[module]
+        if name in info.classes:
+            return any(
+                self._is_config_name(self._qualify(module, base), seen)
+                for base in info.classes[name]
+            )
+        if name in info.imports:
+            source, attribute = info.imports[name]
+            return attribute is not None and self._is_config_name(
+                f"{source}.{attribute}", seen
+            )
+        return any(
+            source in self.modules and self._is_config(source, name, seen)
+            for source in info.star_imports
+        )
+
+    def _exported_names(self, module: str, seen: Set[str]) -> Set[str]:
+        """Names visible as attributes of a module, following star imports."""
+        if module in seen or module not in self.modules:
+            return set()
+        seen.add(module)
+        info = self.modules[module]
+        names = set(info.classes) | set(info.imports)
+        for source in info.star_imports:
+            names |= {
+                n for n in self._exported_names(source, seen) if not n.startswith("_")
+            }
+        return names
+
+    def find(self) -> List[str]:
+        """
+        Returns the names of the config classes exported by the package.
+
+        Raises:
+            SyntaxError: If a module of the package can't be parsed.
+        """
+        for path in sorted(self.package_dir.rglob("*.py")):
+            self._parse(path)
+        if self.package not in self.modules:
+            return []
+
+        exported = self._exported_names(self.package, set())
+        return sorted(
+            name
+            for name in exported
+            if self._is_config(self.package, name, set())
+            and self._qualify(self.package, name) not in BASE_CONFIG_NAMES
+        )
+
+
+def _fingerprint(package_dir: Path) -> List[Tuple[str, int, int]]:
+    """Relative path, mtime and size of every Python file in the package."""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                stat = os.stat(os.path.join(dirpath, filename))
+                relative = os.path.relpath(os.path.join(dirpath, filename), package_dir)
+                entries.append((relative, stat.st_mtime_ns, stat.st_size))
+    return sorted(entries)
+
+
+def discover_config_classes(package_dir: Path) -> Optional[List[str]]:
+    """
+    Statically finds the config classes of a bot package, using the on-disk
+    cache when no file of the package has changed.
+
+    Args:
+        package_dir: The bot package directory.
+
+    Returns:
+        Names of the config classes, or None if static discovery wasn't
+        conclusive (unparsable sources or no match) and the package has to
+        be imported instead.
+    """
+    fingerprint = cache.cache_key(_fingerprint(package_dir))
+    entry_path = (
+        cache.user_cache_dir()
+        / CacheConfig.DISCOVERY_SUBDIR
+        / f"{cache.cache_key(str(package_dir))}.json"
+    )
+
+    if cache.cache_enabled():
+        entry = cache.read_json(entry_path)
+        if isinstance(entry, dict) and entry.get("fingerprint") == fingerprint:
+            return entry.get("classes") or None
+
+    try:
+        classes = StaticConfigFinder(package_dir).find()
+    except (SyntaxError, ValueError, OSError):
+        return None
+
+    if cache.cache_enabled():
+        cache.write_json(entry_path, {"fingerprint": fingerprint, "classes": classes})
+    return classes or None
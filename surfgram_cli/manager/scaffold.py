@@ -0,0 +1,173 @@
+import keyword
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from surfgram_cli.config import CacheConfig, ScaffoldConfig
+from surfgram_cli.utils import cache
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "bot_structure"
+
+_environment = None
+
+
+def template_environment():
+    """
+    Returns the shared jinja2 environment for the bot templates.
+
+    Compiled templates are kept in a bytecode cache in the user cache
+    directory; jinja2 keys it by template source, so edited templates are
+    recompiled automatically.
+    """
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+        if not TEMPLATES_DIR.exists():
+            raise FileNotFoundError(f"Templates directory not found: {TEMPLATES_DIR}")
+
+        bytecode_cache = None
+        if cache.cache_enabled():
+            cache_dir = cache.user_cache_dir() / CacheConfig.TEMPLATES_SUBDIR
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+            except OSError:
+                pass
+
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR), bytecode_cache=bytecode_cache
+        )
+    return _environment
+
+
+def compile_templates() -> Dict[str, Any]:
+    """
+    Loads every bot template once.
+
+    Returns:
+        A mapping of output path (relative to the bot directory) to template.
+    """
+    env = template_environment()
+    return {
+        template.replace(".j2", ""): env.get_template(template)
+        for template in env.list_templates()
+    }
+
+
+def render_bot(templates: Dict[str, Any], bot_name: str, token: str) -> Dict[str, str]:
+    """Renders all templates for one bot."""
+    return {
+        output: template.render(bot_name=bot_name, token=token)
+        for output, template in templates.items()
+    }
+
+
+def write_bot(bot_path: Path, files: Dict[str, str], overwrite: bool = False) -> None:
+    """
+    Writes a rendered bot so that it appears all at once.
+
+    Files are written into a temporary directory next to the target, which is
+    then renamed into place. An existing bot is only replaced when
+    `overwrite` is set, and is removed after the new one is in place.
+
+    Raises:
+        FileExistsError: If the target exists and `overwrite` is not set.
+    """
+    bot_path = bot_path.resolve()
+    if bot_path.exists() and not overwrite:
+        raise FileExistsError(f"Directory '{bot_path.name}' already exists")
+
+    bot_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{bot_path.name}.", dir=bot_path.parent))
+    try:
+        for relative, content in files.items():
+            output = staging / relative
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(content)
+
+        previous: Optional[Path] = None
+        if bot_path.exists():
+            previous = Path(
+                tempfile.mkdtemp(prefix=f".{bot_path.name}.old.", dir=bot_path.parent)
+            )
+            os.rmdir(previous)
+            os.rename(bot_path, previous)
+        os.rename(staging, bot_path)
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def create_bots(
+    entries: List[Dict[str, Any]],
+    target_dir: Optional[str] = None,
+    jobs: int = ScaffoldConfig.JOBS,
+    overwrite: bool = False,
+) -> Dict[str, Any]:
+    """
+    Creates many bots from manifest entries.
+
+    Templates are compiled once and the bots are rendered and written in
+    parallel. A failing bot doesn't stop the others.
+
+    Args:
+        entries: Manifest entries with `name` and `token` keys.
+        target_dir: Directory to create the bots in; defaults to the current one.
+        jobs: Number of bots rendered and written at once.
+        overwrite: Whether to replace existing bot directories.
+
+    Returns:
+        A summary with per-bot results and timings in seconds.
+    """
+    started = time.perf_counter()
+    names = set()
+    for index, entry in enumerate(entries, 1):
+        name = entry.get("name")
+        if not name or not entry.get("token"):
+            raise ValueError(f"Manifest entry {index} needs a 'name' and a 'token'")
+        # Names become directories and package names: anything else could
+        # point outside the target directory, which --force would replace
+        valid = isinstance(name, str) and name.isidentifier()
+        if not valid or keyword.iskeyword(name):
+            raise ValueError(
+                f"Manifest entry {index}: bot name '{name}' must be a valid "
+                f"Python identifier"
+            )
+        if name in names:
+            raise ValueError(f"Manifest entry {index}: bot name '{name}' is repeated")
+        names.add(name)
+
+    templates = compile_templates()
+    compiled = time.perf_counter()
+    base = Path(target_dir) if target_dir else Path.cwd()
+
+    def create(entry: Dict[str, Any]) -> Dict[str, Any]:
+        bot_started = time.perf_counter()
+        result = {"name": entry["name"], "status": "created", "error": None}
+        try:
+            files = render_bot(templates, entry["name"], entry["token"])
+            write_bot(base / entry["name"], files, overwrite=overwrite)
+        except FileExistsError as e:
+            result.update(status="skipped", error=str(e))
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+        result["seconds"] = time.perf_counter() - bot_started
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = list(executor.map(create, entries))
+
+    finished = time.perf_counter()
+    return {
+        "results": results,
+        "compile_seconds": compiled - started,
+        "render_seconds": finished - compiled,
+        "total_seconds": finished - started,
+    }
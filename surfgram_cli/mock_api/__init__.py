@@ -0,0 +1,387 @@
+import json
+import random
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from surfgram_cli.bench import percentile, synthetic_update
+from surfgram_cli.config import BenchConfig, MockAPIConfig
+
+
+class _BotState:
+    """Pending updates and sent messages of one bot token."""
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        self.pending: Deque[Dict[str, Any]] = deque(maxlen=MockAPIConfig.MAX_PENDING)
+        self.next_update_id = 1
+        self.next_message_id = 1
+        self.max_delivered = 0
+        self.delivered = 0
+        self.redelivered = 0
+        self.sent_messages = 0
+        self.changed = threading.Condition()
+
+
+class MockBotAPI:
+    """
+    A local stand-in for the Telegram Bot API.
+
+    Implements `getUpdates` long polling and `sendMessage`, plus the small
+    methods bots call on startup, for any token. Updates are generated at a
+    fixed rate for every token that has made a request. Every request can be
+    delayed, failed with a 500 or rejected with a 429 carrying `retry_after`,
+    so polling throughput and backoff can be tested offline. Response times
+    are recorded per method.
+    """
+
+    # Methods answered with a plain `true`
+    TRUE_METHODS = {
+        "deleteWebhook",
+        "setWebhook",
+        "answerCallbackQuery",
+        "answerInlineQuery",
+        "sendChatAction",
+        "setMyCommands",
+        "deleteMessage",
+    }
+
+    def __init__(
+        self,
+        host: str = MockAPIConfig.HOST,
+        port: int = MockAPIConfig.PORT,
+        rate: float = MockAPIConfig.RATE,
+        kinds: Sequence[str] = BenchConfig.UPDATE_KINDS,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = MockAPIConfig.RETRY_AFTER,
+        seed: int = 0,
+    ) -> None:
+        """
+        Initializes the MockBotAPI.
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free one.
+            rate: Updates generated per second for every bot; 0 disables.
+            kinds: Update types to generate, cycled in order.
+            latency_ms: Delay added to every response.
+            jitter_ms: Random extra delay of up to this many milliseconds.
+            error_rate: Fraction of requests answered with a 500 error.
+            rate_limit_rate: Fraction of requests answered with a 429 error.
+            retry_after: `retry_after` seconds sent with 429 errors.
+            seed: Seed for generated updates and injected faults.
+        """
+        unknown = set(kinds) - set(BenchConfig.UPDATE_KINDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown update kind(s): {', '.join(sorted(unknown))}\n"
+                f"Expected: {', '.join(BenchConfig.UPDATE_KINDS)}"
+            )
+        for name, fraction in (
+            ("error rate", error_rate),
+            ("rate limit rate", rate_limit_rate),
+        ):
+            if not 0.0 <= fraction <= 1.0:
+                raise ValueError(f"The {name} must be between 0 and 1")
+
+        self.rate = rate
+        self.kinds = list(kinds)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bots: Dict[str, _BotState] = {}
+        # method -> (requests, sampled response times)
+        self._timings: Dict[str, Tuple[int, List[float]]] = {}
+        self._statuses: Dict[int, int] = {}
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.started = time.time()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as `--api-url`."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _respond(self) -> None:
+                url = urllib.parse.urlsplit(self.path)
+                params: Dict[str, Any] = dict(urllib.parse.parse_qsl(url.query))
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                content_type = self.headers.get("Content-Type", "")
+                try:
+                    if body and "json" in content_type:
+                        params.update(json.loads(body))
+                    elif body:
+                        params.update(urllib.parse.parse_qsl(body.decode("utf-8")))
+                except ValueError:
+                    status, payload = 400, api._error(400, "Bad Request: invalid body")
+                else:
+                    status, payload = api.handle(url.path, params)
+
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up, e.g. a long poll cut short on shutdown
+                    self.close_connection = True
+
+            do_GET = do_POST = _respond
+
+        return Handler
+
+    @staticmethod
+    def _error(code: int, description: str, **parameters: Any) -> Dict[str, Any]:
+        error: Dict[str, Any] = {
+            "ok": False,
+            "error_code": code,
+            "description": description,
+        }
+        if parameters:
+            error["parameters"] = parameters
+        return error
+
+    def _bot(self, token: str) -> _BotState:
+        with self._lock:
+            if token not in self._bots:
+                self._bots[token] = _BotState(token)
+            return self._bots[token]
+
+    def _record(self, method: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+            count, samples = self._timings.get(method, (0, []))
+            count += 1
+            if len(samples) < MockAPIConfig.SAMPLE_LIMIT:
+                samples.append(seconds)
+            else:
+                index = self._rng.randrange(count)
+                if index < MockAPIConfig.SAMPLE_LIMIT:
+                    samples[index] = seconds
+            self._timings[method] = (count, samples)
+
+    def handle(self, path: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Answers one Bot API request.
+
+        Args:
+            path: Request path, `/bot<token>/<method>`.
+            params: Method parameters from the query string and body.
+
+        Returns:
+            The HTTP status and the JSON response.
+        """
+        started = time.perf_counter()
+        prefix, _, method = path.strip("/").partition("/")
+        if not prefix.startswith("bot") or not method:
+            return 404, self._error(404, "Not Found")
+
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.random() * self.jitter
+        if delay:
+            time.sleep(delay)
+
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            status, payload = 429, self._error(
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                retry_after=self.retry_after,
+            )
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status, payload = 500, self._error(500, "Internal Server Error")
+        else:
+            status, payload = self._call(self._bot(prefix[3:]), method, params)
+
+        self._record(method, status, time.perf_counter() - started)
+        return status, payload
+
+    def _call(
+        self, bot: _BotState, method: str, params: Dict[str, Any]
+    ) -> Tuple[int, Dict[str, Any]]:
+        if method == "getUpdates":
+            return 200, {"ok": True, "result": self._get_updates(bot, params)}
+        if method in ("sendMessage", "editMessageText"):
+            if not params.get("chat_id") or not params.get("text"):
+                return 400, self._error(
+                    400, "Bad Request: chat_id and text are required"
+                )
+            return 200, {"ok": True, "result": self._message(bot, params)}
+        if method == "getMe":
+            bot_id = bot.token.partition(":")[0]
+            return 200, {
+                "ok": True,
+                "result": {
+                    "id": int(bot_id) if bot_id.isdigit() else 1,
+                    "is_bot": True,
+                    "first_name": "Mock Bot",
+                    "username": "mock_bot",
+                },
+            }
+        if method in self.TRUE_METHODS:
+            return 200, {"ok": True, "result": True}
+        return 404, self._error(404, "Not Found: method not found")
+
+    def _get_updates(
+        self, bot: _BotState, params: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        try:
+            offset = int(params.get("offset") or 0)
+            limit = min(max(int(params.get("limit") or 100), 1), 100)
+            timeout = min(
+                float(params.get("timeout") or 0), MockAPIConfig.MAX_POLL_TIMEOUT
+            )
+        except ValueError:
+            offset, limit, timeout = 0, 100, 0.0
+
+        deadline = time.monotonic() + timeout
+        with bot.changed:
+            while True:
+                while bot.pending and bot.pending[0]["update_id"] < offset:
+                    bot.pending.popleft()
+                if bot.pending:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopped.is_set():
+                    return []
+                bot.changed.wait(remaining)
+
+            updates = [u for u in bot.pending if u["update_id"] >= offset][:limit]
+            for update in updates:
+                if update["update_id"] <= bot.max_delivered:
+                    bot.redelivered += 1
+            bot.delivered += len(updates)
+            if updates:
+                bot.max_delivered = max(bot.max_delivered, updates[-1]["update_id"])
+        return updates
+
+    def _message(self, bot: _BotState, params: Dict[str, Any]) -> Dict[str, Any]:
+        with bot.changed:
+            bot.sent_messages += 1
+            message_id = bot.next_message_id
+            bot.next_message_id += 1
+        return {
+            "message_id": message_id,
+            "from": {"id": 1, "is_bot": True, "first_name": "Mock Bot"},
+            "chat": {"id": params["chat_id"], "type": "private"},
+            "date": int(time.time()),
+            "text": params["text"],
+        }
+
+    def _generate(self) -> None:
+        """Adds updates to every known bot at the configured rate."""
+        interval = 1.0 / self.rate
+        next_at = time.monotonic()
+        while not self._stopped.is_set():
+            next_at += interval
+            with self._lock:
+                bots = list(self._bots.values())
+            for bot in bots:
+                with bot.changed:
+                    update_id = bot.next_update_id
+                    bot.next_update_id += 1
+                    kind = self.kinds[(update_id - 1) % len(self.kinds)]
+                    bot.pending.append(synthetic_update(update_id, kind, self._rng))
+                    bot.changed.notify_all()
+            self._stopped.wait(max(0.0, next_at - time.monotonic()))
+
+    def start(self) -> None:
+        """Starts serving and generating updates in background threads."""
+        self.started = time.time()
+        targets = [self.server.serve_forever]
+        if self.rate > 0:
+            targets.append(self._generate)
+        for target in targets:
+            thread = threading.Thread(
+                target=target, name="surfgram-mock-api", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stops the server and wakes up pending long polls."""
+        self._stopped.set()
+        with self._lock:
+            bots = list(self._bots.values())
+        for bot in bots:
+            with bot.changed:
+                bot.changed.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def wait(self, duration: Optional[float] = None) -> None:
+        """Blocks for `duration` seconds, or until interrupted when None."""
+        self._stopped.wait(duration or None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns what the server saw so far.
+
+        Returns:
+            Per-method request counts and response-time percentiles (getUpdates
+            times include the long-polling wait), response counts per HTTP
+            status and per-bot update counters.
+        """
+        with self._lock:
+            timings = {
+                method: (count, sorted(samples))
+                for method, (count, samples) in self._timings.items()
+            }
+            statuses = dict(self._statuses)
+            bots = list(self._bots.values())
+
+        return {
+            "seconds": round(time.time() - self.started, 3),
+            "methods": {
+                method: {
+                    "requests": count,
+                    "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+                    "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+                    "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+                    "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+                }
+                for method, (count, samples) in sorted(timings.items())
+            },
+            "statuses": {
+                str(status): count for status, count in sorted(statuses.items())
+            },
+            "bots": [
+                {
+                    "token": f"{bot.token.partition(':')[0]}:…",
+                    "generated": bot.next_update_id - 1,
+                    "delivered": bot.delivered,
+                    "redelivered": bot.redelivered,
+                    "pending": len(bot.pending),
+                    "sent_messages": bot.sent_messages,
+                }
+                for bot in bots
+            ],
+        }
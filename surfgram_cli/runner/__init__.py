@@ -0,0 +1,483 @@
+import asyncio
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from surfgram_cli.config import RunnerConfig, TelegramConfig
+from surfgram_cli.enums import LevelsEnum
+from surfgram_cli.utils import debugger
+from surfgram_cli.utils.capture import UpdateRecorder
+from surfgram_cli.utils.crash import errors
+from surfgram_cli.utils.metrics import metrics
+from surfgram_cli.utils.dispatch import dispatch_update, find_dispatcher
+from surfgram_cli.utils.offsets import OffsetStore
+from surfgram_cli.utils.telegram import TelegramAPIError, TelegramClient
+
+
+class UpdateRunner:
+    """
+    Runs a bot on updates polled by the CLI instead of `Bot.listen()`.
+
+    A background thread long-polls `getUpdates` and hands updates to an
+    asyncio loop, which runs the bot's handlers with bounded concurrency.
+    With an `AsyncTelegramClient` polling runs as a task on the same loop
+    instead, so many runners can share one loop without a thread each.
+    Because the CLI owns the polling offset, it can stop accepting updates at
+    a known offset, drain the handlers that are still running and hand the
+    offset over to another process.
+
+    `getUpdates` only confirms updates whose handlers have finished: it is
+    called with the first update id not handled yet, and updates it returns
+    again are skipped. At most `max_pending` updates are received but not
+    handled at a time; polling waits for handlers beyond that. Updates whose
+    handlers were cancelled at the drain timeout or lost in a crash are
+    therefore delivered again, and with an `OffsetStore` that first unhandled
+    id is saved as handlers finish and once more after draining, so polling
+    resumes from it on the next start. Since `getUpdates` returns at most
+    `TelegramConfig.POLL_LIMIT` updates from that id, a handler that doesn't
+    finish holds back the updates after that many newer ones.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        client: TelegramClient,
+        offset: Optional[int] = None,
+        max_concurrent: int = RunnerConfig.MAX_CONCURRENT_HANDLERS,
+        poll_timeout: int = TelegramConfig.POLL_TIMEOUT,
+        drain_timeout: float = RunnerConfig.DRAIN_TIMEOUT,
+        recorder: Optional[UpdateRecorder] = None,
+        offsets: Optional[OffsetStore] = None,
+        max_pending: int = RunnerConfig.MAX_PENDING_UPDATES,
+    ) -> None:
+        """
+        Initializes the UpdateRunner.
+
+        Args:
+            bot: The surfgram bot instance.
+            client: Bot API client used for polling.
+            offset: The first update id to request.
+            max_concurrent: Maximum number of handlers running at once.
+            poll_timeout: Long polling timeout in seconds.
+            drain_timeout: Seconds in-flight handlers get after polling stops.
+            recorder: Capture every received update is appended to.
+            offsets: State file the handled offset is saved to. Polling
+                resumes from the saved offset unless `offset` is given.
+            max_pending: Maximum number of updates received but not handled.
+        """
+        if offset is None and offsets is not None:
+            offset = offsets.load()
+            if offset is not None:
+                debugger.log(
+                    f"Resuming from update {offset} saved in {offsets.path}",
+                    LevelsEnum.INFO,
+                )
+        self.bot = bot
+        self.client = client
+        self.offset = offset
+        self.max_concurrent = max_concurrent
+        self.poll_timeout = poll_timeout
+        self.drain_timeout = drain_timeout
+        self.recorder = recorder
+        self.offsets = offsets
+        self.max_pending = max_pending
+        self.dispatcher = find_dispatcher(bot)
+        self.stop_signal: Optional[int] = None
+
+        self._stopping = threading.Event()
+        self._polling_stopped = threading.Event()
+        self._finished = threading.Event()
+        self._forced = False
+        self._restarting = False
+        self._received = offset
+        # Received updates whose handlers haven't finished, queued or running;
+        # the polling thread reads it too
+        self._unhandled: Set[int] = set()
+        self._unhandled_lock = threading.Lock()
+        self._progress = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._accepting_done: Optional[asyncio.Event] = None
+        self._async_progress: Optional[asyncio.Event] = None
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of handlers currently running."""
+        return len(self._tasks)
+
+    @property
+    def handled_offset(self) -> Optional[int]:
+        """The first update id whose handler hasn't finished."""
+        with self._unhandled_lock:
+            if self._unhandled:
+                return min(self._unhandled)
+            return self._received
+
+    def run(self, handle_signals: bool = False) -> None:
+        """
+        Polls and dispatches until polling stops, then drains. Blocks.
+
+        Args:
+            handle_signals: Stop gracefully on SIGINT and SIGTERM: polling
+                stops and in-flight handlers are drained, and a second
+                signal cancels them. A SIGINT is re-raised as
+                KeyboardInterrupt once the runner has stopped.
+        """
+        try:
+            asyncio.run(self.serve(handle_signals))
+        finally:
+            # Also stops the polling thread when the loop was interrupted
+            self._stopping.set()
+        if self.stop_signal == signal.SIGINT:
+            raise KeyboardInterrupt
+
+    async def serve(self, handle_signals: bool = False) -> None:
+        """Coroutine version of `run` for callers that own the event loop."""
+        try:
+            await self._serve(handle_signals)
+        finally:
+            self._finished.set()
+        if self._restarting:
+            # Returning would let the process exit before the restart replaces
+            # it. Signals get their default handlers back meanwhile.
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self._loop.remove_signal_handler(signum)
+                except (NotImplementedError, RuntimeError):
+                    break
+            while True:
+                await asyncio.sleep(3600)
+
+    async def _serve(self, handle_signals: bool) -> None:
+        self._loop = asyncio.get_running_loop()
+        # Holds at most `max_pending` updates, plus the end-of-updates marker
+        self._queue = asyncio.Queue(self.max_pending + 1)
+        self._accepting_done = asyncio.Event()
+        self._async_progress = asyncio.Event()
+        slots = asyncio.Semaphore(self.max_concurrent)
+
+        if handle_signals:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self._loop.add_signal_handler(signum, self._on_signal, signum)
+                except (NotImplementedError, RuntimeError):
+                    # No loop signal handlers on Windows or off the main thread
+                    break
+
+        if asyncio.iscoroutinefunction(self.client.get_updates):
+            self._poll_task = asyncio.ensure_future(self._poll_async())
+        else:
+            poller = threading.Thread(
+                target=self._poll, name="surfgram-poller", daemon=True
+            )
+            poller.start()
+
+        lag_probe = None
+        if metrics.enabled:
+            lag_probe = asyncio.ensure_future(metrics.watch_loop_lag())
+
+        self._dispatcher_task = asyncio.ensure_future(self._dispatch_queued(slots))
+        await self._accepting_done.wait()
+        # Updates already received are still handled, within the drain timeout
+        started = self._loop.time()
+        done, _ = await asyncio.wait(
+            {self._dispatcher_task}, timeout=self.drain_timeout
+        )
+        if not done:
+            self._dispatcher_task.cancel()
+        await self.drain(max(0.0, self.drain_timeout - (self._loop.time() - started)))
+        if lag_probe is not None:
+            lag_probe.cancel()
+        if self.offsets is not None and self.offsets.save(
+            self.handled_offset, force=True
+        ):
+            debugger.log(
+                f"Saved update offset {self.handled_offset} to {self.offsets.path}",
+                LevelsEnum.INFO,
+            )
+
+    async def _dispatch_queued(self, slots: asyncio.Semaphore) -> None:
+        """Starts a handler for every queued update, `max_concurrent` at a time."""
+        while True:
+            update = await self._queue.get()
+            if update is None or self._forced:
+                return
+            await slots.acquire()
+            task = asyncio.ensure_future(self._handle(update))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _handle(self, update: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        failed = False
+        metrics.in_flight.inc()
+        try:
+            await dispatch_update(self.dispatcher, update)
+        except Exception as e:
+            failed = True
+            message = errors.report(e, f"Handler failed: {e!r}")
+            if message is not None:
+                debugger.log(message, LevelsEnum.ERROR)
+        finally:
+            metrics.in_flight.dec()
+            metrics.observe_handler(time.perf_counter() - started, failed)
+        # Not reached when the handler is cancelled, so the update stays
+        # unconfirmed (see the class docstring). An update whose handler
+        # failed counts as handled; it would fail again.
+        with self._unhandled_lock:
+            self._unhandled.discard(update.get("update_id"))
+        self._progress.set()
+        self._async_progress.set()
+        if self.offsets is not None:
+            self.offsets.save(self.handled_offset)
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits for in-flight handlers up to `timeout`, then cancels the rest.
+
+        Args:
+            timeout: Seconds to wait; defaults to the drain timeout.
+        """
+        if not self._tasks:
+            return
+        if timeout is None:
+            timeout = self.drain_timeout
+        debugger.log(f"Draining {len(self._tasks)} handler(s)...", LevelsEnum.INFO)
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            debugger.log(
+                f"{len(pending)} handler(s) cancelled after {self.drain_timeout}s",
+                LevelsEnum.ERROR,
+            )
+
+    def _poll(self) -> None:
+        """Long-polls the Bot API on a background thread while accepting."""
+        delay = TelegramConfig.RETRY_DELAY
+        try:
+            while not self._stopping.is_set():
+                limit = self._poll_limit()
+                if not limit:
+                    self._progress.wait(self.poll_timeout)
+                    continue
+                metrics.mark_ready("first getUpdates")
+                started = time.perf_counter()
+                self.offset = self.handled_offset
+                self._progress.clear()
+                try:
+                    updates = self.client.get_updates(
+                        offset=self.offset, timeout=self.poll_timeout, limit=limit
+                    )
+                except (TelegramAPIError, OSError) as e:
+                    metrics.observe_poll(time.perf_counter() - started, None)
+                    debugger.log(f"getUpdates failed: {e!r}", LevelsEnum.API)
+                    wait = getattr(e, "retry_after", None) or delay
+                    delay = min(delay * 2, TelegramConfig.RETRY_DELAY_MAX)
+                    self._stopping.wait(wait)
+                    continue
+
+                metrics.observe_poll(time.perf_counter() - started, len(updates))
+                delay = TelegramConfig.RETRY_DELAY
+                new = self._take_new(updates)
+                if updates and not new:
+                    # Only updates still being handled, returned at once
+                    self._progress.wait(RunnerConfig.BACKLOG_POLL_DELAY)
+                for update in new:
+                    if not self._deliver(update):
+                        return
+        finally:
+            self._polling_stopped.set()
+            self._deliver(None)
+
+    def _poll_limit(self) -> int:
+        """How many more updates may be received before handlers catch up."""
+        with self._unhandled_lock:
+            room = self.max_pending - len(self._unhandled)
+        return max(0, min(room, TelegramConfig.POLL_LIMIT))
+
+    def _take_new(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keeps the updates not received before and marks them as unhandled.
+
+        Updates returned while stopping are neither handled nor confirmed,
+        so they are delivered again after a restart.
+        """
+        if self._stopping.is_set():
+            return []
+        new = []
+        with self._unhandled_lock:
+            for update in updates:
+                update_id = update["update_id"]
+                if self._received is not None and update_id < self._received:
+                    continue
+                self._unhandled.add(update_id)
+                self._received = update_id + 1
+                new.append(update)
+        if new and self.recorder is not None:
+            self.recorder.record(new)
+        return new
+
+    def _deliver(self, update: Optional[Dict[str, Any]]) -> bool:
+        """Queues an update from the polling thread; False once the loop is gone."""
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue, update)
+        except RuntimeError:
+            return False
+        return True
+
+    def _enqueue(self, update: Optional[Dict[str, Any]]) -> None:
+        """
+        Queues an update, or with None marks the end of updates. Runs on the
+        loop; the queue has room for every unhandled update.
+        """
+        if update is None:
+            self._accepting_done.set()
+            if self._queue.full():
+                return
+        self._queue.put_nowait(update)
+
+    async def _poll_async(self) -> None:
+        """Long-polls the Bot API as a task on the runner's loop."""
+        delay = TelegramConfig.RETRY_DELAY
+        try:
+            while not self._stopping.is_set():
+                limit = self._poll_limit()
+                if not limit:
+                    await self._wait_for_progress(self.poll_timeout)
+                    continue
+                metrics.mark_ready("first getUpdates")
+                started = time.perf_counter()
+                self.offset = self.handled_offset
+                self._async_progress.clear()
+                try:
+                    updates = await self.client.get_updates(
+                        offset=self.offset, timeout=self.poll_timeout, limit=limit
+                    )
+                except (TelegramAPIError, OSError, asyncio.TimeoutError) as e:
+                    metrics.observe_poll(time.perf_counter() - started, None)
+                    debugger.log(f"getUpdates failed: {e!r}", LevelsEnum.API)
+                    await asyncio.sleep(getattr(e, "retry_after", None) or delay)
+                    delay = min(delay * 2, TelegramConfig.RETRY_DELAY_MAX)
+                    continue
+
+                metrics.observe_poll(time.perf_counter() - started, len(updates))
+                delay = TelegramConfig.RETRY_DELAY
+                new = self._take_new(updates)
+                if updates and not new:
+                    # Only updates still being handled, returned at once
+                    await self._wait_for_progress(RunnerConfig.BACKLOG_POLL_DELAY)
+                for update in new:
+                    self._enqueue(update)
+        except asyncio.CancelledError:
+            # Updates of a cancelled request were not taken and are delivered
+            # again from the current offset
+            pass
+        finally:
+            self._polling_stopped.set()
+            self._enqueue(None)
+
+    async def _wait_for_progress(self, timeout: float) -> None:
+        """Waits until a handler finishes, at most `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._async_progress.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _on_signal(self, signum: int) -> None:
+        """First signal: stop polling and drain. Second one: cancel handlers."""
+        if self.stop_signal is not None:
+            self._forced = True
+            debugger.log(
+                f"Cancelling {len(self._tasks)} handler(s)", LevelsEnum.INFO
+            )
+            if self._dispatcher_task is not None:
+                self._dispatcher_task.cancel()
+            for task in self._tasks:
+                task.cancel()
+            return
+        self.stop_signal = signum
+        debugger.log(
+            f"Stopping, draining {len(self._tasks)} handler(s) for up to "
+            f"{self.drain_timeout:g}s (signal again to cancel them)",
+            LevelsEnum.INFO,
+        )
+        self._stop_accepting()
+
+    def _stop_accepting(self) -> None:
+        """
+        Stops polling and ends dispatching after the updates already queued,
+        without waiting for a polling thread's request. Runs on the loop.
+
+        Updates that request still returns are neither handled nor confirmed
+        to the Bot API, so they are delivered again after a restart.
+        """
+        self.request_stop()
+        self._enqueue(None)
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stops accepting updates and waits until in-flight handlers are
+        drained and the offset is saved, before the process is restarted.
+        The runner then keeps its thread waiting for the restart instead of
+        returning. Thread-safe; must not be called from the runner's own loop.
+
+        Args:
+            timeout: Maximum seconds to wait; defaults to the drain timeout
+                plus a second.
+
+        Returns:
+            True if the runner has finished.
+        """
+        loop = self._loop
+        if loop is None:
+            return self._finished.is_set()
+        self._restarting = True
+        try:
+            loop.call_soon_threadsafe(self._stop_accepting)
+        except RuntimeError:
+            # The loop is already closed
+            pass
+        if timeout is None:
+            timeout = self.drain_timeout + 1
+        return self._finished.wait(timeout)
+
+    def request_stop(self) -> None:
+        """
+        Stops accepting new updates without waiting. Thread-safe.
+
+        An async poll in progress is cancelled right away; a polling thread
+        finishes its current request first.
+        """
+        self._stopping.set()
+        self._progress.set()
+        task = self._poll_task
+        if task is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    def stop_polling(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Stops accepting new updates. Thread-safe.
+
+        Updates already received are still handled. The call waits for the
+        running `getUpdates` request to return, so the returned offset is
+        final.
+
+        Must not be called from the runner's own loop; use `request_stop`
+        there.
+
+        Args:
+            timeout: Maximum seconds to wait for the poller to stop.
+
+        Returns:
+            The first update id this runner has not received.
+        """
+        self.request_stop()
+        self._polling_stopped.wait(timeout)
+        with self._unhandled_lock:
+            return self._received
@@ -0,0 +1,472 @@
+import asyncio
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from surfgram_cli.config import SupervisorConfig, TelegramConfig
+from surfgram_cli.enums import LevelsEnum
+from surfgram_cli.utils import debugger
+from surfgram_cli.utils.capture import UpdateRecorder
+from surfgram_cli.utils.crash import errors
+from surfgram_cli.utils.dispatch import (
+    dispatch_update,
+    find_dispatcher,
+    get_bot_token,
+    update_chat_id,
+)
+from surfgram_cli.utils.metrics import metrics
+from surfgram_cli.utils.offsets import OffsetStore
+from surfgram_cli.utils.telegram import TelegramAPIError, TelegramClient
+
+# Layout of the shared per-worker stats array
+HANDLED, ERRORS, IN_FLIGHT, HEARTBEAT = range(4)
+
+
+async def _worker_loop(
+    bot: Any,
+    updates: "multiprocessing.Queue",
+    done: "multiprocessing.SimpleQueue",
+    stats,
+    max_concurrent: int,
+    stop_timeout: float = SupervisorConfig.STOP_TIMEOUT,
+) -> None:
+    """
+    Feeds updates from the worker queue into the bot until a None sentinel,
+    then gives running handlers up to `stop_timeout` seconds. The id of
+    every handled update, failed or not, is sent back on `done`.
+    """
+    loop = asyncio.get_running_loop()
+    dispatcher = find_dispatcher(bot)
+    slots = asyncio.Semaphore(max_concurrent)
+    tasks = set()
+
+    async def heartbeat() -> None:
+        while True:
+            stats[HEARTBEAT] = time.time()
+            await asyncio.sleep(SupervisorConfig.HEARTBEAT_INTERVAL)
+
+    async def handle(update: Dict[str, Any]) -> None:
+        stats[IN_FLIGHT] += 1
+        try:
+            await dispatch_update(dispatcher, update)
+            stats[HANDLED] += 1
+        except Exception as e:
+            stats[ERRORS] += 1
+            message = errors.report(e, f"Handler failed: {e!r}")
+            if message is not None:
+                debugger.log(message, LevelsEnum.ERROR)
+        finally:
+            stats[IN_FLIGHT] -= 1
+            slots.release()
+        done.put(update.get("update_id"))
+
+    beat = asyncio.ensure_future(heartbeat())
+    while True:
+        update = await loop.run_in_executor(None, updates.get)
+        if update is None:
+            break
+        await slots.acquire()
+        task = asyncio.ensure_future(handle(update))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.wait(tasks, timeout=stop_timeout)
+    beat.cancel()
+    for summary in errors.flush():
+        debugger.log(summary, LevelsEnum.ERROR)
+
+
+def _worker_main(
+    config_class: type,
+    updates: "multiprocessing.Queue",
+    done: "multiprocessing.SimpleQueue",
+    stats,
+    debug: bool,
+    max_concurrent: int,
+    api_url: Optional[str],
+    stop_timeout: float,
+) -> None:
+    """Entry point of a forked worker process."""
+    from surfgram.core.bot import Bot
+    from surfgram_cli.utils.dispatch import redirect_api_calls
+
+    # Shutdown is driven by the supervisor through the queue sentinel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    debugger.debug_mode = debug
+    bot = Bot(config=config_class)
+    redirect_api_calls(bot, config_class, api_url)
+    asyncio.run(
+        _worker_loop(bot, updates, done, stats, max_concurrent, stop_timeout)
+    )
+
+
+class WorkerSlot:
+    """Bookkeeping for one worker position in the pool."""
+
+    def __init__(self, index: int, context) -> None:
+        self.index = index
+        self.new_queues(context)
+        # Updates sent to the worker and not reported done yet, in order,
+        # with the number of times they were sent
+        self.pending: "OrderedDict[int, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self.stats = context.Array("d", 4, lock=False)
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.crashes = 0
+        self.restart_at: Optional[float] = None
+
+    def new_queues(self, context) -> None:
+        """
+        Creates the queues to and from the worker. A worker that died while
+        holding a queue's lock would deadlock its replacement on it.
+        """
+        self.queue = context.Queue(SupervisorConfig.QUEUE_SIZE)
+        self.done = context.SimpleQueue()
+
+    def collect_done(self) -> None:
+        """Drops the updates the worker has reported done from `pending`."""
+        while not self.done.empty():
+            self.pending.pop(self.done.get(), None)
+
+
+class Supervisor:
+    """
+    Runs a bot in several forked worker processes.
+
+    The supervisor imports the bot and its config once and then forks the
+    workers, so the imported modules are shared copy-on-write. It polls the
+    Bot API itself and routes each update to a worker by chat, which keeps
+    the updates of one conversation in order. Crashed workers are restarted
+    with exponential backoff; updates sent to a worker stay with the
+    supervisor until the worker reports them done, and a restarted worker
+    gets the ones it didn't finish again. An update that was sent
+    `SupervisorConfig.MAX_DELIVERIES` times is dropped.
+
+    As with `UpdateRunner`, `getUpdates` only confirms updates the workers
+    have finished, so updates lost with the process are delivered again.
+    With an `OffsetStore`, polling resumes from the saved offset, and the
+    first update id not handled yet is saved once the workers have finished
+    their queues on shutdown.
+    """
+
+    def __init__(
+        self,
+        config_class: type,
+        workers: int,
+        debug: bool = False,
+        api_url: Optional[str] = None,
+        recorder: Optional[UpdateRecorder] = None,
+        max_concurrent: int = SupervisorConfig.MAX_CONCURRENT_HANDLERS,
+        offsets: Optional[OffsetStore] = None,
+        stop_timeout: float = SupervisorConfig.STOP_TIMEOUT,
+    ) -> None:
+        """
+        Initializes the Supervisor.
+
+        Args:
+            config_class: The bot's config class, already imported.
+            workers: Number of worker processes.
+            debug: Whether workers log in debug mode.
+            api_url: Bot API server to use instead of the official one.
+            recorder: Capture every received update is appended to.
+            max_concurrent: Maximum number of handlers running at once in
+                each worker.
+            offsets: State file the handled offset is saved to on shutdown.
+            stop_timeout: Seconds workers get to finish on shutdown before
+                they are killed.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("--workers requires a platform that supports fork()")
+
+        self.config_class = config_class
+        self.debug = debug
+        self.recorder = recorder
+        self.max_concurrent = max_concurrent
+        self.api_url = api_url
+        self.client = TelegramClient(get_bot_token(config_class), api_url)
+        self.context = multiprocessing.get_context("fork")
+        self.slots = [WorkerSlot(i, self.context) for i in range(workers)]
+        self.offsets = offsets
+        self.stop_timeout = stop_timeout
+        self.offset: Optional[int] = offsets.load() if offsets is not None else None
+        self._stopping = threading.Event()
+        # Guards the slots' queues and pending updates between the poller
+        # and the restarts
+        self._lock = threading.Lock()
+
+    @property
+    def handled_offset(self) -> Optional[int]:
+        """The first update id not handled yet."""
+        with self._lock:
+            for slot in self.slots:
+                slot.collect_done()
+            pending = [update_id for slot in self.slots for update_id in slot.pending]
+        return min(pending) if pending else self.offset
+
+    def _start_worker(self, slot: WorkerSlot) -> None:
+        """Forks the worker process for a slot."""
+        slot.stats[HEARTBEAT] = time.time()
+        slot.stats[IN_FLIGHT] = 0
+        slot.process = self.context.Process(
+            target=_worker_main,
+            args=(
+                self.config_class,
+                slot.queue,
+                slot.done,
+                slot.stats,
+                self.debug,
+                self.max_concurrent,
+                self.api_url,
+                self.stop_timeout,
+            ),
+            name=f"surfgram-worker-{slot.index}",
+            daemon=True,
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        slot.restart_at = None
+        debugger.log(
+            f"Worker {slot.index} started (pid {slot.process.pid})", LevelsEnum.INFO
+        )
+
+    def _route(self, update: Dict[str, Any]) -> WorkerSlot:
+        """Picks the worker for an update, keeping each chat on one worker."""
+        key = update_chat_id(update)
+        if key is None:
+            key = update.get("update_id", 0)
+        return self.slots[hash(key) % len(self.slots)]
+
+    def _poll(self) -> None:
+        """Long-polls the Bot API and distributes updates until stopped."""
+        delay = TelegramConfig.RETRY_DELAY
+        while not self._stopping.is_set():
+            metrics.mark_ready("first getUpdates")
+            started = time.perf_counter()
+            try:
+                updates = self.client.get_updates(offset=self.handled_offset)
+            except TelegramAPIError as e:
+                metrics.observe_poll(time.perf_counter() - started, None)
+                wait = e.retry_after or delay
+                debugger.log(f"getUpdates failed: {e}", LevelsEnum.API)
+                delay = min(delay * 2, TelegramConfig.RETRY_DELAY_MAX)
+                self._stopping.wait(wait)
+                continue
+            except OSError as e:
+                metrics.observe_poll(time.perf_counter() - started, None)
+                debugger.log(f"getUpdates failed: {e!r}", LevelsEnum.API)
+                self._stopping.wait(delay)
+                delay = min(delay * 2, TelegramConfig.RETRY_DELAY_MAX)
+                continue
+
+            metrics.observe_poll(time.perf_counter() - started, len(updates))
+            delay = TelegramConfig.RETRY_DELAY
+            # Updates still being handled come back until they are confirmed
+            new = [
+                update
+                for update in updates
+                if self.offset is None or update["update_id"] >= self.offset
+            ]
+            if self.recorder is not None and new:
+                self.recorder.record(new)
+            if updates and not new:
+                self._stopping.wait(SupervisorConfig.BACKLOG_POLL_DELAY)
+            for update in new:
+                if self._stopping.is_set():
+                    # Neither confirmed nor saved, so polled again after a restart
+                    break
+                self._send(self._route(update), update)
+                self.offset = update["update_id"] + 1
+
+    def _send(self, slot: WorkerSlot, update: Dict[str, Any]) -> None:
+        """Queues an update for a worker, blocking while its queue is full."""
+        with self._lock:
+            slot.pending[update["update_id"]] = (update, 1)
+            target = slot.queue
+        self._put(slot, target, update)
+
+    def _put(self, slot: WorkerSlot, target: Any, update: Dict[str, Any]) -> None:
+        """
+        Puts an update on a worker queue, blocking while it is full. Gives up
+        once the worker is gone or replaced, or on shutdown: the update stays
+        pending and a restarted worker gets it with its backlog.
+        """
+        while True:
+            try:
+                target.put(update, timeout=1)
+                return
+            except queue.Full:
+                if (
+                    target is not slot.queue
+                    or self._stopping.is_set()
+                    or not slot.process.is_alive()
+                ):
+                    return
+
+    def _restart_worker(self, slot: WorkerSlot) -> None:
+        """Starts a replacement worker on new queues and re-sends its backlog."""
+        resend = []
+        with self._lock:
+            slot.collect_done()
+            slot.new_queues(self.context)
+            self._start_worker(slot)
+            target = slot.queue
+            for update_id, (update, sent) in list(slot.pending.items()):
+                if sent >= SupervisorConfig.MAX_DELIVERIES:
+                    del slot.pending[update_id]
+                    debugger.log(
+                        f"Dropping update {update_id}, sent to crashed workers "
+                        f"{sent} times",
+                        LevelsEnum.ERROR,
+                    )
+                    continue
+                # Counted as sent even if the put below gives up
+                slot.pending[update_id] = (update, sent + 1)
+                resend.append(update)
+        # Without the lock, so a backlog larger than the queue doesn't block
+        # the poller, and the put gives up if the new worker dies as well
+        for update in resend:
+            self._put(slot, target, update)
+
+    def _check_workers(self) -> None:
+        """
+        Schedules and performs restarts of workers that have exited, and
+        collects the updates the workers report done.
+        """
+        now = time.monotonic()
+        for slot in self.slots:
+            with self._lock:
+                slot.collect_done()
+            process = slot.process
+            if process is not None and process.is_alive():
+                if slot.crashes and now - slot.started_at > SupervisorConfig.STABLE_AFTER:
+                    slot.crashes = 0
+                continue
+
+            if slot.restart_at is None:
+                backoff = min(
+                    SupervisorConfig.RESTART_BACKOFF_BASE * 2**slot.crashes,
+                    SupervisorConfig.RESTART_BACKOFF_MAX,
+                )
+                slot.crashes += 1
+                slot.restart_at = now + backoff
+                debugger.log(
+                    f"Worker {slot.index} exited with code "
+                    f"{process.exitcode if process else None}, "
+                    f"restarting in {backoff:.1f}s",
+                    LevelsEnum.ERROR,
+                )
+            elif now >= slot.restart_at:
+                slot.restarts += 1
+                metrics.restarts.inc()
+                self._restart_worker(slot)
+
+    def health(self) -> List[Dict[str, Any]]:
+        """
+        Returns the health of every worker.
+
+        Returns:
+            One dictionary per worker with its pid, liveness, restart count,
+            handled/failed/in-flight updates, queue depth and heartbeat age.
+        """
+        now = time.time()
+        report = []
+        for slot in self.slots:
+            alive = slot.process is not None and slot.process.is_alive()
+            try:
+                queued = slot.queue.qsize()
+            except NotImplementedError:
+                queued = -1
+            report.append(
+                {
+                    "worker": slot.index,
+                    "pid": slot.process.pid if slot.process else None,
+                    "alive": alive,
+                    "restarts": slot.restarts,
+                    "handled": int(slot.stats[HANDLED]),
+                    "errors": int(slot.stats[ERRORS]),
+                    "in_flight": int(slot.stats[IN_FLIGHT]),
+                    "queued": queued,
+                    "heartbeat_age": round(now - slot.stats[HEARTBEAT], 1),
+                }
+            )
+        return report
+
+    def _log_health(self) -> None:
+        for row in self.health():
+            debugger.log(
+                " ".join(f"{key}={value}" for key, value in row.items()),
+                LevelsEnum.INFO,
+            )
+
+    def stop(self) -> None:
+        """Stops polling, lets workers finish queued updates and reaps them."""
+        self._stopping.set()
+        for slot in self.slots:
+            try:
+                slot.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+
+        deadline = time.monotonic() + self.stop_timeout
+        killed = 0
+        for slot in self.slots:
+            if slot.process is None:
+                continue
+            slot.process.join(max(0.0, deadline - time.monotonic()))
+            if slot.process.is_alive():
+                killed += 1
+                slot.process.terminate()
+                slot.process.join(1)
+
+        if killed:
+            debugger.log(
+                f"{killed} worker(s) killed after {self.stop_timeout:g}s",
+                LevelsEnum.ERROR,
+            )
+        offset = self.handled_offset
+        if self.offsets is not None and self.offsets.save(offset, force=True):
+            debugger.log(
+                f"Saved update offset {offset} to {self.offsets.path}",
+                LevelsEnum.INFO,
+            )
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Runs the pool until interrupted (Ctrl-C or SIGTERM).
+
+        Returns:
+            The final per-worker health report.
+        """
+        for slot in self.slots:
+            self._start_worker(slot)
+
+        previous_sigterm = signal.signal(
+            signal.SIGTERM, lambda *_: self._stopping.set()
+        )
+        poller = threading.Thread(target=self._poll, name="surfgram-poller", daemon=True)
+        poller.start()
+
+        last_report = time.monotonic()
+        try:
+            while not self._stopping.wait(0.2):
+                self._check_workers()
+                if time.monotonic() - last_report >= SupervisorConfig.HEALTH_INTERVAL:
+                    self._log_health()
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+            debugger.log(f"Stopping {len(self.slots)} worker(s)...", LevelsEnum.INFO)
+            self.stop()
+
+        return self.health()
@@ -0,0 +1,334 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from surfgram_cli.config import BlueGreenConfig, ReloadConfig, RunnerConfig
+from surfgram_cli.enums import LevelsEnum, OutputEnum
+from surfgram_cli.utils import debugger
+
+
+class ControlChannel:
+    """JSON-lines messages over one end of a socket pair."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> Optional["ControlChannel"]:
+        """Returns the channel passed to a generation process, if any."""
+        fd = os.environ.get(BlueGreenConfig.CONTROL_FD_ENV)
+        if not fd:
+            return None
+        return cls(socket.socket(fileno=int(fd)))
+
+    def send(self, **message: Any) -> None:
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            self.sock.sendall(data)
+
+    def receive(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reads the next message.
+
+        Returns:
+            The message, or None if the peer closed the channel or the
+            timeout expired.
+        """
+        self.sock.settimeout(timeout)
+        try:
+            line = self._reader.readline()
+        except (socket.timeout, OSError):
+            return None
+        return json.loads(line) if line else None
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+
+class Generation:
+    """One bot process started by the launcher."""
+
+    def __init__(self, argv: Sequence[str], number: int) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        env = dict(os.environ)
+        env[BlueGreenConfig.CONTROL_FD_ENV] = str(child_sock.fileno())
+        self.number = number
+        self.process = subprocess.Popen(
+            list(argv), env=env, pass_fds=(child_sock.fileno(),)
+        )
+        child_sock.close()
+        self.channel = ControlChannel(parent_sock)
+
+    def wait_ready(self, timeout: float) -> bool:
+        message = self.channel.receive(timeout)
+        return bool(message) and message.get("event") == "ready"
+
+    def stop(self, timeout: float) -> None:
+        """Kills the process if it doesn't exit on its own within the timeout."""
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.channel.close()
+
+
+class BlueGreenLauncher:
+    """
+    Keeps a bot running across reloads without a gap in update processing.
+
+    The launcher itself never runs handlers. It starts the bot as a child
+    process ("generation") that polls for updates through the CLI. On reload
+    (SIGHUP or a source change with `--autoreload`) it:
+
+    1. starts a new generation and waits until it has imported the bot and
+       reports ready; the old one keeps serving meanwhile,
+    2. tells the old generation to stop polling and receives its final
+       polling offset,
+    3. starts the new generation from that offset,
+    4. lets the old generation drain its in-flight handlers and exit.
+
+    If the new generation fails to start, the old one keeps running.
+    """
+
+    def __init__(
+        self,
+        bot_dir: str,
+        config: str,
+        debug: bool = False,
+        log_json: Optional[str] = None,
+        autoreload: bool = False,
+        reload_debounce: float = ReloadConfig.DEBOUNCE_SECONDS,
+        reload_include: Optional[List[str]] = None,
+        reload_exclude: Optional[List[str]] = None,
+        api_url: Optional[str] = None,
+        runtime_args: Sequence[str] = (),
+        drain_timeout: float = RunnerConfig.DRAIN_TIMEOUT,
+        output: OutputEnum = OutputEnum.TEXT,
+    ) -> None:
+        """
+        Initializes the BlueGreenLauncher.
+
+        Args:
+            bot_dir: The bot directory.
+            config: Config class in format 'module.ConfigClass'.
+            debug: Whether generations run in debug mode.
+            log_json: File generations also write JSON-lines logs to.
+            autoreload: Whether source changes trigger a reload.
+            reload_debounce: Debounce window for source changes.
+            reload_include: Glob patterns of files that trigger a reload.
+            reload_exclude: Glob patterns of paths to ignore.
+            api_url: Bot API server generations poll instead of the official one.
+            runtime_args: Event loop, executor, concurrency and drain options
+                of `run` passed on to every generation.
+            drain_timeout: Seconds a retiring generation drains its handlers
+                for; it is killed only after that and its last poll.
+            output: Output mode of the launcher, used by generations as well.
+        """
+        self.bot_dir = bot_dir
+        self.argv = [
+            sys.executable,
+            "-m",
+            "surfgram_cli",
+            *(
+                ["--output", output.value]
+                if output == OutputEnum.JSON
+                else ["--no-graphics"]
+            ),
+            "run",
+            "--bot",
+            bot_dir,
+            "--config",
+            config,
+            *(["--debug"] if debug else []),
+            *(["--log-json", log_json] if log_json else []),
+            *(["--api-url", api_url] if api_url else []),
+            *runtime_args,
+        ]
+        self.autoreload = autoreload
+        self.stop_timeout = max(
+            BlueGreenConfig.HANDOVER_TIMEOUT,
+            BlueGreenConfig.POLL_TIMEOUT + drain_timeout + 1,
+        )
+        self.watch_options = dict(
+            debounce=reload_debounce, include=reload_include, exclude=reload_exclude
+        )
+        self.current: Optional[Generation] = None
+        self._generations = 0
+        self._reload_requested = threading.Event()
+        self._stop_requested = threading.Event()
+
+    def _spawn(self) -> Optional[Generation]:
+        """Starts a generation and waits for it to report ready."""
+        self._generations += 1
+        generation = Generation(self.argv, self._generations)
+        debugger.log(
+            f"Generation {generation.number} starting (pid {generation.process.pid})",
+            LevelsEnum.INFO,
+        )
+        if generation.wait_ready(BlueGreenConfig.READY_TIMEOUT):
+            return generation
+        debugger.log(
+            f"Generation {generation.number} did not become ready", LevelsEnum.ERROR
+        )
+        generation.process.kill()
+        generation.stop(timeout=1)
+        return None
+
+    def _retire(self, generation: Generation) -> Optional[int]:
+        """
+        Stops a generation's polling and returns the offset it stopped at.
+
+        Raises:
+            RuntimeError: If the generation doesn't hand over, e.g. because
+                it died and its channel is broken.
+        """
+        try:
+            generation.channel.send(cmd="handover")
+        except OSError as e:
+            raise RuntimeError(
+                f"Generation {generation.number} did not hand over: {e}"
+            ) from e
+        message = generation.channel.receive(BlueGreenConfig.HANDOVER_TIMEOUT)
+        if not message or message.get("event") != "offset":
+            raise RuntimeError(f"Generation {generation.number} did not hand over")
+        return message.get("offset")
+
+    def reload(self) -> None:
+        """Replaces the current generation with a new one."""
+        replacement = self._spawn()
+        if replacement is None:
+            return
+        old = self.current
+        offset = None
+        if old is not None:
+            try:
+                offset = self._retire(old)
+            except RuntimeError as e:
+                # Unconfirmed updates are redelivered to the replacement
+                debugger.log(f"{e}, killing it", LevelsEnum.ERROR)
+                old.process.kill()
+        try:
+            replacement.channel.send(cmd="start", offset=offset)
+        except OSError as e:
+            # The replacement died after reporting ready; run() notices that
+            # the current process has exited
+            debugger.log(
+                f"Generation {replacement.number} can't be started: {e}",
+                LevelsEnum.ERROR,
+            )
+        self.current = replacement
+        debugger.log(
+            f"Generation {replacement.number} took over at offset {offset}",
+            LevelsEnum.INFO,
+        )
+        if old is not None:
+            # The old generation exits by itself once its handlers are drained
+            threading.Thread(
+                target=old.stop, args=(self.stop_timeout,), daemon=True
+            ).start()
+
+    def request_reload(self, paths: Optional[List[str]] = None) -> None:
+        """Asks the launcher loop to reload. Thread- and signal-safe."""
+        self._reload_requested.set()
+
+    def _watch(self) -> None:
+        import watchdog.observers
+        from surfgram_cli.utils.reloader import ReloadHandler
+
+        handler = ReloadHandler(
+            None, self.bot_dir, callback=self.request_reload, **self.watch_options
+        )
+        observer = watchdog.observers.Observer()
+        observer.schedule(handler, self.bot_dir, recursive=True)
+        observer.daemon = True
+        observer.start()
+
+    def run(self) -> None:
+        """Runs generations until interrupted (Ctrl-C or SIGTERM)."""
+        self.reload()
+        if self.current is None:
+            raise RuntimeError("The bot failed to start")
+
+        signal.signal(signal.SIGHUP, lambda *_: self.request_reload())
+        signal.signal(signal.SIGTERM, lambda *_: self._stop_requested.set())
+        if self.autoreload:
+            self._watch()
+
+        try:
+            while not self._stop_requested.is_set():
+                if self._reload_requested.wait(0.2):
+                    self._reload_requested.clear()
+                    self.reload()
+                elif self.current.process.poll() is not None:
+                    raise RuntimeError(
+                        f"Bot process exited with code {self.current.process.returncode}"
+                    )
+        except KeyboardInterrupt:
+            pass
+
+        debugger.log("Stopping the bot...", LevelsEnum.INFO)
+        try:
+            self._retire(self.current)
+        except RuntimeError:
+            pass
+        self.current.stop(self.stop_timeout)
+
+
+def run_generation(
+    channel: ControlChannel,
+    bot: Any,
+    client: Any,
+    max_concurrent: int = RunnerConfig.MAX_CONCURRENT_HANDLERS,
+    drain_timeout: float = RunnerConfig.DRAIN_TIMEOUT,
+) -> None:
+    """
+    Serves one generation inside a process started by `BlueGreenLauncher`.
+
+    Reports ready, waits for the offset to start from, and hands the final
+    offset back when told to retire.
+
+    Args:
+        channel: The control channel to the launcher.
+        bot: The imported surfgram bot instance.
+        client: Bot API client used for polling.
+        max_concurrent: Maximum number of handlers running at once.
+        drain_timeout: Seconds in-flight handlers get after retiring.
+    """
+    from surfgram_cli.runner import UpdateRunner
+
+    # The launcher decides when this process stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    channel.send(event="ready")
+    message = channel.receive()
+    if not message or message.get("cmd") != "start":
+        return
+
+    runner = UpdateRunner(
+        bot,
+        client,
+        offset=message.get("offset"),
+        max_concurrent=max_concurrent,
+        drain_timeout=drain_timeout,
+        poll_timeout=BlueGreenConfig.POLL_TIMEOUT,
+    )
+
+    def listen_for_handover() -> None:
+        message = channel.receive()
+        # A closed channel means the launcher is gone: stop as well
+        offset = runner.stop_polling()
+        if message and message.get("cmd") == "handover":
+            channel.send(event="offset", offset=offset)
+
+    threading.Thread(target=listen_for_handover, daemon=True).start()
+    runner.run()
@@ -1,2 +1,15 @@
-from .banner import BannerComponent
+from importlib import import_module
+
 from .console import ConsoleComponent
+
+_LAZY_ATTRS = {
+    "BannerComponent": ".banner",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
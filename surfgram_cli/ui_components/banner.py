@@ -1,8 +1,10 @@
+from pathlib import Path
+from typing import Optional
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from pyfiglet import Figlet
-from ..config import UIConfig
+from ..config import UIConfig, CacheConfig
+from ..utils import cache
 
 
 class BannerComponent:
@@ -10,7 +12,7 @@ class BannerComponent:
 
     def __init__(self):
         self.console = Console()
-        self._figlet = Figlet(font=UIConfig.BANNER_FONT)
+        self._figlet = None
 
     def _center_text(self, text: str) -> str:
         """Center text based on terminal width"""
@@ -20,14 +22,62 @@ class BannerComponent:
 
     def _render_figlet(self, text: str) -> str:
         """Render text using figlet and center each line"""
+        if self._figlet is None:
+            from pyfiglet import Figlet
+
+            self._figlet = Figlet(font=UIConfig.BANNER_FONT)
         figlet_text = self._figlet.renderText(text)
         return "\n".join(self._center_text(line) for line in figlet_text.split("\n"))
 
+    def _cache_path(self, text: str) -> Path:
+        """Path of the cache entry for the current font, text, width and version"""
+        from .. import __version__
+
+        key = cache.cache_key(
+            UIConfig.BANNER_FONT, text, self.console.width, __version__
+        )
+        return cache.user_cache_dir() / CacheConfig.BANNER_SUBDIR / f"{key}.json"
+
+    def _load_cached(self, text: str) -> Optional[str]:
+        """Return the rendered banner from the cache, if present"""
+        if not cache.cache_enabled():
+            return None
+        entry = cache.read_json(self._cache_path(text))
+        if isinstance(entry, dict) and isinstance(entry.get("banner"), str):
+            return entry["banner"]
+        return None
+
+    def _store_cached(self, text: str, rendered: str) -> None:
+        """Store a rendered banner, dropping entries of other CLI versions"""
+        from .. import __version__
+
+        if not cache.cache_enabled():
+            return
+        path = self._cache_path(text)
+        if not cache.write_json(path, {"version": __version__, "banner": rendered}):
+            return
+        for stale in path.parent.glob("*.json"):
+            if stale == path:
+                continue
+            entry = cache.read_json(stale)
+            if not isinstance(entry, dict) or entry.get("version") != __version__:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def render_banner(self, text: str = UIConfig.BANNER_TEXT) -> str:
+        """Return the centered figlet banner, rendering it only on a cache miss"""
+        rendered = self._load_cached(text)
+        if rendered is None:
+            rendered = self._render_figlet(text)
+            self._store_cached(text, rendered)
+        return rendered
+
     def print_banner(self):
         """Print the main application banner"""
         try:
-            # Render and center the figlet banner
-            centered_figlet_text = self._render_figlet("Surfgram")
+            centered_figlet_text = self.render_banner()
             text = Text(centered_figlet_text, style=UIConfig.BANNER_STYLE)
             self.console.print(Panel(text, border_style=UIConfig.BORDER_STYLE))
 
@@ -1,82 +1,350 @@
-from ..config import UIConfig
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
+import contextlib
+import json
+import sys
+import time
 import typer
+from typing import Any, Dict, List, Optional
 
 from ..config import UIConfig
+from ..enums import OutputEnum, ReloadModeEnum
+from ..utils.debug import debugger
 
 
 class ConsoleComponent:
-    """Component for consistent console output and status messages"""
+    """
+    Component for consistent console output and status messages.
+
+    rich is only imported once graphics are enabled. In JSON output mode
+    every message and report is written to stdout as one JSON object per
+    line instead, with an `event` field naming its kind, and prompts go to
+    stderr so stdout stays parseable line by line. Debug messages still
+    queued are written before any output, so they stay in order.
+    """
 
     def __init__(self):
         self._graphics_enabled: bool = False
-        self.console = None
+        self._output: OutputEnum = OutputEnum.TEXT
+        self._console = None
         self._init_console()
 
     def _init_console(self):
         """Initialize console based on graphics_enabled"""
         if self._graphics_enabled:
             from rich.console import Console
-            from rich.panel import Panel
-            from rich.text import Text
 
-            self.console = Console()
+            self._console = Console()
         else:
-          self.console = None
-          
+            self._console = None
+
+    @property
+    def console(self):
+        """The rich console, once queued debug messages are written"""
+        debugger.flush()
+        return self._console
+
     def set_status(self, graphics: bool = True) -> None:
         """Enable/disable rich graphics and immediately apply changes"""
         if self._graphics_enabled != graphics:
             self._graphics_enabled = graphics
             self._init_console()
 
+    def set_output(self, output: OutputEnum) -> None:
+        """Switch between terminal output and JSON events; JSON disables graphics"""
+        self._output = output
+        if output == OutputEnum.JSON:
+            self.set_status(graphics=False)
+
     @property
     def graphics_enabled(self) -> bool:
         """Check if rich graphics are enabled"""
         return self._graphics_enabled
 
+    @property
+    def json_output(self) -> bool:
+        """Check if results are written as JSON events"""
+        return self._output == OutputEnum.JSON
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Write one JSON event to stdout, in JSON output mode only"""
+        if self._output != OutputEnum.JSON:
+            return
+        record = {"event": event, "time": round(time.time(), 3), **fields}
+        debugger.flush()
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+        sys.stdout.flush()
+
     def print_operation_header(self, message: str) -> None:
         """Print a header for an operation"""
         if self._graphics_enabled:
+            from rich.panel import Panel
+
             self.console.print(Panel.fit(message, style=UIConfig.ACCENT_STYLE))
 
     def print_success_message(self, message: str, title: str = "Success") -> None:
         """Print a success message in a panel"""
+        self.emit("message", status="success", title=title, message=message)
         if self._graphics_enabled:
+            from rich.panel import Panel
+
             self.console.print(
                 Panel(message, title=title, style=UIConfig.SUCCESS_STYLE)
             )
 
     def print_cancel(self, message: str) -> None:
         """Print a cancel message"""
+        self.emit("message", status="cancelled", message=message)
         if self._graphics_enabled:
             self.console.print(f"[yellow]{message}[/]")
 
     def print_error(self, message: str) -> None:
         """Print an error message"""
+        self.emit("message", status="error", message=message)
         if self._graphics_enabled:
             self.console.print(f"[red]{message}[/]")
 
+    def _prompt_output(self):
+        """Context in which prompts are shown: stderr in JSON mode"""
+        debugger.flush()
+        if not self.json_output:
+            return contextlib.nullcontext()
+        # click writes the space after the prompt with input(), i.e. to stdout
+        return contextlib.redirect_stdout(sys.stderr)
+
     def confirm(self, message: str, default: bool = False) -> bool:
-        """Show a confirmation prompt (uses typer, unaffected by graphics mode)"""
-        return typer.confirm(message, default=default)
+        """Show a confirmation prompt (uses typer; on stderr in JSON mode)"""
+        with self._prompt_output():
+            return typer.confirm(message, default=default, err=self.json_output)
 
     def prompt(self, message: str, hide_input: bool = False) -> str:
-        """Show an input prompt (uses typer, unaffected by graphics mode)"""
-        return typer.prompt(message, hide_input=hide_input)
+        """Show an input prompt (uses typer; on stderr in JSON mode)"""
+        with self._prompt_output():
+            return typer.prompt(message, hide_input=hide_input, err=self.json_output)
 
     def print_config_status(
-        self, debug: bool, on_reload: bool, bot: str, config: str
+        self,
+        debug: bool,
+        on_reload: bool,
+        bot: str,
+        config: str,
+        reload_mode: Optional[ReloadModeEnum] = None,
+        workers: int = 1,
+        api_url: Optional[str] = None,
+        profile: Optional[str] = None,
+        memory_report: Optional[str] = None,
+        metrics_port: Optional[int] = None,
+        record: Optional[str] = None,
+        state_file: Optional[str] = None,
+        webhook: Optional[str] = None,
+        loop: Optional[str] = None,
+        executor_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
         """Print configuration status"""
+        self.emit(
+            "config",
+            bot=bot,
+            config=config,
+            debug=debug,
+            autoreload=on_reload,
+            reload_mode=reload_mode,
+            workers=workers,
+            api_url=api_url,
+            webhook=webhook,
+            profile=profile,
+            memory_report=memory_report,
+            metrics_port=metrics_port,
+            record=record,
+            state_file=state_file,
+            loop=loop,
+            executor_workers=executor_workers,
+            max_concurrency=max_concurrency,
+        )
         status_text = "🔧 Debug mode enabled\n" if debug else ""
-        status_text += "🔄 Auto-reload enabled\n" if on_reload else ""
+        if on_reload:
+            status_text += "🔄 Auto-reload enabled"
+            status_text += f" ({reload_mode.value})\n" if reload_mode else "\n"
+        elif reload_mode == ReloadModeEnum.BLUEGREEN:
+            status_text += "🔄 Zero-downtime reload on SIGHUP\n"
+        status_text += f"👷 Workers: {workers}\n" if workers > 1 else ""
+        status_text += f"🌐 Bot API: {api_url}\n" if api_url else ""
+        status_text += f"🪝 Webhook: {webhook}\n" if webhook else ""
+        status_text += f"🔥 Profiling to {profile}\n" if profile else ""
+        if memory_report:
+            status_text += f"🧠 Memory report to {memory_report}\n"
+        if metrics_port is not None:
+            status_text += f"📈 Metrics on port {metrics_port}\n"
+        status_text += f"⏺️ Recording updates to {record}\n" if record else ""
+        status_text += f"💾 Update offset in {state_file}\n" if state_file else ""
+        if loop:
+            status_text += f"⚡ Event loop: {loop}\n"
+            status_text += f"🧵 Executor threads: {executor_workers}\n"
+            status_text += (
+                f"🚦 Max concurrent handlers: {max_concurrency or 'unbounded'}\n"
+            )
         status_text += f"📂 Bot: {bot}\n"
         status_text += f"⚙️ Config: {config}"
 
         if self._graphics_enabled:
+            from rich.panel import Panel
+
             self.console.print(
                 Panel(status_text, title="Configuration", style=UIConfig.ACCENT_STYLE)
             )
+
+    def print_worker_health(
+        self, report: List[Dict[str, Any]], title: str = "Workers"
+    ) -> None:
+        """Print a per-worker health table"""
+        self.emit("health", title=title, rows=report)
+        if not self._graphics_enabled or not report:
+            return
+        from rich.table import Table
+
+        table = Table(title=title, border_style=UIConfig.BORDER_STYLE)
+        for column in report[0]:
+            table.add_column(column.replace("_", " ").title(), justify="right")
+        for row in report:
+            table.add_row(*(str(value) for value in row.values()))
+        self.console.print(table)
+
+    def print_batch_summary(self, summary: Dict[str, Any]) -> None:
+        """Print per-bot results and timings of a batch creation"""
+        self.emit("batch_summary", **summary)
+        if not self._graphics_enabled:
+            return
+        from rich.panel import Panel
+        from rich.table import Table
+
+        table = Table(title="Bots", border_style=UIConfig.BORDER_STYLE)
+        table.add_column("Bot", style=UIConfig.ACCENT_STYLE)
+        table.add_column("Status")
+        table.add_column("Time (ms)", justify="right")
+        table.add_column("Error")
+        styles = {"created": "green", "skipped": "yellow", "failed": "red"}
+        for result in summary["results"]:
+            table.add_row(
+                result["name"],
+                f"[{styles[result['status']]}]{result['status']}[/]",
+                f"{result['seconds'] * 1000:.1f}",
+                result["error"] or "",
+            )
+        self.console.print(table)
+
+        counts = {
+            status: sum(r["status"] == status for r in summary["results"])
+            for status in styles
+        }
+        self.console.print(
+            Panel(
+                f"✨ {counts['created']} created, {counts['skipped']} skipped, "
+                f"{counts['failed']} failed\n"
+                f"⏱️ Templates: {summary['compile_seconds'] * 1000:.1f} ms, "
+                f"rendering and writing: {summary['render_seconds'] * 1000:.1f} ms, "
+                f"total: {summary['total_seconds'] * 1000:.1f} ms",
+                title="Summary",
+                style=UIConfig.SUCCESS_STYLE
+                if not counts["failed"]
+                else UIConfig.ERROR_STYLE,
+            )
+        )
+
+    def print_bench_report(
+        self, report: Dict[str, Any], title: str = "Benchmark"
+    ) -> None:
+        """Print throughput, latency percentiles and memory of a benchmark"""
+        self.emit("bench_report", title=title, **report)
+        if not self._graphics_enabled:
+            return
+        from rich.table import Table
+
+        latency = report["latency_ms"]
+        table = Table(title=title, border_style=UIConfig.BORDER_STYLE)
+        table.add_column("Metric", style=UIConfig.ACCENT_STYLE)
+        table.add_column("Value", justify="right")
+        table.add_row("Updates", str(report["updates"]))
+        table.add_row("Concurrency", str(report["concurrency"]))
+        if "speed" in report:
+            speed = report["speed"]
+            table.add_row("Speed", f"{speed:g}x" if speed else "max")
+        table.add_row("Updates/sec", f"{report['updates_per_second']:,.1f}")
+        for name in ("mean", "p50", "p95", "p99", "max"):
+            table.add_row(f"Latency {name} (ms)", f"{latency[name]:.3f}")
+        if report["peak_rss_mb"] is not None:
+            table.add_row("Peak RSS (MiB)", f"{report['peak_rss_mb']:.1f}")
+        errors = sum(report["errors"].values())
+        table.add_row(
+            "Handler errors",
+            f"[red]{errors}[/]" if errors else "0",
+        )
+        for method, calls in report.get("api_calls", {}).items():
+            table.add_row(f"API calls: {method}", str(calls))
+        self.console.print(table)
+
+    def print_bench_suite(
+        self,
+        results: Dict[str, Any],
+        comparison: List[Dict[str, Any]],
+        baseline: Optional[str] = None,
+    ) -> None:
+        """Print per-case timings of the CLI benchmark, against a baseline if given"""
+        self.emit("bench_suite", **results, comparison=comparison, baseline=baseline)
+        if not self._graphics_enabled:
+            return
+        from rich.table import Table
+
+        changes = {row["case"]: row for row in comparison}
+        table = Table(title="CLI benchmark", border_style=UIConfig.BORDER_STYLE)
+        table.add_column("Case", style=UIConfig.ACCENT_STYLE, no_wrap=True)
+        for column in ("Median (ms)", "Min (ms)", "Stdev (ms)", "Baseline (ms)"):
+            table.add_column(column, justify="right")
+        table.add_column("Change", justify="right")
+        for name, result in results["cases"].items():
+            row = changes.get(name, {})
+            change = row.get("change_pct")
+            if change is None:
+                change_text = ""
+            elif row["regressed"]:
+                change_text = f"[red]{change:+.1f}%[/]"
+            else:
+                change_text = f"{change:+.1f}%"
+            table.add_row(
+                name,
+                f"{result['median_ms']:.2f}",
+                f"{result['min_ms']:.2f}",
+                f"{result['stdev_ms']:.2f}",
+                f"{row['baseline_ms']:.2f}" if row.get("baseline_ms") else "",
+                change_text,
+            )
+        self.console.print(table)
+        if baseline and not comparison:
+            self.console.print(f"📄 Baseline written to {baseline}")
+
+    def print_mock_api_stats(self, stats: Dict[str, Any]) -> None:
+        """Print per-method response times and per-bot counters of the mock API"""
+        self.emit("mock_api_stats", **stats)
+        if not self._graphics_enabled:
+            return
+        from rich.table import Table
+
+        methods = Table(title="Requests", border_style=UIConfig.BORDER_STYLE)
+        methods.add_column("Method", style=UIConfig.ACCENT_STYLE)
+        for column in ("Requests", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)"):
+            methods.add_column(column, justify="right")
+        for method, timing in stats["methods"].items():
+            methods.add_row(method, *(str(value) for value in timing.values()))
+        self.console.print(methods)
+
+        if stats["bots"]:
+            bots = Table(title="Bots", border_style=UIConfig.BORDER_STYLE)
+            for column in stats["bots"][0]:
+                bots.add_column(column.replace("_", " ").title(), justify="right")
+            for bot in stats["bots"]:
+                bots.add_row(*(str(value) for value in bot.values()))
+            self.console.print(bots)
+
+        statuses = ", ".join(
+            f"{status}: {count}" for status, count in stats["statuses"].items()
+        )
+        self.console.print(
+            f"⏱️ {stats['seconds']:.1f}s, responses by status: {statuses or 'none'}"
+        )
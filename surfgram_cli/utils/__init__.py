@@ -1,2 +1,16 @@
+from importlib import import_module
+
 from .debug import debugger
-from .reloader import ReloadHandler, monitor_changes
+
+_LAZY_ATTRS = {
+    "ReloadHandler": ".reloader",
+    "monitor_changes": ".reloader",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
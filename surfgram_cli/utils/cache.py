@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from surfgram_cli.config import CacheConfig
+
+
+def cache_enabled() -> bool:
+    """Returns False when on-disk caching is disabled through the environment."""
+    return not os.environ.get(CacheConfig.DISABLE_ENV_VAR)
+
+
+def user_cache_dir() -> Path:
+    """
+    Returns the per-user cache directory of the CLI.
+
+    `SURFGRAM_CLI_CACHE_DIR` takes precedence, then the platform default
+    (`%LOCALAPPDATA%`, `~/Library/Caches` or `$XDG_CACHE_HOME`).
+    """
+    override = os.environ.get(CacheConfig.DIR_ENV_VAR)
+    if override:
+        return Path(override)
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / CacheConfig.DIR_NAME
+
+
+def cache_key(*parts: Any) -> str:
+    """Builds a stable hex key from the given parts."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def read_json(path: Path) -> Optional[Any]:
+    """Reads a cache entry, treating missing or corrupt files as a miss."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, data: Any) -> bool:
+    """
+    Atomically writes a cache entry.
+
+    Failures are swallowed: a read-only or full cache directory must never
+    break a command.
+
+    Returns:
+        True if the entry was written.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,108 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+# File header: magic and format version
+MAGIC = b"SGUPD"
+VERSION = 1
+HEADER = struct.Struct("<5sB")
+# Record header: payload length and receive time in nanoseconds since the epoch
+RECORD = struct.Struct("<IQ")
+
+
+class UpdateRecorder:
+    """
+    Appends updates to a capture file.
+
+    The format is a small header followed by length-prefixed records, each
+    holding the receive time and the update as compact JSON. Records are
+    only ever appended, so a capture can be extended by later runs, and a
+    record cut short by a crash is ignored on reading.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the UpdateRecorder.
+
+        Args:
+            path: The capture file; created if missing, appended to otherwise.
+
+        Raises:
+            ValueError: If the file exists and isn't a capture.
+        """
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+        else:
+            _check_header(path)
+
+    def record(self, updates: Iterable[Dict[str, Any]]) -> None:
+        """Appends a batch of updates and flushes them to the OS."""
+        received = time.time_ns()
+        chunks = []
+        for update in updates:
+            payload = json.dumps(update, separators=(",", ":")).encode("utf-8")
+            chunks.append(RECORD.pack(len(payload), received))
+            chunks.append(payload)
+        if not chunks:
+            return
+        with self._lock:
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            self.count += len(chunks) // 2
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _check_header(path: str) -> None:
+    with open(path, "rb") as capture:
+        header = capture.read(HEADER.size)
+    if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+        raise ValueError(f"{path} is not an update capture")
+    version = HEADER.unpack(header)[1]
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported capture version {version}")
+
+
+def read_updates(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Streams the updates of a capture file.
+
+    The file is memory-mapped and decoded one record at a time, so captures
+    larger than memory can be replayed.
+
+    Args:
+        path: The capture file.
+
+    Yields:
+        (receive time in nanoseconds, update) pairs in recording order.
+
+    Raises:
+        ValueError: If the file isn't a capture.
+    """
+    _check_header(path)
+    if os.path.getsize(path) == HEADER.size:
+        return
+
+    with open(path, "rb") as capture, mmap.mmap(
+        capture.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        offset = HEADER.size
+        end = len(data)
+        while offset + RECORD.size <= end:
+            length, received = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            if start + length > end:
+                break
+            yield received, json.loads(data[start : start + length])
+            offset = start + length
@@ -0,0 +1,271 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+from surfgram_cli.config import CrashConfig
+
+
+def fingerprint(
+    error: BaseException, frames: int = CrashConfig.FINGERPRINT_FRAMES
+) -> str:
+    """
+    Identifies an error by its type and innermost frames.
+
+    Line numbers are left out, so an edit elsewhere in a file doesn't turn a
+    known error into a new one. The traceback is walked directly instead of
+    being formatted, which would read source lines for every repeat.
+
+    Args:
+        error: The exception.
+        frames: Number of innermost frames taken into account.
+
+    Returns:
+        A short hex digest.
+    """
+    innermost: Deque[str] = deque(maxlen=frames)
+    tb = error.__traceback__
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        innermost.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        tb = tb.tb_next
+    kind = type(error)
+    parts = [f"{kind.__module__}.{kind.__qualname__}", *innermost]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def redact_argv(argv: Sequence[str]) -> List[str]:
+    """
+    Returns a command line with the values of secret options replaced.
+
+    An option is secret if its name contains one of
+    `CrashConfig.SECRET_OPTION_WORDS`, e.g. `--webhook-secret`; both
+    `--option value` and `--option=value` are handled.
+    """
+
+    def secret(option: str) -> bool:
+        name = option.lstrip("-").lower()
+        return any(word in name for word in CrashConfig.SECRET_OPTION_WORDS)
+
+    redacted: List[str] = []
+    hide_next = False
+    for arg in argv:
+        if hide_next:
+            redacted.append("***")
+            hide_next = False
+        elif arg.startswith("--") and "=" in arg:
+            option, _, value = arg.partition("=")
+            redacted.append(f"{option}=***" if secret(option) else arg)
+        else:
+            redacted.append(arg)
+            hide_next = arg.startswith("-") and secret(arg)
+    return redacted
+
+
+def crash_dir() -> Path:
+    """Directory crash dumps are written to."""
+    override = os.environ.get(CrashConfig.DIR_ENV_VAR)
+    if override:
+        return Path(override)
+    from .cache import user_cache_dir
+
+    return user_cache_dir() / CrashConfig.SUBDIR
+
+
+class _Occurrences:
+    """Repeats of one fingerprint within the current window."""
+
+    __slots__ = ("message", "window_start", "suppressed")
+
+    def __init__(self, message: str, now: float) -> None:
+        self.message = message
+        self.window_start = now
+        self.suppressed = 0
+
+    def summary(self, now: float, message: Optional[str] = None) -> str:
+        return (
+            f"{message or self.message} ({self.suppressed} more occurrence(s) "
+            f"in the last {now - self.window_start:.0f}s)"
+        )
+
+
+class ErrorReport(NamedTuple):
+    """What `ErrorReporter.record` reports for one error."""
+
+    message: str
+    dump: Optional[Path]
+
+
+class ErrorReporter:
+    """
+    Deduplicates and rate-limits error output.
+
+    Errors are fingerprinted by exception type and innermost frames. The
+    first occurrence of a fingerprint is reported and, unless it is an
+    expected error, its traceback written to a crash dump. Repeats within
+    `window` seconds are only counted; once the window has ended, a
+    background thread logs how many were left out, or the next report of
+    that fingerprint says so. Crash dumps are plain text, truncated to
+    `CrashConfig.MAX_DUMP_BYTES`, with the values of secret options left out
+    of the command line, and only the newest `max_dumps` are kept.
+    """
+
+    def __init__(
+        self,
+        window: float = CrashConfig.WINDOW,
+        max_dumps: int = CrashConfig.MAX_DUMPS,
+        summary_interval: Optional[float] = CrashConfig.SUMMARY_INTERVAL,
+    ) -> None:
+        """
+        Initializes the ErrorReporter.
+
+        Args:
+            window: Seconds during which repeats of an error are only counted.
+            max_dumps: Crash dumps kept in the crash directory.
+            summary_interval: Seconds between checks of the background
+                thread for summaries that are due; None leaves them to
+                `due` and `flush`.
+        """
+        self.window = window
+        self.max_dumps = max_dumps
+        self.summary_interval = summary_interval
+        self._seen: Dict[str, _Occurrences] = {}
+        self._lock = threading.Lock()
+        # Pid of the process the summary thread runs in; forked children
+        # start their own
+        self._summary_pid: Optional[int] = None
+
+    def report(self, error: BaseException, message: str) -> Optional[str]:
+        """
+        Records an error; see `record`.
+
+        Returns:
+            The message to show, or None if the error is a repeat that is
+            only counted.
+        """
+        report = self.record(error, message)
+        return report.message if report is not None else None
+
+    def record(
+        self, error: BaseException, message: str, dump: bool = True
+    ) -> Optional[ErrorReport]:
+        """
+        Records an error.
+
+        Args:
+            error: The exception, with its traceback.
+            message: What to show for it.
+            dump: Whether to write a crash dump; False for expected errors,
+                whose message says everything.
+
+        Returns:
+            The message to show, with the number of repeats left out since it
+            was last shown, and the crash dump written for it; None if the
+            error is a repeat that is only counted.
+        """
+        key = fingerprint(error)
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen.window_start < self.window:
+                seen.suppressed += 1
+                self._start_summaries()
+                return None
+            self._seen[key] = _Occurrences(message, now)
+
+        if seen is not None and seen.suppressed:
+            message = seen.summary(now, message)
+        return ErrorReport(message, self._dump(error, key, message) if dump else None)
+
+    def due(self) -> List[str]:
+        """
+        Returns summaries of the repeats whose window has ended and forgets
+        those errors, so their next occurrence is reported again.
+        """
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            for key, seen in list(self._seen.items()):
+                if now - seen.window_start < self.window:
+                    continue
+                if seen.suppressed:
+                    summaries.append(seen.summary(now))
+                del self._seen[key]
+        return summaries
+
+    def _start_summaries(self) -> None:
+        """Starts the thread logging due summaries, once per process."""
+        if self.summary_interval is None or self._summary_pid == os.getpid():
+            return
+        self._summary_pid = os.getpid()
+        threading.Thread(
+            target=self._log_summaries, name="surfgram-error-summaries", daemon=True
+        ).start()
+
+    def _log_summaries(self) -> None:
+        from surfgram_cli.enums import LevelsEnum
+        from .debug import debugger
+
+        while True:
+            time.sleep(self.summary_interval)
+            for summary in self.due():
+                debugger.log(summary, LevelsEnum.ERROR)
+
+    def flush(self) -> List[str]:
+        """
+        Returns summaries of the repeats not reported yet and resets them.
+        Called on shutdown, so counts of a storm that just ended aren't lost.
+        """
+        now = time.monotonic()
+        with self._lock:
+            summaries = [
+                seen.summary(now) for seen in self._seen.values() if seen.suppressed
+            ]
+            self._seen.clear()
+        return summaries
+
+    def _dump(self, error: BaseException, key: str, message: str) -> Optional[Path]:
+        """Writes a crash dump; returns its path, or None if it can't be written."""
+        header = [
+            f"time: {time.strftime('%Y-%m-%dT%H:%M:%S%z')}",
+            f"fingerprint: {key}",
+            f"message: {message}",
+            f"python: {sys.version.split()[0]}",
+            f"argv: {' '.join(redact_argv(sys.argv))}",
+            "",
+        ]
+        body = "".join(
+            traceback.format_exception(type(error), error, error.__traceback__)
+        )
+        content = "\n".join(header) + body
+        if len(content) > CrashConfig.MAX_DUMP_BYTES:
+            content = content[: CrashConfig.MAX_DUMP_BYTES] + "\n[truncated]\n"
+
+        directory = crash_dir()
+        path = directory / f"crash-{time.strftime('%Y%m%d-%H%M%S')}-{key}.txt"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            temporary = directory / f".{path.name}.{os.getpid()}.tmp"
+            temporary.write_text(content, encoding="utf-8")
+            os.replace(temporary, path)
+            self._rotate(directory)
+        except OSError:
+            return None
+        return path
+
+    def _rotate(self, directory: Path) -> None:
+        # Names start with the time, so they sort from the oldest
+        dumps = sorted(directory.glob("crash-*.txt"))
+        for old in dumps[: max(len(dumps) - self.max_dumps, 0)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+errors = ErrorReporter()
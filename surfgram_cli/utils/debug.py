@@ -1,17 +1,103 @@
-from typing import Any
-from rich.console import Console
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional, TextIO, Union
+from surfgram_cli.config import DebugConfig
 from surfgram_cli.enums import LevelsEnum
 
 
+class LogRecord(NamedTuple):
+    """A log message waiting to be written by the sinks."""
+
+    created: float
+    level: LevelsEnum
+    message: Any
+
+
+class ConsoleSink:
+    """Writes records to the terminal through rich, using the debugger's format."""
+
+    def __init__(self, output_format: str) -> None:
+        self.output_format = output_format
+        self._console = None
+
+    @property
+    def console(self):
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return self._console
+
+    def write(self, record: LogRecord) -> None:
+        level = record.level
+        self.console.print(
+            self.output_format.format(
+                prefix=f"[{level.color}][{level.prefix}][/{level.color}]",
+                message=record.message,
+            )
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink:
+    """Writes one JSON object per record to a file or stream."""
+
+    def __init__(self, target: Union[str, TextIO]) -> None:
+        """
+        Initializes the JsonLinesSink.
+
+        Args:
+            target: A path to append to, or an open text stream.
+        """
+        if isinstance(target, str):
+            self.stream = open(target, "a", encoding="utf-8", buffering=1)
+            self._owned = True
+        else:
+            self.stream = target
+            self._owned = False
+
+    def write(self, record: LogRecord) -> None:
+        self.stream.write(
+            json.dumps(
+                {
+                    "ts": round(record.created, 6),
+                    "level": record.level.prefix,
+                    "pid": os.getpid(),
+                    "message": str(record.message),
+                }
+            )
+            + "\n"
+        )
+
+    def close(self) -> None:
+        self.stream.flush()
+        if self._owned:
+            self.stream.close()
+
+
 class Debugger:
     """
     A flexible debugger class for logging messages with different levels, colors, and output formats.
 
+    Messages below the configured level are discarded before any formatting.
+    The rest are queued and written by a background thread, so a slow terminal
+    or log collector never blocks the caller. The queue is bounded; when it is
+    full new messages are dropped and counted. Output that has to appear
+    after the queued messages, like the CLI's own console output, calls
+    `flush()` first.
+
     Attributes:
         debug_mode (bool):  Indicates if debug mode is enabled. If False, no logs are printed.
         level (LevelsEnum): The minimum log level to display.  Messages with a level lower
                            than this will not be printed.
         output_format (str): The format of the output message.
+        dropped (int): Number of messages dropped because the queue was full.
     """
 
     def __init__(
@@ -19,6 +105,7 @@ class Debugger:
         debug_mode: bool = False,
         level: LevelsEnum = LevelsEnum.INFO,
         output_format: str = "{prefix} {message}",
+        max_queue: int = DebugConfig.QUEUE_SIZE,
     ) -> None:
         """
         Initializes the Debugger.
@@ -27,11 +114,56 @@ class Debugger:
             debug_mode:  Enables or disables debugging output.
             level: The minimum log level to display.
             output_format: The format of the output message.
+            max_queue: Maximum number of messages waiting to be written.
         """
         self.debug_mode = debug_mode
         self.level = level
-        self.output_format = output_format
-        self.console = Console()
+        self.max_queue = max_queue
+        self.console_sink = ConsoleSink(output_format)
+        self.sinks: List[Any] = [self.console_sink]
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def _reset(self) -> None:
+        """Creates a fresh queue; the writer thread is started on first use."""
+        self._queue: "queue.Queue[LogRecord]" = queue.Queue(self.max_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def output_format(self) -> str:
+        return self.console_sink.output_format
+
+    @output_format.setter
+    def output_format(self, value: str) -> None:
+        self.console_sink.output_format = value
+
+    @property
+    def console(self):
+        return self.console_sink.console
+
+    def replace_console(self, sink: Any) -> None:
+        """
+        Writes to `sink` instead of the terminal, e.g. a `JsonLinesSink` on
+        stderr when the CLI's output is machine-readable.
+
+        Args:
+            sink: An object with `write(record)` and `close()` methods.
+        """
+        self.sinks[self.sinks.index(self.console_sink)] = sink
+
+    def add_sink(self, sink: Any) -> None:
+        """
+        Adds an output next to the console.
+
+        Args:
+            sink: An object with `write(record)` and `close()` methods.
+        """
+        self.sinks.append(sink)
 
     def log(self, message: Any, level: LevelsEnum) -> None:
         """
@@ -42,12 +174,74 @@ class Debugger:
             message: The message to log.
             level: The log level of the message (e.g., INFO, ERROR).
         """
-        if self.debug_mode:
-            formatted_message = self.output_format.format(
-                prefix=f"[{level.color}][{level.prefix}][/{level.color}]",
-                message=message,
-            )
-            self.console.print(formatted_message)
+        if not self.debug_mode or level.value < self.level.value:
+            return
+        if self._writer is None:
+            self._start_writer()
+        try:
+            self._queue.put_nowait(LogRecord(time.time(), level, message))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="surfgram-debugger", daemon=True
+                )
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                self._report_dropped()
+                for sink in self.sinks:
+                    try:
+                        sink.write(record)
+                    except Exception:
+                        pass
+            finally:
+                self._queue.task_done()
+
+    def _report_dropped(self) -> None:
+        """Writes a notice when messages were dropped since the last one."""
+        with self._lock:
+            dropped = self.dropped - self._reported_dropped
+            if dropped <= 0:
+                return
+            self._reported_dropped = self.dropped
+        notice = LogRecord(
+            time.time(), LevelsEnum.ERROR, f"{dropped} log message(s) dropped"
+        )
+        for sink in self.sinks:
+            try:
+                sink.write(notice)
+            except Exception:
+                pass
+
+    def flush(self, timeout: float = DebugConfig.FLUSH_TIMEOUT) -> None:
+        """
+        Waits until queued messages are written.
+
+        Args:
+            timeout: Maximum seconds to wait.
+        """
+        if self._writer is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        """Flushes pending messages and closes the sinks."""
+        self.flush()
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
 
 
 debugger = Debugger()
@@ -0,0 +1,131 @@
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+Dispatcher = Callable[[Dict[str, Any]], Any]
+
+
+def find_dispatcher(bot: Any) -> Dispatcher:
+    """
+    Returns a callable that hands one raw update to the bot's handlers.
+
+    Updates go through the bot's listener exactly like in `Bot.listen()`:
+    `listener.on_update(APIObject(update), bot)`. The listener is looked up
+    for every update, so one rebuilt by an in-place reload takes over at
+    once. The bot itself is never probed with `getattr`: surfgram's
+    `Bot.__getattr__` turns any missing name into a Bot API method wrapper,
+    so every probe would succeed.
+
+    Args:
+        bot: A surfgram `Bot` instance.
+
+    Returns:
+        A callable taking the raw update dictionary.
+
+    Raises:
+        RuntimeError: If the bot has no listener accepting updates.
+    """
+    listener = vars(bot).get("listener")
+    on_update = getattr(listener, "on_update", None)
+    if not callable(on_update):
+        raise RuntimeError(
+            "The bot has no listener to hand updates to\n"
+            "Set __listener__ on the bot's config (e.g. surfgram's BaseListener)"
+        )
+
+    from surfgram import APIObject
+
+    def dispatch(update: Dict[str, Any]) -> Any:
+        return bot.listener.on_update(APIObject(update), bot)
+
+    return dispatch
+
+
+def replace_api_client(bot: Any, client: Any) -> None:
+    """
+    Sends a bot's Bot API calls through another client.
+
+    surfgram's `Bot` makes every API call with
+    `bot.client.send_request(method, json_params)`, so swapping `client`
+    redirects what handlers send, e.g. to a local mock.
+
+    Args:
+        bot: A surfgram `Bot` instance.
+        client: Object with an async `send_request(method, params)` returning
+            the response body.
+
+    Raises:
+        RuntimeError: If the bot has no API client to replace.
+    """
+    if "client" not in vars(bot):
+        raise RuntimeError(
+            "Can't redirect the bot's API calls: it has no 'client' attribute\n"
+            "This surfgram version is not supported"
+        )
+    bot.client = client
+
+
+def redirect_api_calls(
+    bot: Any, config_class: type, api_url: Optional[str], pool: Any = None
+) -> None:
+    """
+    Sends a bot's Bot API calls to `api_url` instead of Telegram.
+
+    Does nothing without an `api_url`. The calls go through `pool`, an
+    `AsyncConnectionPool`, when given.
+
+    Raises:
+        RuntimeError: If the bot's API client can't be replaced.
+    """
+    if not api_url:
+        return
+    from .telegram import RedirectedBotClient
+
+    token = get_bot_token(config_class)
+    replace_api_client(bot, RedirectedBotClient(token, api_url, pool))
+
+
+async def dispatch_update(dispatcher: Dispatcher, update: Dict[str, Any]) -> None:
+    """
+    Runs the handlers for one update, awaiting them if the listener is async.
+
+    Args:
+        dispatcher: Callable returned by `find_dispatcher`.
+        update: The raw update dictionary.
+    """
+    result: Optional[Awaitable] = dispatcher(update)
+    if inspect.isawaitable(result):
+        await result
+
+
+def get_bot_token(config_class: type) -> str:
+    """
+    Returns the bot token declared on a config class.
+
+    Raises:
+        ValueError: If the config has no token.
+    """
+    token = getattr(config_class, "__bot_token__", None)
+    if not token:
+        raise ValueError(
+            f"'{config_class.__name__}' has no bot token\n"
+            f"Set __bot_token__ (BOT_TOKEN in the bot's .env)"
+        )
+    return token
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """
+    Returns the chat (or user) an update belongs to, if any.
+
+    Used to keep all updates of one conversation on the same worker.
+    """
+    for key, payload in update.items():
+        if key == "update_id" or not isinstance(payload, dict):
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return chat["id"]
+        sender = payload.get("from") or payload.get("user")
+        if isinstance(sender, dict) and "id" in sender:
+            return sender["id"]
+    return None
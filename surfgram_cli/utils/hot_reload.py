@@ -0,0 +1,291 @@
+import ast
+import importlib
+import importlib.util
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import debugger
+from surfgram_cli.enums import LevelsEnum
+
+
+class ModuleGraph:
+    """
+    Import dependency graph of the bot package.
+
+    Only modules that are already imported and live under the bot directory
+    are part of the graph. Import statements are read with `ast`, so building
+    the graph never executes bot code; parsed files are cached by mtime.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initializes the ModuleGraph.
+
+        Args:
+            directory: The bot directory.
+        """
+        self.root = Path(directory).resolve()
+        self._imports_cache: Dict[Path, Tuple[float, Set[str]]] = {}
+
+    def modules(self) -> Dict[str, Path]:
+        """
+        Returns the imported bot modules.
+
+        Returns:
+            A mapping of module name to the resolved path of its source file.
+        """
+        result = {}
+        for name, module in list(sys.modules.items()):
+            file = getattr(module, "__file__", None)
+            if not file or not file.endswith(".py"):
+                continue
+            path = Path(file).resolve()
+            if self.root == path.parent or self.root in path.parents:
+                result[name] = path
+        return result
+
+    def _imports(self, name: str, path: Path) -> Set[str]:
+        """Returns every module name imported by the given source file."""
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return set()
+        cached = self._imports_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (SyntaxError, ValueError):
+            return cached[1] if cached else set()
+
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                relative = "." * node.level + (node.module or "")
+                try:
+                    base = importlib.util.resolve_name(relative, package)
+                except (ImportError, ValueError):
+                    continue
+                imported.add(base)
+                imported.update(f"{base}.{alias.name}" for alias in node.names)
+
+        self._imports_cache[path] = (mtime, imported)
+        return imported
+
+    def build(self, modules: Dict[str, Path]) -> Dict[str, Set[str]]:
+        """
+        Builds the dependency edges between bot modules.
+
+        Args:
+            modules: Bot modules as returned by `modules()`.
+
+        Returns:
+            A mapping of module name to the bot modules it depends on.
+        """
+        graph = {}
+        for name, path in modules.items():
+            deps = set()
+            for imported in self._imports(name, path):
+                # `import a.b.c` also executes `a` and `a.b`
+                parts = imported.split(".")
+                for i in range(1, len(parts) + 1):
+                    candidate = ".".join(parts[:i])
+                    if candidate in modules and candidate != name:
+                        deps.add(candidate)
+            graph[name] = deps
+        return graph
+
+    @staticmethod
+    def dependents(graph: Dict[str, Set[str]], changed: Set[str]) -> Set[str]:
+        """
+        Returns the changed modules plus everything that transitively imports them.
+        """
+        reverse: Dict[str, Set[str]] = {name: set() for name in graph}
+        for name, deps in graph.items():
+            for dep in deps:
+                reverse.setdefault(dep, set()).add(name)
+
+        result = set(changed)
+        pending = list(changed)
+        while pending:
+            for dependent in reverse.get(pending.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    pending.append(dependent)
+        return result
+
+    @staticmethod
+    def reload_order(graph: Dict[str, Set[str]], targets: Set[str]) -> List[str]:
+        """
+        Orders modules so that dependencies are reloaded before their dependents.
+
+        Import cycles are broken in name order.
+        """
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name):
+                return
+            state[name] = 1
+            for dep in sorted(graph.get(name, ())):
+                if dep in targets:
+                    visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in sorted(targets):
+            visit(name)
+        return order
+
+
+class HotReloader:
+    """
+    Reloads changed bot modules inside the running process.
+
+    Only the changed modules and the modules depending on them are
+    re-executed, in dependency order. The bot instance, its event loop and its
+    network session are kept. `Bot` reads its listener from the config class
+    only when it is created, so a new listener is created when the config or
+    listener module was reloaded; a changed token needs a restart.
+    """
+
+    def __init__(
+        self, bot: Any, directory: str, config_class: Optional[type] = None
+    ) -> None:
+        """
+        Initializes the HotReloader.
+
+        Args:
+            bot: The running bot instance.
+            directory: The bot directory.
+            config_class: The bot's config class. Without it, only changes
+                to the listener's module are applied to the bot.
+        """
+        self.bot = bot
+        self.config_class = config_class
+        self.graph = ModuleGraph(directory)
+
+    def reload(self, paths: Iterable[str]) -> bool:
+        """
+        Reloads the modules behind the given files.
+
+        Args:
+            paths: Changed file paths.
+
+        Returns:
+            True if the change was applied in place, False if the process has to
+            be restarted instead (non-Python files or a failed reload).
+        """
+        started = time.perf_counter()
+        paths = [Path(path).resolve() for path in paths]
+        if any(path.suffix != ".py" for path in paths):
+            return False
+
+        modules = self.graph.modules()
+        by_path = {path: name for name, path in modules.items()}
+        changed = {by_path[path] for path in paths if path in by_path}
+        if not changed:
+            debugger.log("Changed files are not imported by the bot", LevelsEnum.INFO)
+            return True
+
+        graph = self.graph.build(modules)
+        order = self.graph.reload_order(graph, self.graph.dependents(graph, changed))
+
+        importlib.invalidate_caches()
+        self._unregister_handlers(set(order))
+        try:
+            for name in order:
+                importlib.reload(sys.modules[name])
+            if not self._refresh_bot(set(order)):
+                return False
+        except Exception as e:
+            debugger.log(f"In-place reload failed: {e!r}", LevelsEnum.ERROR)
+            return False
+
+        debugger.log(
+            f"Reloaded {len(order)} module(s) in "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms: {', '.join(order)}",
+            LevelsEnum.INFO,
+        )
+        return True
+
+    def _refresh_bot(self, reloaded: Set[str]) -> bool:
+        """
+        Applies reloaded config and listener modules to the running bot.
+
+        Returns:
+            False if the process has to be restarted instead: the token
+            changed, or a reloaded class can't be found again.
+        """
+        config = self.config_class
+        if config is not None and config.__module__ in reloaded:
+            config = _reloaded_class(config)
+            if config is None:
+                return False
+            if config.get_token() != self.config_class.get_token():
+                debugger.log("The bot token changed", LevelsEnum.INFO)
+                return False
+            self.config_class = config
+
+        current = type(self.bot.listener)
+        if config is not None:
+            listener_class = config.get_listener()
+        elif current.__module__ in reloaded:
+            listener_class = _reloaded_class(current)
+            if listener_class is None:
+                return False
+        else:
+            return True
+        if listener_class is current and current.__module__ not in reloaded:
+            return True
+        self.bot.listener = listener_class()
+        debugger.log(
+            f"Created a new {listener_class.__name__} listener", LevelsEnum.INFO
+        )
+        return True
+
+    @staticmethod
+    def _unregister_handlers(modules: Set[str]) -> None:
+        """
+        Removes the handlers defined in the given modules from surfgram.
+
+        Surfgram registers a handler class in its type's factory when the
+        class is created, in process-global dicts keyed by trigger name and
+        as the type's fallback handler. Reloading a module registers its
+        classes again, but the entries of handlers it no longer defines, or
+        defines under other triggers, would stay; so they are removed first.
+        A failed reload restarts the process, so removing them is safe.
+        """
+        try:
+            from surfgram.types import TypesFactory
+        except ImportError:
+            return
+
+        for factory in list(TypesFactory.TYPES.values()):
+            for name, registry in list(vars(factory).items()):
+                if not (name.endswith("_REGISTRY") and isinstance(registry, dict)):
+                    continue
+                for trigger, handler in list(registry.items()):
+                    if getattr(handler, "__module__", None) in modules:
+                        del registry[trigger]
+            fallback = vars(factory).get("__fallback_handler__")
+            if getattr(fallback, "__module__", None) in modules:
+                factory.__fallback_handler__ = None
+
+
+def _reloaded_class(cls: type) -> Optional[type]:
+    """Returns the class of the same name from its reloaded module, if any."""
+    found = getattr(sys.modules.get(cls.__module__), cls.__qualname__, None)
+    if not isinstance(found, type):
+        debugger.log(
+            f"{cls.__qualname__} is gone from {cls.__module__}", LevelsEnum.INFO
+        )
+        return None
+    return found
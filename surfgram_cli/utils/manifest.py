@@ -0,0 +1,70 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def load_manifest(path: str) -> Any:
+    """
+    Loads a JSON or YAML manifest file.
+
+    YAML needs PyYAML, which is only imported for `.yaml`/`.yml` files.
+
+    Args:
+        path: Path to the manifest.
+
+    Returns:
+        The parsed document.
+    """
+    manifest_path = Path(path)
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifest not found: {manifest_path}")
+
+    text = manifest_path.read_text(encoding="utf-8")
+    if manifest_path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError(
+                "Reading YAML manifests requires PyYAML\n"
+                "Solution: pip install pyyaml, or use a .json manifest"
+            ) from e
+        return yaml.safe_load(text)
+
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in manifest {manifest_path}: {e}") from e
+
+
+def manifest_entries(document: Any, key: str = "bots") -> List[Dict[str, Any]]:
+    """
+    Returns the list of entries of a manifest.
+
+    Accepts either a bare list or a mapping holding the list under `key`.
+    String values of the form `env:NAME` are replaced by that environment
+    variable, so tokens don't have to be stored in the manifest.
+
+    Raises:
+        ValueError: If the document has no list of mappings.
+    """
+    entries = document.get(key) if isinstance(document, dict) else document
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        raise ValueError(
+            f"Manifest must be a list of entries or a mapping with a '{key}' list"
+        )
+
+    resolved = []
+    for entry in entries:
+        item = dict(entry)
+        for field, value in entry.items():
+            if isinstance(value, str) and value.startswith("env:"):
+                variable = value[4:]
+                if variable not in os.environ:
+                    raise ValueError(
+                        f"Environment variable '{variable}' referenced by the "
+                        f"manifest is not set"
+                    )
+                item[field] = os.environ[variable]
+        resolved.append(item)
+    return resolved
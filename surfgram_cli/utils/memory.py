@@ -0,0 +1,346 @@
+import json
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from surfgram_cli.config import MemoryConfig
+from surfgram_cli.enums import LevelsEnum
+from . import debugger
+from .metrics import resident_memory_bytes
+from .profiler import FRAMEWORK_LABEL, bot_module
+
+MIB = 1024 * 1024
+
+# Allocations of the import system, tracemalloc and the reporter are noise
+IGNORED_FILES = frozenset(
+    (
+        tracemalloc.__file__,
+        __file__,
+        "<frozen importlib._bootstrap>",
+        "<frozen importlib._bootstrap_external>",
+        "<unknown>",
+    )
+)
+
+# site -> [module, size, count]
+Sites = Dict[str, List]
+
+
+class MemoryReporter:
+    """
+    Finds where a running bot's memory grows.
+
+    Allocations are traced with `tracemalloc`, keeping `frames` frames per
+    allocation. Every `interval` seconds, and whenever the process receives
+    SIGUSR2, the live allocations are attributed to allocation sites and
+    compared with the previous report: a site is the innermost frame in the
+    bot package, or the innermost frame at all for allocations the bot's
+    code doesn't appear in. Sites are grouped by bot module.
+
+    Each report is logged through the debugger and, if an output file is
+    given, appended to it as a JSON line. With `rss_limit`, resident memory
+    is checked every second and crossing the limit logs an error and takes
+    a report right away; the limit is re-armed once RSS drops below it.
+
+    Tracing slows allocations down and stores a traceback per live block,
+    so the cost grows with `frames`. Reports are taken on a background
+    thread and only per-site totals are kept between them, not snapshots.
+    """
+
+    def __init__(
+        self,
+        bot_dir: str,
+        output: Optional[str] = None,
+        interval: float = MemoryConfig.INTERVAL,
+        rss_limit: Optional[float] = None,
+        frames: int = MemoryConfig.FRAMES,
+        top: int = MemoryConfig.TOP_N,
+    ) -> None:
+        """
+        Initializes the MemoryReporter.
+
+        Args:
+            bot_dir: The bot directory; allocations in it are grouped by module.
+            output: File each report is appended to as a JSON line.
+            interval: Seconds between reports.
+            rss_limit: Resident memory in MiB that triggers a warning and a
+                report when exceeded.
+            frames: Frames kept per traced allocation.
+            top: Number of growing allocation sites per report.
+        """
+        self.bot_dir = os.path.realpath(bot_dir) + os.sep
+        self.output = Path(output) if output else None
+        self.interval = interval
+        self.rss_limit = rss_limit
+        self.frames = frames
+        self.top = top
+        self.reports: List[Dict[str, Any]] = []
+
+        self._baseline: Sites = {}
+        self._previous: Sites = {}
+        self._over_limit = False
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._module_cache: Dict[str, str] = {}
+        self._site_cache: Dict[Tuple[str, int], Tuple[str, str]] = {}
+
+    def _site(self, filename: str, lineno: int) -> Tuple[str, str]:
+        """(module group, site label) of a frame."""
+        site = self._site_cache.get((filename, lineno))
+        if site is None:
+            module = self._module_cache.get(filename)
+            if module is None:
+                if os.path.realpath(filename).startswith(self.bot_dir):
+                    module = bot_module(self.bot_dir, filename)
+                else:
+                    module = FRAMEWORK_LABEL
+                self._module_cache[filename] = module
+            if module == FRAMEWORK_LABEL:
+                site = (module, f"{filename}:{lineno}")
+            else:
+                site = (module, f"{module}:{lineno}")
+            self._site_cache[(filename, lineno)] = site
+        return site
+
+    def _attribute(self, traceback: Tuple[Tuple[str, int], ...]) -> Tuple[str, str]:
+        """Picks the innermost bot frame of an allocation, if there is one."""
+        # Raw tracebacks start with the most recent frame
+        for filename, lineno in traceback:
+            module, site = self._site(filename, lineno)
+            if module != FRAMEWORK_LABEL:
+                return module, site
+        return self._site(*traceback[0])
+
+    def _collect(self) -> Sites:
+        """Live traced memory per allocation site."""
+        # The raw traces `take_snapshot()` is built from. Identical tracebacks
+        # share one tuple, so grouping by identity is cheap; building a
+        # Snapshot and its statistics takes seconds on a large heap.
+        by_traceback: Dict[int, List] = {}
+        for trace in tracemalloc._get_traces():
+            totals = by_traceback.get(id(trace[2]))
+            if totals is None:
+                by_traceback[id(trace[2])] = [trace[2], trace[1], 1]
+            else:
+                totals[1] += trace[1]
+                totals[2] += 1
+
+        sites: Sites = {}
+        for traceback, size, count in by_traceback.values():
+            if not traceback or traceback[0][0] in IGNORED_FILES:
+                continue
+            module, site = self._attribute(traceback)
+            totals = sites.get(site)
+            if totals is None:
+                sites[site] = [module, size, count]
+            else:
+                totals[1] += size
+                totals[2] += count
+        return sites
+
+    def compare(
+        self, current: Sites, previous: Sites
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Attributes the growth between two collections.
+
+        Returns:
+            The `top` growing sites and the growth per module, largest first.
+        """
+        growing = []
+        modules: Dict[str, List[int]] = {}
+        for site in current.keys() | previous.keys():
+            module, size, count = current.get(site) or (previous[site][0], 0, 0)
+            if site in previous:
+                size -= previous[site][1]
+                count -= previous[site][2]
+            if not size and not count:
+                continue
+            if size > 0:
+                growing.append((size, count, site, module))
+            totals = modules.setdefault(module, [0, 0])
+            totals[0] += size
+            totals[1] += count
+
+        growing.sort(reverse=True)
+        return (
+            [
+                {
+                    "site": site,
+                    "module": module,
+                    "size_kb": round(size / 1024, 1),
+                    "count": count,
+                }
+                for size, count, site, module in growing[: self.top]
+            ],
+            [
+                {"module": module, "size_kb": round(size / 1024, 1), "count": count}
+                for module, (size, count) in sorted(
+                    modules.items(), key=lambda item: item[1][0], reverse=True
+                )
+            ],
+        )
+
+    def report(self, reason: str) -> Dict[str, Any]:
+        """
+        Reports the growth since the previous report.
+
+        Args:
+            reason: What triggered the report, e.g. `interval` or `signal`.
+
+        Returns:
+            The report, also logged and written to the output file.
+        """
+        started = time.perf_counter()
+        current = self._collect()
+        sites, modules = self.compare(current, self._previous)
+        self._previous = current
+
+        traced, peak = tracemalloc.get_traced_memory()
+        rss = resident_memory_bytes()
+        report = {
+            "time": time.time(),
+            "reason": reason,
+            "traced_mb": round(traced / MIB, 2),
+            "peak_traced_mb": round(peak / MIB, 2),
+            "rss_mb": round(rss / MIB, 1) if rss is not None else None,
+            "growth_kb": round(sum(m["size_kb"] for m in modules), 1),
+            "modules": modules,
+            "sites": sites,
+            "collect_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        self.reports.append(report)
+        self._write(report)
+
+        top_sites = ", ".join(
+            f"{site['site']} +{site['size_kb']:g} KiB" for site in sites[:3]
+        )
+        debugger.log(
+            f"Memory ({reason}): traced {report['traced_mb']} MiB "
+            f"({report['growth_kb']:+g} KiB), RSS {report['rss_mb']} MiB"
+            + (f"; growing: {top_sites}" if top_sites else ""),
+            LevelsEnum.INFO,
+        )
+        return report
+
+    def _write(self, report: Dict[str, Any]) -> None:
+        if self.output is None:
+            return
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        with self.output.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(report) + "\n")
+
+    def _check_rss(self) -> None:
+        rss = resident_memory_bytes()
+        if rss is None:
+            return
+        over = rss / MIB > self.rss_limit
+        if over and not self._over_limit:
+            debugger.log(
+                f"RSS {rss / MIB:.1f} MiB exceeds the limit of {self.rss_limit:g} MiB",
+                LevelsEnum.ERROR,
+            )
+            self.report("rss_limit")
+        self._over_limit = over
+
+    def _run(self) -> None:
+        next_report = time.monotonic() + self.interval
+        while not self._stopped.is_set():
+            timeout = next_report - time.monotonic()
+            if self.rss_limit is not None:
+                timeout = min(timeout, MemoryConfig.RSS_CHECK_INTERVAL)
+            if self._requested.wait(max(timeout, 0)):
+                self._requested.clear()
+                if not self._stopped.is_set():
+                    self.report("signal")
+                continue
+            if self.rss_limit is not None:
+                self._check_rss()
+            if time.monotonic() >= next_report:
+                self.report("interval")
+                next_report = time.monotonic() + self.interval
+
+    def start(self) -> None:
+        """Starts tracing, the reporting thread and the SIGUSR2 handler."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = self._previous = self._collect()
+
+        main_thread = threading.current_thread() is threading.main_thread()
+        if hasattr(signal, "SIGUSR2") and main_thread:
+            signal.signal(signal.SIGUSR2, lambda *_: self._requested.set())
+
+        self._thread = threading.Thread(
+            target=self._run, name="surfgram-memory", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Stops reporting and tracing.
+
+        Returns:
+            A final report of the growth since `start()`.
+        """
+        self._stopped.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._previous = self._baseline
+        report = self.report("stop")
+        self._baseline = self._previous = {}
+        tracemalloc.stop()
+        return report
+
+
+def print_memory_report(reporter: MemoryReporter, report: Dict[str, Any]) -> None:
+    """
+    Prints the memory growth per module and the top growing allocation sites.
+
+    Args:
+        reporter: A stopped reporter.
+        report: Its final report, covering the whole run.
+    """
+    from rich.console import Console
+    from rich.table import Table
+    from surfgram_cli.config import UIConfig
+
+    debugger.flush()
+    console = Console(stderr=True)
+    if not report["modules"]:
+        console.print("No memory growth recorded")
+        return
+
+    modules = Table(title="Growth per module", border_style=UIConfig.BORDER_STYLE)
+    modules.add_column("Module", style=UIConfig.ACCENT_STYLE)
+    modules.add_column("Size (KiB)", justify="right")
+    modules.add_column("Blocks", justify="right")
+    for module in report["modules"]:
+        modules.add_row(
+            module["module"], f"{module['size_kb']:+,.1f}", f"{module['count']:+,}"
+        )
+    console.print(modules)
+
+    if report["sites"]:
+        sites = Table(
+            title="Growing allocation sites", border_style=UIConfig.BORDER_STYLE
+        )
+        sites.add_column("Site", style=UIConfig.ACCENT_STYLE)
+        sites.add_column("Size (KiB)", justify="right")
+        sites.add_column("Blocks", justify="right")
+        for site in report["sites"]:
+            sites.add_row(
+                site["site"], f"{site['size_kb']:+,.1f}", f"{site['count']:+,}"
+            )
+        console.print(sites)
+
+    console.print(
+        f"Traced {report['traced_mb']} MiB (peak {report['peak_traced_mb']} MiB), "
+        f"RSS {report['rss_mb']} MiB, {len(reporter.reports)} report(s)"
+        + (f" written to {reporter.output}" if reporter.output else "")
+    )
@@ -0,0 +1,377 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from surfgram_cli.config import MetricsConfig
+from surfgram_cli.enums import LevelsEnum
+from .debug import debugger
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common part of all metric types: name, help text and per-label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. the number of handled updates."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values) or {(): 0}
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down; either set directly or read on scrape."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], Optional[float]]] = None,
+    ) -> None:
+        super().__init__(name, documentation)
+        self.function = function
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def samples(self) -> List[str]:
+        value = self.function() if self.function else self._value
+        if value is None:
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Counts observations, e.g. durations, into cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = MetricsConfig.LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            labels = _format_labels((("le", _format_value(float(bound))),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+def resident_memory_bytes() -> Optional[float]:
+    """Current RSS from /proc where available, peak RSS otherwise."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MetricsRegistry:
+    """
+    Runtime metrics of the process started by `run`, in the Prometheus text
+    format.
+
+    Polling and handler timings are only recorded after `enable()`, so the
+    instrumented code paths cost next to nothing when no metrics endpoint is
+    running. Rates such as updates per second are derived from the counters
+    by the scraper.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._server: Optional[ThreadingHTTPServer] = None
+        started = time.time()
+
+        self.updates_received = Counter(
+            "surfgram_updates_received_total", "Updates received from getUpdates."
+        )
+        self.updates_handled = Counter(
+            "surfgram_updates_handled_total",
+            "Updates whose handlers finished, by outcome.",
+        )
+        self.handler_duration = Histogram(
+            "surfgram_handler_duration_seconds", "Time spent handling one update."
+        )
+        self.poll_duration = Histogram(
+            "surfgram_poll_duration_seconds",
+            "Round-trip time of getUpdates requests, including the long-poll wait.",
+            MetricsConfig.POLL_BUCKETS,
+        )
+        self.poll_errors = Counter(
+            "surfgram_poll_errors_total", "Failed getUpdates requests."
+        )
+        self.loop_lag = Gauge(
+            "surfgram_event_loop_lag_seconds",
+            "How late the last event-loop lag probe woke up.",
+        )
+        self.in_flight = Gauge(
+            "surfgram_handlers_in_flight", "Handlers currently running."
+        )
+        self.reloads = Counter(
+            "surfgram_reloads_total", "Code reloads triggered by --autoreload, by kind."
+        )
+        self.restarts = Counter(
+            "surfgram_restarts_total",
+            "Process or worker restarts since the command was started.",
+        )
+        self.reload_latency = Gauge(
+            "surfgram_reload_latency_seconds",
+            "File change to serving again, for the last --autoreload reload.",
+        )
+        self.metrics: List[_Metric] = [
+            self.updates_received,
+            self.updates_handled,
+            self.handler_duration,
+            self.poll_duration,
+            self.poll_errors,
+            self.loop_lag,
+            self.in_flight,
+            self.reloads,
+            self.restarts,
+            self.reload_latency,
+            Gauge(
+                "surfgram_threads", "Live Python threads.", threading.active_count
+            ),
+            Gauge(
+                "process_resident_memory_bytes",
+                "Resident memory size in bytes.",
+                resident_memory_bytes,
+            ),
+            Gauge(
+                "process_start_time_seconds",
+                "Start time of the process since the Unix epoch.",
+                lambda: started,
+            ),
+        ]
+
+        inherited = os.environ.get(MetricsConfig.RESTARTS_ENV_VAR, "")
+        if inherited.isdigit():
+            self.restarts.inc(int(inherited))
+        # Popped so that processes started by the bot don't report it again
+        changed_at = os.environ.pop(MetricsConfig.CHANGED_AT_ENV_VAR, "")
+        try:
+            self._changed_at: Optional[float] = float(changed_at)
+        except ValueError:
+            self._changed_at = None
+
+    def enable(self) -> None:
+        """Starts recording."""
+        self.enabled = True
+
+    def observe_poll(self, seconds: float, received: Optional[int]) -> None:
+        """
+        Records one getUpdates request.
+
+        Args:
+            seconds: Round-trip time.
+            received: Number of updates returned, or None if the request failed.
+        """
+        if not self.enabled:
+            return
+        self.poll_duration.observe(seconds)
+        if received is None:
+            self.poll_errors.inc()
+        elif received:
+            self.updates_received.inc(received)
+
+    def observe_handler(self, seconds: float, failed: bool) -> None:
+        """Records one finished update handler."""
+        if not self.enabled:
+            return
+        self.handler_duration.observe(seconds)
+        self.updates_handled.inc(outcome="error" if failed else "ok")
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self.metrics:
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = MetricsConfig.HOST) -> str:
+        """
+        Enables recording and serves `/metrics` from a background thread.
+
+        Args:
+            port: Port to listen on; 0 picks a free one.
+            host: Interface to listen on.
+
+        Returns:
+            The URL of the endpoint.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", MetricsConfig.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.enable()
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever, name="surfgram-metrics", daemon=True
+        ).start()
+        bound_host, bound_port = self._server.server_address[:2]
+        return f"http://{bound_host}:{bound_port}/metrics"
+
+    def observe_reload(self, changed_at: float, stage: str) -> None:
+        """
+        Records and logs the latency of a reload.
+
+        Args:
+            changed_at: Unix time of the file change that triggered it.
+            stage: What the reloaded bot got to, for the log message.
+        """
+        latency = max(time.time() - changed_at, 0.0)
+        self.reload_latency.set(latency)
+        debugger.log(
+            f"Change to ready: {latency * 1000:.0f} ms ({stage})", LevelsEnum.INFO
+        )
+
+    def mark_ready(self, stage: str) -> None:
+        """
+        Called when the bot starts serving. After an --autoreload restart, the
+        first call records the time since the file change; otherwise it does
+        nothing.
+        """
+        if self._changed_at is None:
+            return
+        changed_at, self._changed_at = self._changed_at, None
+        self.observe_reload(changed_at, stage)
+
+    def restart_environment(
+        self, changed_at: Optional[float] = None
+    ) -> Dict[str, str]:
+        """
+        Environment for a restarted process, carrying the restart count.
+
+        Args:
+            changed_at: Unix time of the file change causing the restart,
+                reported by the new process through `mark_ready`.
+        """
+        environment = {
+            MetricsConfig.RESTARTS_ENV_VAR: str(int(self.restarts.value()) + 1)
+        }
+        if changed_at is not None:
+            environment[MetricsConfig.CHANGED_AT_ENV_VAR] = repr(changed_at)
+        return environment
+
+    async def watch_loop_lag(self) -> None:
+        """Measures event-loop lag until cancelled; run as a task on the loop."""
+        import asyncio
+
+        interval = MetricsConfig.LOOP_LAG_INTERVAL
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.set(max(0.0, time.perf_counter() - started - interval))
+
+
+metrics = MetricsRegistry()
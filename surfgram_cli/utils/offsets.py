@@ -0,0 +1,84 @@
+import time
+from pathlib import Path
+from typing import Optional
+
+from surfgram_cli.config import RunnerConfig
+from surfgram_cli.enums import LevelsEnum
+from . import debugger
+from .cache import read_json, write_json
+
+
+class OffsetStore:
+    """
+    Persists the polling offset of a bot in a small JSON state file.
+
+    The saved offset is the first update id that has not been handled yet,
+    so a restarted process confirms what was already handled with its first
+    `getUpdates` call and receives the rest again; the CLI never confirms
+    updates whose handlers haven't finished.
+
+    Writes are atomic and throttled to one per `interval` seconds unless
+    forced. An offset saved for another bot, or older than
+    `RunnerConfig.OFFSET_MAX_AGE`, is ignored.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        token: str,
+        interval: float = RunnerConfig.OFFSET_SAVE_INTERVAL,
+    ) -> None:
+        """
+        Initializes the OffsetStore.
+
+        Args:
+            path: The state file.
+            token: The bot's token; only its bot id is stored.
+            interval: Minimum seconds between writes that aren't forced.
+        """
+        self.path = Path(path)
+        self.bot_id = token.split(":", 1)[0]
+        self.interval = interval
+        self.saved: Optional[int] = None
+        self._saved_at = 0.0
+
+    def load(self) -> Optional[int]:
+        """Returns the saved offset, or None if there is no usable one."""
+        state = read_json(self.path)
+        if not isinstance(state, dict) or state.get("bot_id") != self.bot_id:
+            return None
+        offset = state.get("offset")
+        if not isinstance(offset, int):
+            return None
+        if time.time() - state.get("time", 0) > RunnerConfig.OFFSET_MAX_AGE:
+            debugger.log(
+                f"Ignoring the update offset saved in {self.path}, it is too old",
+                LevelsEnum.INFO,
+            )
+            return None
+        self.saved = offset
+        return offset
+
+    def save(self, offset: Optional[int], force: bool = False) -> bool:
+        """
+        Saves an offset if it changed and the last write is old enough.
+
+        Args:
+            offset: The first update id not handled yet.
+            force: Write regardless of the interval, e.g. on shutdown.
+
+        Returns:
+            True if the offset was written.
+        """
+        if offset is None or offset == self.saved:
+            return False
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.interval:
+            return False
+        self._saved_at = now
+        state = {"bot_id": self.bot_id, "offset": offset, "time": time.time()}
+        if not write_json(self.path, state):
+            debugger.log(f"Could not write {self.path}", LevelsEnum.ERROR)
+            return False
+        self.saved = offset
+        return True
@@ -0,0 +1,296 @@
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from surfgram_cli.config import ProfilerConfig
+from . import debugger
+
+# (function, file, first line)
+Frame = Tuple[str, str, int]
+
+# Innermost Python functions of a thread blocked on I/O or a lock
+IDLE_FUNCTIONS = {"select", "poll", "wait", "acquire"}
+FRAMEWORK_LABEL = "<framework>"
+
+
+def bot_module(bot_dir: str, filename: str) -> str:
+    """Dotted module name of a file inside the bot directory."""
+    package_parent = os.path.dirname(bot_dir.rstrip(os.sep))
+    relative = os.path.relpath(os.path.realpath(filename), package_parent)
+    module = os.path.splitext(relative)[0].replace(os.sep, ".")
+    if module.endswith(".__init__"):
+        module = module[: -len(".__init__")]
+    return module
+
+
+class SamplingProfiler:
+    """
+    A low-overhead sampling profiler for a running bot.
+
+    Instead of tracing every call, the stack of the bot's thread is recorded
+    at a fixed interval. Where the platform has `setitimer` and the bot runs
+    on the main thread, a SIGPROF timer interrupts it every `interval`
+    seconds of CPU time; the stack is taken in the signal handler, so short
+    handlers are sampled as often as long ones. Elsewhere a background
+    thread samples the stack instead, which only catches the bot's thread
+    when it gives up the GIL and under-counts handlers shorter than the
+    interpreter's switch interval.
+
+    Each sample is attributed to the update handler it was taken in: the
+    outermost frame that belongs to the bot package. Samples taken while the
+    bot waits for I/O are counted as idle and left out of the profile.
+
+    The profile is written on `stop()` and, where available, every time
+    the process receives SIGUSR1. Files ending in `.json` are written in
+    the speedscope format, anything else as collapsed stacks for
+    flamegraph.pl and similar tools.
+    """
+
+    def __init__(
+        self,
+        output: str,
+        bot_dir: str,
+        interval: float = ProfilerConfig.INTERVAL,
+        thread_id: Optional[int] = None,
+    ) -> None:
+        """
+        Initializes the SamplingProfiler.
+
+        Args:
+            output: File the profile is written to.
+            bot_dir: The bot directory; frames from it count as handler code.
+            interval: Seconds between samples.
+            thread_id: Thread to sample; defaults to the calling thread.
+        """
+        self.output = Path(output)
+        self.bot_dir = os.path.realpath(bot_dir) + os.sep
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.idle = 0
+        self._stopped = threading.Event()
+        self._dump_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._in_bot_cache: Dict[str, bool] = {}
+        self._use_timer = (
+            hasattr(signal, "setitimer")
+            and self.thread_id == threading.main_thread().ident
+            and threading.current_thread() is threading.main_thread()
+        )
+        self._previous_handler = None
+
+    def _in_bot(self, filename: str) -> bool:
+        in_bot = self._in_bot_cache.get(filename)
+        if in_bot is None:
+            in_bot = os.path.realpath(filename).startswith(self.bot_dir)
+            self._in_bot_cache[filename] = in_bot
+        return in_bot
+
+    def _handler_label(self, stack: Tuple[Frame, ...]) -> str:
+        """Names the bot function a stack runs in, outermost first."""
+        for function, filename, _ in stack:
+            if self._in_bot(filename):
+                return f"{bot_module(self.bot_dir, filename)}:{function}"
+        return FRAMEWORK_LABEL
+
+    def _record(self, frame: Optional[FrameType]) -> None:
+        if frame is None:
+            return
+        if frame.f_code.co_name in IDLE_FUNCTIONS and not self._in_bot(
+            frame.f_code.co_filename
+        ):
+            self.idle += 1
+            return
+
+        stack: List[Frame] = []
+        while frame is not None and len(stack) < ProfilerConfig.MAX_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+
+    def _on_timer(self, signum: int, frame: Optional[FrameType]) -> None:
+        self._record(frame)
+        if self._dump_requested.is_set():
+            self._dump_requested.clear()
+            self.write()
+
+    def _run(self) -> None:
+        next_at = time.monotonic()
+        while not self._stopped.is_set():
+            self._record(sys._current_frames().get(self.thread_id))
+            if self._dump_requested.is_set():
+                self._dump_requested.clear()
+                self.write()
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                self._stopped.wait(delay)
+            else:
+                next_at = time.monotonic()
+
+    def start(self) -> None:
+        """Starts sampling and installs the SIGUSR1 handler."""
+        main_thread = threading.current_thread() is threading.main_thread()
+        if hasattr(signal, "SIGUSR1") and main_thread:
+            signal.signal(signal.SIGUSR1, lambda *_: self._dump_requested.set())
+
+        if self._use_timer:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_timer)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="surfgram-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling and writes the profile."""
+        if self._use_timer:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+    def handler_totals(self) -> List[Tuple[str, int]]:
+        """Samples per handler, most expensive first."""
+        totals: Counter = Counter()
+        for stack, count in self.stacks.items():
+            totals[self._handler_label(stack)] += count
+        return totals.most_common()
+
+    def hot_functions(
+        self, limit: int = ProfilerConfig.TOP_N
+    ) -> List[Tuple[Frame, int, int]]:
+        """
+        Returns the functions with the most samples.
+
+        Returns:
+            (frame, self samples, total samples) tuples, by self samples.
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                total[frame] += count
+        return [
+            (frame, count, total[frame]) for frame, count in own.most_common(limit)
+        ]
+
+    @staticmethod
+    def _frame_name(frame: Frame) -> str:
+        function, filename, line = frame
+        return f"{function} ({os.path.basename(filename)}:{line})"
+
+    def _labelled_stacks(self) -> List[Tuple[List[str], int]]:
+        """Stacks with the handler as root frame, in a stable order."""
+        return [
+            (
+                [self._handler_label(stack), *map(self._frame_name, stack)],
+                count,
+            )
+            for stack, count in self.stacks.most_common()
+        ]
+
+    def write(self) -> None:
+        """Writes the samples taken so far to the output file, atomically."""
+        stacks = self._labelled_stacks()
+        if self.output.suffix == ".json":
+            content = json.dumps(self._speedscope(stacks))
+        else:
+            content = "".join(
+                f"{';'.join(names)} {count}\n" for names, count in stacks
+            )
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.output.with_name(f".{self.output.name}.{os.getpid()}.tmp")
+        temporary.write_text(content, encoding="utf-8")
+        os.replace(temporary, self.output)
+
+    def _speedscope(self, stacks: List[Tuple[List[str], int]]) -> Dict:
+        frames: List[Dict] = []
+        index: Dict[str, int] = {}
+        samples = []
+        weights = []
+        for names, count in stacks:
+            sample = []
+            for name in names:
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({"name": name})
+                sample.append(index[name])
+            samples.append(sample)
+            weights.append(round(count * self.interval, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "surfgram bot",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "exporter": "surfgram-cli",
+        }
+
+
+def print_profile_report(
+    profiler: SamplingProfiler, limit: int = ProfilerConfig.TOP_N
+) -> None:
+    """
+    Prints time per handler and the hottest functions of a profile.
+
+    Args:
+        profiler: A stopped profiler.
+        limit: Number of functions to show.
+    """
+    from rich.console import Console
+    from rich.table import Table
+    from surfgram_cli.config import UIConfig
+
+    debugger.flush()
+    console = Console(stderr=True)
+    busy = sum(profiler.stacks.values())
+    if not busy:
+        console.print(f"No busy samples recorded (idle: {profiler.idle})")
+        return
+
+    handlers = Table(title="Time per handler", border_style=UIConfig.BORDER_STYLE)
+    handlers.add_column("Handler", style=UIConfig.ACCENT_STYLE)
+    handlers.add_column("Samples", justify="right")
+    handlers.add_column("Busy %", justify="right")
+    for label, count in profiler.handler_totals():
+        handlers.add_row(label, str(count), f"{count / busy * 100:.1f}")
+    console.print(handlers)
+
+    functions = Table(title="Hot functions", border_style=UIConfig.BORDER_STYLE)
+    functions.add_column("Function", style=UIConfig.ACCENT_STYLE)
+    functions.add_column("Self %", justify="right")
+    functions.add_column("Total %", justify="right")
+    for frame, own, total in profiler.hot_functions(limit):
+        function, filename, line = frame
+        functions.add_row(
+            f"{function} ({filename}:{line})",
+            f"{own / busy * 100:.1f}",
+            f"{total / busy * 100:.1f}",
+        )
+    console.print(functions)
+    console.print(
+        f"{busy} busy and {profiler.idle} idle samples every "
+        f"{profiler.interval * 1000:g} ms, written to {profiler.output}"
+    )
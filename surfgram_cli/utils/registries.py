@@ -0,0 +1,147 @@
+import contextvars
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+_scope: contextvars.ContextVar[Optional["HandlerScope"]] = contextvars.ContextVar(
+    "surfgram_cli_handler_scope", default=None
+)
+_installed = False
+
+
+class HandlerScope:
+    """
+    One bot's own copy of surfgram's handler registries.
+
+    surfgram handler classes register themselves, when their module is
+    imported, in class attributes of the type factories: a `*_REGISTRY` dict
+    of trigger names and a `__fallback_handler__`. Once `install_scopes` has
+    run, those attributes resolve to the scope active in the current context,
+    so bots imported and served under different scopes only ever see their
+    own handlers, even on one event loop.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.registries: Dict[int, Dict[str, type]] = {}
+        self.fallbacks: Dict[type, Optional[type]] = {}
+
+    @contextmanager
+    def active(self) -> Iterator["HandlerScope"]:
+        """Makes this scope the current one until the block exits."""
+        token = _scope.set(self)
+        try:
+            yield self
+        finally:
+            _scope.reset(token)
+
+    def enter(self) -> None:
+        """
+        Makes this scope the current one for the rest of the running task.
+
+        asyncio copies the context into every task it creates, so handler
+        tasks started by the task inherit the scope.
+        """
+        _scope.set(self)
+
+    def handler_count(self) -> int:
+        """Returns how many handlers the bot registered."""
+        named = sum(len(registry) for registry in self.registries.values())
+        return named + sum(1 for handler in self.fallbacks.values() if handler)
+
+
+class ScopedRegistry(MutableMapping):
+    """A factory's `*_REGISTRY` dict, resolved per `HandlerScope`."""
+
+    def __init__(self, default: Dict[str, type]) -> None:
+        self.default = default
+
+    def _current(self) -> Dict[str, type]:
+        scope = _scope.get()
+        if scope is None:
+            return self.default
+        registry = scope.registries.get(id(self))
+        if registry is None:
+            registry = scope.registries[id(self)] = {}
+        return registry
+
+    def __getitem__(self, name: str) -> type:
+        return self._current()[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._current().get(name, default)
+
+    def __setitem__(self, name: str, handler: type) -> None:
+        self._current()[name] = handler
+
+    def __delitem__(self, name: str) -> None:
+        del self._current()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+
+class ScopedFallback:
+    """
+    Data descriptor for `__fallback_handler__`, resolved per `HandlerScope`.
+
+    It lives on the factories' metaclass, so both reading and assigning
+    `factory.__fallback_handler__` go through it.
+    """
+
+    def __init__(self) -> None:
+        self.defaults: Dict[type, Optional[type]] = {}
+
+    def __get__(self, factory: Optional[type], metaclass: Any = None) -> Any:
+        if factory is None:
+            return self
+        scope = _scope.get()
+        fallbacks = self.defaults if scope is None else scope.fallbacks
+        return fallbacks.get(factory)
+
+    def __set__(self, factory: type, handler: Optional[type]) -> None:
+        scope = _scope.get()
+        fallbacks = self.defaults if scope is None else scope.fallbacks
+        fallbacks[factory] = handler
+
+
+def install_scopes() -> None:
+    """
+    Makes surfgram's handler registries resolve per `HandlerScope`.
+
+    Handlers registered before, and everything done outside a scope, keep
+    using the process-wide registries, so plain runs behave as before.
+    Idempotent.
+
+    Raises:
+        RuntimeError: If this surfgram version keeps its handlers elsewhere.
+    """
+    global _installed
+    if _installed:
+        return
+
+    from surfgram.types import TypesFactory
+
+    metaclass = type(TypesFactory)
+    factories = [
+        factory
+        for factory in TypesFactory.TYPES.values()
+        if "__fallback_handler__" in vars(factory)
+    ]
+    if not factories:
+        raise RuntimeError(
+            "Can't give each bot its own handlers: surfgram's type factories "
+            "have no handler registries\nThis surfgram version is not supported"
+        )
+
+    fallback = ScopedFallback()
+    for factory in factories:
+        for name, value in list(vars(factory).items()):
+            if name.endswith("_REGISTRY") and isinstance(value, dict):
+                setattr(factory, name, ScopedRegistry(value))
+        fallback.defaults[factory] = vars(factory)["__fallback_handler__"]
+    metaclass.__fallback_handler__ = fallback
+    _installed = True
@@ -1,11 +1,19 @@
 import watchdog.events
 import watchdog.observers
+import threading
 import time
 import os
 import sys
 import importlib.util
+import py_compile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Sequence
 from . import debugger
-from surfgram_cli.enums import LevelsEnum
+from .metrics import metrics
+from .watch_filter import ContentIndex, PathFilter
+from surfgram_cli.config import ReloadConfig
+from surfgram_cli.enums import LevelsEnum, ReloadModeEnum
 
 
 class ReloadHandler(watchdog.events.FileSystemEventHandler):
@@ -13,43 +21,252 @@ class ReloadHandler(watchdog.events.FileSystemEventHandler):
     Handles file system events to trigger a bot reload.
 
     This class monitors for modifications to Python files within
-    a specified directory. When file is modified, it
-    logs the event and reloads the bot using `os.execl`.
+    a specified directory. Events are filtered by include/exclude patterns
+    and `.gitignore`, coalesced over a debounce window and checked against
+    a content-hash index, so one save triggers at most one reload and saves
+    that don't change a file trigger none. The bot is then reloaded, either
+    in place through `HotReloader` or by restarting the process using
+    `os.execve`.
+
+    Changed Python files are compiled to bytecode on a background thread as
+    their events arrive, so the reloaded code is imported from `.pyc` files
+    instead of being compiled on the restart's critical path. A file that
+    doesn't compile cancels the reload and the bot keeps running the old
+    code. The time from the first file event to the bot serving again is
+    logged and exported as `surfgram_reload_latency_seconds`.
     """
 
-    def __init__(self, bot: "Bot"):
+    def __init__(
+        self,
+        bot: "Bot",
+        directory: str = ".",
+        mode: ReloadModeEnum = ReloadModeEnum.RESTART,
+        debounce: float = ReloadConfig.DEBOUNCE_SECONDS,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        callback: Optional[Callable[[List[str]], None]] = None,
+        before_restart: Optional[Callable[[], None]] = None,
+        config_class: Optional[type] = None,
+    ):
         """
         Initializes the ReloadHandler.
 
         Args:
             bot: The bot instance to reload.
+            directory: The monitored bot directory.
+            mode: How changes are applied.
+            debounce: Seconds to wait for further events before reloading.
+            include: Glob patterns of files that trigger a reload.
+            exclude: Glob patterns of paths that never trigger a reload.
+            callback: Called with the changed files instead of reloading the
+                bot directly, for processes that don't run the bot themselves.
+            before_restart: Called before the process is restarted, e.g. to
+                drain in-flight handlers.
+            config_class: The bot's config class, so an in-place reload can
+                apply changes to it.
         """
         self.bot = bot
+        self.mode = mode
+        self.callback = callback
+        self.before_restart = before_restart
+        self.debounce = debounce
+        self.path_filter = PathFilter(
+            directory,
+            include or ReloadConfig.INCLUDE_PATTERNS,
+            (*ReloadConfig.EXCLUDE_PATTERNS, *(exclude or ())),
+        )
+        self.content_index = ContentIndex()
+        self.content_index.index(self.path_filter.walk())
+
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._timer: Optional[threading.Timer] = None
+        self._changed_at: Optional[float] = None
+        self._compiled: Dict[str, Future] = {}
+        self._compiler: Optional[ThreadPoolExecutor] = None
+        self.suppressed_events = 0
 
-    def on_modified(self, event: watchdog.events.FileSystemEvent) -> None:
+        self.hot_reloader = None
+        if mode == ReloadModeEnum.INPLACE:
+            from .hot_reload import HotReloader
+
+            self.hot_reloader = HotReloader(bot, directory, config_class)
+
+    def on_any_event(self, event: watchdog.events.FileSystemEvent) -> None:
         """
-        Handles file modification events.
+        Handles file system events.
 
-        This method is called when a file is modified within the monitored directory.
-        It checks if the modified file and, if so, triggers a bot reload.
+        This method is called for every event within the monitored directory.
+        Events for accepted files are queued and the debounce timer is
+        restarted; everything else is counted as suppressed.
 
         Args:
             event: The file system event object.
         """
+        if event.event_type not in ReloadConfig.EVENT_TYPES or event.is_directory:
+            with self._lock:
+                self.suppressed_events += 1
+            return
+
+        path = getattr(event, "dest_path", "") or event.src_path
+        if isinstance(path, bytes):
+            path = os.fsdecode(path)
+        if not self.path_filter.accepts(path):
+            with self._lock:
+                self.suppressed_events += 1
+            return
+
+        with self._lock:
+            if not self._pending:
+                self._changed_at = time.time()
+            if path in self._pending:
+                self.suppressed_events += 1
+            else:
+                self._pending.append(path)
+            self._prewarm(path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _prewarm(self, path: str) -> None:
+        """Queues a changed file for compilation. Called with the lock held."""
+        if not path.endswith(".py") or sys.dont_write_bytecode:
+            return
+        if self._compiler is None:
+            self._compiler = ThreadPoolExecutor(1, "surfgram-prewarm")
+        # One thread compiles in event order, so the last compilation of a
+        # file reads it after its last event
+        self._compiled[path] = self._compiler.submit(self._compile, path)
+
+    @staticmethod
+    def _compile(path: str) -> None:
+        try:
+            py_compile.compile(path, doraise=True)
+        except FileNotFoundError:
+            # Deleted or moved away since the event
+            pass
+
+    def _wait_compiled(self, paths: List[str]) -> bool:
+        """
+        Waits for the changed files to be compiled.
+
+        Returns:
+            False if a file doesn't compile, so the reload would fail.
+        """
+        with self._lock:
+            futures = [
+                (path, self._compiled.pop(path))
+                for path in paths
+                if path in self._compiled
+            ]
+        if not futures:
+            return True
+
+        started = time.perf_counter()
+        deadline = started + ReloadConfig.PREWARM_TIMEOUT
+        for path, future in futures:
+            try:
+                future.result(max(deadline - time.perf_counter(), 0))
+            except FutureTimeoutError:
+                debugger.log("Bytecode compilation timed out", LevelsEnum.INFO)
+                break
+            except py_compile.PyCompileError as e:
+                debugger.log(
+                    f"Not reloading, {path} doesn't compile: {e.msg}", LevelsEnum.ERROR
+                )
+                return False
+            except OSError as e:
+                debugger.log(f"Could not compile {path}: {e!r}", LevelsEnum.INFO)
+        else:
+            debugger.log(
+                f"Waited {(time.perf_counter() - started) * 1000:.1f} ms for "
+                f"{len(futures)} file(s) to compile",
+                LevelsEnum.INFO,
+            )
+        return True
+
+    def flush(self) -> None:
+        """
+        Reloads the bot for the events collected during the debounce window,
+        skipping files whose content did not change.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            changed_at, self._changed_at = self._changed_at, None
+            self._timer = None
+
+        changed = []
+        for path in pending:
+            if self.content_index.changed(path):
+                changed.append(path)
+            else:
+                with self._lock:
+                    self.suppressed_events += 1
+
+        with self._lock:
+            suppressed, self.suppressed_events = self.suppressed_events, 0
+        if not changed:
+            debugger.log(
+                f"No content changes, {suppressed} event(s) suppressed",
+                LevelsEnum.INFO,
+            )
+            return
+
         debugger.log(
-            f"File '{event.src_path}' has been modified. Reloading...",
+            f"{len(changed)} file(s) changed ({', '.join(changed)}), "
+            f"{suppressed} event(s) suppressed. Reloading...",
             LevelsEnum.INFO,
         )
-        self.reload_bot()
+        if self._wait_compiled(changed):
+            self.reload_bot(changed, changed_at)
 
-    def reload_bot(self) -> None:
+    def reload_bot(
+        self, paths: Optional[List[str]] = None, changed_at: Optional[float] = None
+    ) -> None:
         """
         Reloads the bot.
+
+        In in-place mode the changed modules are reloaded inside the running
+        process; the process is restarted only if that is not possible.
+
+        Args:
+            paths: The changed files, if known.
+            changed_at: Unix time of the first file event, if known. A
+                restarted process reports the latency once it polls again.
         """
-        os.execl(sys.executable, sys.executable, *sys.argv)
+        if self.callback is not None:
+            metrics.reloads.inc(kind="bluegreen")
+            self.callback(paths or [])
+            return
+        if self.hot_reloader is not None and paths:
+            if self.hot_reloader.reload(paths):
+                metrics.reloads.inc(kind="inplace")
+                if changed_at is not None:
+                    metrics.observe_reload(changed_at, "in-place reload")
+                return
+            debugger.log("Falling back to a full restart", LevelsEnum.INFO)
+        if self.before_restart is not None:
+            self.before_restart()
+        debugger.flush()
+        os.execve(
+            sys.executable,
+            [sys.executable, *sys.argv],
+            {**os.environ, **metrics.restart_environment(changed_at)},
+        )
 
 
-def monitor_changes(bot: "Bot", directory: str) -> None:
+def monitor_changes(
+    bot: "Bot",
+    directory: str,
+    mode: ReloadModeEnum = ReloadModeEnum.RESTART,
+    debounce: float = ReloadConfig.DEBOUNCE_SECONDS,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    before_restart: Optional[Callable[[], None]] = None,
+    config_class: Optional[type] = None,
+) -> None:
     """
     Monitors a directory for changes and reloads the bot upon file modifications.
 
@@ -61,8 +278,23 @@ def monitor_changes(bot: "Bot", directory: str) -> None:
     Args:
         bot: The bot instance to monitor and reload.
         directory: The directory to monitor for file changes.
+        mode: How changes are applied.
+        debounce: Seconds to wait for further events before reloading.
+        include: Glob patterns of files that trigger a reload.
+        exclude: Additional glob patterns of paths to ignore.
+        before_restart: Called before the process is restarted.
+        config_class: The bot's config class.
     """
-    event_handler = ReloadHandler(bot)
+    event_handler = ReloadHandler(
+        bot,
+        directory,
+        mode,
+        debounce,
+        include,
+        exclude,
+        before_restart=before_restart,
+        config_class=config_class,
+    )
     observer = watchdog.observers.Observer()
     observer.schedule(event_handler, directory, recursive=True)
     observer.start()
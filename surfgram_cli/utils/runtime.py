@@ -0,0 +1,84 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from surfgram_cli.enums import LoopEnum
+
+
+def resolve_loop(loop: LoopEnum = LoopEnum.AUTO) -> LoopEnum:
+    """
+    Picks the event loop implementation that will actually be used.
+
+    Args:
+        loop: The requested implementation.
+
+    Returns:
+        `LoopEnum.UVLOOP` or `LoopEnum.ASYNCIO`.
+
+    Raises:
+        ImportError: If uvloop was requested explicitly but isn't installed.
+    """
+    if loop == LoopEnum.ASYNCIO:
+        return LoopEnum.ASYNCIO
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        if loop == LoopEnum.UVLOOP:
+            raise ImportError(
+                "--loop uvloop requires uvloop\n"
+                "Solution: pip install uvloop, or use --loop auto"
+            )
+        return LoopEnum.ASYNCIO
+    return LoopEnum.UVLOOP
+
+
+def default_executor_workers() -> int:
+    """Size of asyncio's default thread pool on this machine."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def configure_runtime(
+    loop: LoopEnum = LoopEnum.AUTO, executor_workers: Optional[int] = None
+) -> LoopEnum:
+    """
+    Installs an event loop policy for every loop created afterwards.
+
+    This covers loops the CLI creates itself as well as the one surfgram's
+    `Bot.listen()` starts with `asyncio.run`, and is inherited by forked
+    workers.
+
+    Args:
+        loop: The event loop implementation.
+        executor_workers: Threads of each new loop's default executor, which
+            runs blocking handlers passed to `run_in_executor(None, ...)`.
+            None keeps asyncio's default size.
+
+    Returns:
+        The implementation in use.
+    """
+    effective = resolve_loop(loop)
+    if effective == LoopEnum.UVLOOP:
+        import uvloop
+
+        base_policy = uvloop.EventLoopPolicy
+    else:
+        base_policy = asyncio.DefaultEventLoopPolicy
+
+    if effective == LoopEnum.ASYNCIO and executor_workers is None:
+        return effective
+
+    class RuntimePolicy(base_policy):
+        def new_event_loop(self) -> asyncio.AbstractEventLoop:
+            new_loop = super().new_event_loop()
+            if executor_workers is not None:
+                new_loop.set_default_executor(
+                    ThreadPoolExecutor(
+                        max_workers=executor_workers,
+                        thread_name_prefix="surfgram-executor",
+                    )
+                )
+            return new_loop
+
+    asyncio.set_event_loop_policy(RuntimePolicy())
+    return effective
@@ -0,0 +1,123 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import List, NamedTuple, Sequence
+
+from surfgram_cli.config import StartupConfig
+
+_IMPORTTIME_RE = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<name>\s*\S+)\s*$"
+)
+
+
+class ImportRecord(NamedTuple):
+    """A single line of `python -X importtime` output."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(lines: Sequence[str]) -> List[ImportRecord]:
+    """
+    Parses `-X importtime` lines into records, ignoring everything else.
+
+    Args:
+        lines: Raw stderr lines of the profiled interpreter.
+
+    Returns:
+        The import records in the order the interpreter reported them.
+    """
+    records = []
+    for line in lines:
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        raw_name = match.group("name")
+        stripped = raw_name.lstrip()
+        records.append(
+            ImportRecord(
+                name=stripped,
+                self_us=int(match.group("self")),
+                cumulative_us=int(match.group("cumulative")),
+                depth=(len(raw_name) - len(stripped) - 1) // 2,
+            )
+        )
+    return records
+
+
+def print_startup_report(
+    records: Sequence[ImportRecord], wall_time: float, budget_ms: float
+) -> None:
+    """
+    Prints the slowest imports and the total import time against the budget.
+
+    Args:
+        records: Parsed import records.
+        wall_time: Wall-clock duration of the profiled process, in seconds.
+        budget_ms: Startup budget for the total import time, in milliseconds.
+    """
+    from rich.console import Console
+    from rich.table import Table
+    from surfgram_cli.config import UIConfig
+
+    console = Console(stderr=True)
+    total_ms = sum(r.cumulative_us for r in records if r.depth == 0) / 1000
+
+    table = Table(title="Startup import profile", border_style=UIConfig.BORDER_STYLE)
+    table.add_column("Module", style=UIConfig.ACCENT_STYLE)
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("Cumulative (ms)", justify="right")
+
+    slowest = sorted(records, key=lambda r: r.cumulative_us, reverse=True)
+    for record in slowest[: StartupConfig.PROFILE_TOP_N]:
+        table.add_row(
+            "  " * record.depth + record.name,
+            f"{record.self_us / 1000:.1f}",
+            f"{record.cumulative_us / 1000:.1f}",
+        )
+
+    console.print(table)
+    style = UIConfig.SUCCESS_STYLE if total_ms <= budget_ms else UIConfig.ERROR_STYLE
+    console.print(
+        f"Imports: {total_ms:.1f} ms ({len(records)} modules), "
+        f"budget: {budget_ms:.0f} ms, wall time: {wall_time * 1000:.1f} ms",
+        style=style,
+    )
+
+
+def profile_startup(argv: Sequence[str]) -> int:
+    """
+    Re-runs the CLI in a fresh interpreter with `-X importtime` and reports
+    the per-module import cost of that cold start.
+
+    The child inherits stdin and stdout, so the profiled command behaves as
+    usual; only the import timing lines are taken out of its stderr.
+
+    Args:
+        argv: CLI arguments to profile, without `--profile-startup`.
+
+    Returns:
+        The exit code of the profiled command.
+    """
+    budget_ms = float(
+        os.environ.get(StartupConfig.BUDGET_ENV_VAR, StartupConfig.BUDGET_MS)
+    )
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "surfgram_cli", *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_time = time.perf_counter() - started
+
+    lines = process.stderr.splitlines()
+    for line in lines:
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")
+
+    print_startup_report(parse_importtime(lines), wall_time, budget_ms)
+    return process.returncode
@@ -0,0 +1,342 @@
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from surfgram_cli.config import TelegramConfig
+
+
+class TelegramAPIError(Exception):
+    """An error response of the Bot API."""
+
+    def __init__(
+        self, description: str, error_code: int = 0, retry_after: Optional[int] = None
+    ) -> None:
+        super().__init__(f"{error_code}: {description}" if error_code else description)
+        self.description = description
+        self.error_code = error_code
+        self.retry_after = retry_after
+
+
+class TelegramClient:
+    """
+    Minimal blocking Bot API client.
+
+    Used by commands that have to talk to the Bot API themselves (polling for
+    a pool of workers, handing over offsets, webhooks), so they don't depend on
+    surfgram internals. Only the standard library is used.
+    """
+
+    def __init__(self, token: str, api_url: Optional[str] = None) -> None:
+        """
+        Initializes the TelegramClient.
+
+        Args:
+            token: The bot token.
+            api_url: Base URL of the Bot API server.
+        """
+        self.token = token
+        self.api_url = (api_url or TelegramConfig.API_URL).rstrip("/")
+
+    def call(self, method: str, request_timeout: float = 10.0, **params: Any) -> Any:
+        """
+        Calls a Bot API method.
+
+        Args:
+            method: The method name, e.g. `getMe`.
+            request_timeout: Socket timeout in seconds.
+            **params: Method parameters; None values are omitted.
+
+        Returns:
+            The `result` field of the response.
+
+        Raises:
+            TelegramAPIError: If the API reports an error.
+        """
+        payload = {key: value for key, value in params.items() if value is not None}
+        request = urllib.request.Request(
+            f"{self.api_url}/bot{self.token}/{method}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=request_timeout) as response:
+                body = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.loads(e.read().decode("utf-8"))
+            except ValueError:
+                raise TelegramAPIError(e.reason, e.code) from e
+
+        if not body.get("ok"):
+            raise TelegramAPIError(
+                body.get("description", "Unknown error"),
+                body.get("error_code", 0),
+                (body.get("parameters") or {}).get("retry_after"),
+            )
+        return body.get("result")
+
+    def get_updates(
+        self,
+        offset: Optional[int] = None,
+        timeout: int = TelegramConfig.POLL_TIMEOUT,
+        limit: int = TelegramConfig.POLL_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Long-polls for updates.
+
+        Args:
+            offset: Identifier of the first update to return; earlier updates
+                are confirmed.
+            timeout: Long polling timeout in seconds.
+            limit: Maximum number of updates.
+
+        Returns:
+            The updates as raw dictionaries.
+        """
+        return self.call(
+            "getUpdates",
+            request_timeout=timeout + 10,
+            offset=offset,
+            limit=limit,
+            timeout=timeout,
+        )
+
+
+class AsyncConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections shared by many async clients.
+
+    Lets a fleet of bots on one event loop reuse TCP/TLS connections instead
+    of opening one per request. Only what the Bot API needs is implemented:
+    POST with a body, `Content-Length` or chunked responses.
+    """
+
+    def __init__(self, max_idle_per_host: int = TelegramConfig.POOL_MAX_IDLE) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, int, bool], List[Tuple[Any, Any]]] = {}
+
+    async def _open(self, key: Tuple[str, int, bool]) -> Tuple[Any, Any]:
+        import asyncio
+        import ssl
+
+        host, port, secure = key
+        return await asyncio.open_connection(
+            host, port, ssl=ssl.create_default_context() if secure else None
+        )
+
+    @staticmethod
+    async def _read_response(reader: Any) -> Tuple[int, bytes, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if not size:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+            keep_alive = headers.get("connection", "").lower() != "close"
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+            keep_alive = headers.get("connection", "").lower() != "close"
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, body, keep_alive
+
+    async def post(self, url: str, body: bytes, timeout: float) -> Tuple[int, bytes]:
+        """
+        Sends a JSON POST request and returns the status and response body.
+
+        A request on a reused connection that turns out to be closed is
+        retried once on a new connection.
+        """
+        import asyncio
+
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == "https"
+        key = (parts.hostname, parts.port or (443 if secure else 80), secure)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"POST {target} HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1") + body
+
+        idle = self._idle.setdefault(key, [])
+        for attempt in range(2):
+            reused = bool(idle) and attempt == 0
+            reader, writer = idle.pop() if reused else await self._open(key)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, response, keep_alive = await asyncio.wait_for(
+                    self._read_response(reader), timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                # Timeouts and cancellation leave the connection mid-response
+                writer.close()
+                raise
+
+            if keep_alive and len(idle) < self.max_idle_per_host:
+                idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, response
+        raise ConnectionError("Unreachable")
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+class AsyncTelegramClient:
+    """
+    Asyncio counterpart of `TelegramClient`.
+
+    Several clients can share one `AsyncConnectionPool`, which is how fleet
+    mode polls many bots from one event loop without a thread each.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_url: Optional[str] = None,
+        pool: Optional[AsyncConnectionPool] = None,
+    ) -> None:
+        """
+        Initializes the AsyncTelegramClient.
+
+        Args:
+            token: The bot token.
+            api_url: Base URL of the Bot API server.
+            pool: Connection pool to use; a private one is created if omitted.
+        """
+        self.token = token
+        self.api_url = (api_url or TelegramConfig.API_URL).rstrip("/")
+        self.pool = pool or AsyncConnectionPool()
+
+    async def call(
+        self, method: str, request_timeout: float = 10.0, **params: Any
+    ) -> Any:
+        """Calls a Bot API method; see `TelegramClient.call`."""
+        payload = {key: value for key, value in params.items() if value is not None}
+        status, body = await self.pool.post(
+            f"{self.api_url}/bot{self.token}/{method}",
+            json.dumps(payload).encode("utf-8"),
+            request_timeout,
+        )
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except ValueError:
+            raise TelegramAPIError(f"Invalid response (HTTP {status})", status)
+
+        if not data.get("ok"):
+            raise TelegramAPIError(
+                data.get("description", "Unknown error"),
+                data.get("error_code", status),
+                (data.get("parameters") or {}).get("retry_after"),
+            )
+        return data.get("result")
+
+    async def get_updates(
+        self,
+        offset: Optional[int] = None,
+        timeout: int = TelegramConfig.POLL_TIMEOUT,
+        limit: int = TelegramConfig.POLL_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """Long-polls for updates; see `TelegramClient.get_updates`."""
+        return await self.call(
+            "getUpdates",
+            request_timeout=timeout + 10,
+            offset=offset,
+            limit=limit,
+            timeout=timeout,
+        )
+
+
+class RedirectedBotClient:
+    """
+    Stand-in for a surfgram bot's API client that talks to another server.
+
+    surfgram's native client always posts to api.telegram.org. With
+    `--api-url` the bot's own calls, such as `sendMessage`, are sent to the
+    same server the updates come from instead. Like the native client it
+    returns the response body as text, error responses included.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_url: str,
+        pool: Optional[AsyncConnectionPool] = None,
+        request_timeout: float = 10.0,
+    ) -> None:
+        """
+        Initializes the RedirectedBotClient.
+
+        Args:
+            token: The bot token.
+            api_url: Base URL of the Bot API server.
+            pool: Connection pool to share; a private one is created if omitted.
+            request_timeout: Seconds one call may take.
+        """
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.request_timeout = request_timeout
+        self.pool = pool or AsyncConnectionPool()
+
+    async def send_request(self, method: str, params: str) -> str:
+        """Posts one call; same signature as surfgram's `NativeClient`."""
+        _, body = await self.pool.post(
+            f"{self.api_url}/bot{self.token}/{method}",
+            params.encode("utf-8"),
+            self.request_timeout,
+        )
+        return body.decode("utf-8")
+
+
+class OfflineBotClient:
+    """
+    Stand-in for a surfgram bot's API client that never leaves the process.
+
+    Answers every Bot API call with `{"ok": true, "result": true}` and counts
+    the calls per method, so handlers can be measured without reaching
+    Telegram.
+    """
+
+    RESPONSE = json.dumps({"ok": True, "result": True})
+
+    def __init__(self) -> None:
+        self.calls: Dict[str, int] = {}
+
+    async def send_request(self, method: str, params: str) -> str:
+        """Records one call; same signature as surfgram's `NativeClient`."""
+        self.calls[method] = self.calls.get(method, 0) + 1
+        return self.RESPONSE
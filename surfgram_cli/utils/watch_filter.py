@@ -0,0 +1,195 @@
+import fnmatch
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class GitignoreRules:
+    """
+    A small `.gitignore` matcher.
+
+    Supports comments, `!` negation, anchored (`/name`) and directory-only
+    (`name/`) patterns and `**`, which is enough for the ignore files found
+    in bot projects.
+    """
+
+    def __init__(self, base: Path, lines: Iterable[str]) -> None:
+        """
+        Initializes the GitignoreRules.
+
+        Args:
+            base: Directory the `.gitignore` file lives in.
+            lines: Lines of the `.gitignore` file.
+        """
+        self.base = base
+        self.rules: List[Tuple[str, bool, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                self.rules.append((line, negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional["GitignoreRules"]:
+        """Loads rules from a `.gitignore` file, or returns None if unreadable."""
+        try:
+            return cls(path.parent, path.read_text(encoding="utf-8").splitlines())
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _match(self, pattern: str, anchored: bool, parts: Sequence[str]) -> bool:
+        relative = "/".join(parts)
+        if anchored:
+            return fnmatch.fnmatchcase(relative, pattern) or fnmatch.fnmatchcase(
+                relative, pattern.replace("**/", "")
+            )
+        return fnmatch.fnmatchcase(parts[-1], pattern)
+
+    def ignored(self, path: Path) -> bool:
+        """
+        Checks whether a file is ignored by these rules.
+
+        Args:
+            path: Absolute path of a file.
+        """
+        try:
+            parts = path.relative_to(self.base).parts
+        except ValueError:
+            return False
+
+        ignored = False
+        for pattern, negated, dir_only, anchored in self.rules:
+            # A pattern matching a parent directory ignores everything below it
+            for depth in range(1, len(parts) + 1):
+                is_dir = depth < len(parts)
+                if dir_only and not is_dir:
+                    continue
+                if self._match(pattern, anchored, parts[:depth]):
+                    ignored = not negated
+                    break
+        return ignored
+
+
+class PathFilter:
+    """
+    Decides which changed files may trigger a reload.
+
+    A path is accepted when its name matches one of the include patterns,
+    none of its path components match an exclude pattern, and no `.gitignore`
+    between the watched directory and the repository root ignores it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        include: Sequence[str],
+        exclude: Sequence[str],
+        use_gitignore: bool = True,
+    ) -> None:
+        """
+        Initializes the PathFilter.
+
+        Args:
+            directory: The watched directory.
+            include: Glob patterns a file name must match.
+            exclude: Glob patterns matched against every path component.
+            use_gitignore: Whether to honor `.gitignore` files.
+        """
+        self.root = Path(directory).resolve()
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.gitignores: List[GitignoreRules] = []
+        if use_gitignore:
+            self._load_gitignores()
+
+    def _load_gitignores(self) -> None:
+        """Collects `.gitignore` files from the watched directory up to the repo root."""
+        for directory in (self.root, *self.root.parents):
+            rules = GitignoreRules.from_file(directory / ".gitignore")
+            if rules is not None:
+                self.gitignores.append(rules)
+            if (directory / ".git").exists():
+                break
+
+    def accepts(self, path: str) -> bool:
+        """
+        Checks whether a change to the given file should be considered.
+
+        Args:
+            path: Path of the changed file.
+        """
+        resolved = Path(path).resolve()
+        try:
+            parts = resolved.relative_to(self.root).parts
+        except ValueError:
+            return False
+        if not parts:
+            return False
+        if not any(fnmatch.fnmatchcase(parts[-1], p) for p in self.include):
+            return False
+        if any(fnmatch.fnmatchcase(part, p) for part in parts for p in self.exclude):
+            return False
+        return not any(rules.ignored(resolved) for rules in self.gitignores)
+
+    def walk(self) -> Iterable[str]:
+        """Yields every accepted file below the watched directory."""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [
+                d
+                for d in dirnames
+                if not any(fnmatch.fnmatchcase(d, p) for p in self.exclude)
+            ]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if self.accepts(path):
+                    yield path
+
+
+class ContentIndex:
+    """
+    Content hashes of the watched files, used to ignore saves that leave a
+    file byte-for-byte unchanged.
+    """
+
+    def __init__(self) -> None:
+        self._hashes: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def _hash(path: str) -> Optional[str]:
+        """Returns the content hash of a file, or None if it does not exist."""
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 16), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def index(self, paths: Iterable[str]) -> None:
+        """Records the current content of the given files."""
+        for path in paths:
+            self._hashes[str(Path(path).resolve())] = self._hash(path)
+
+    def changed(self, path: str) -> bool:
+        """
+        Checks whether a file's content differs from the indexed one and
+        updates the index.
+
+        Files seen for the first time count as changed.
+        """
+        key = str(Path(path).resolve())
+        new_hash = self._hash(path)
+        if key in self._hashes and self._hashes[key] == new_hash:
+            return False
+        self._hashes[key] = new_hash
+        return True
@@ -0,0 +1,317 @@
+import asyncio
+import hmac
+import json
+import signal
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from surfgram_cli.config import RunnerConfig, WebhookConfig
+from surfgram_cli.enums import LevelsEnum
+from surfgram_cli.utils import debugger
+from surfgram_cli.utils.capture import UpdateRecorder
+from surfgram_cli.utils.crash import errors
+from surfgram_cli.utils.dispatch import dispatch_update, find_dispatcher
+from surfgram_cli.utils.metrics import metrics
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    503: "Service Unavailable",
+}
+
+
+class _HTTPError(Exception):
+    """A request that is answered with an error status and a closed connection."""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+class WebhookServer:
+    """
+    Receives updates on an HTTP endpoint instead of polling for them.
+
+    The server runs on asyncio streams and speaks just enough HTTP/1.1 for
+    the Bot API's webhook requests, including keep-alive. Every update is
+    acknowledged as soon as it is queued; a fixed number of workers take
+    updates from the queue, which bounds the handlers running at once.
+    When the queue is full, requests are answered with 503 and Telegram
+    delivers the update again later, so a slow bot pushes back instead of
+    buffering without limit.
+
+    On shutdown the listening socket and idle connections are closed first
+    and requests still being read are answered with 503, so Telegram keeps
+    those updates; then queued and running handlers get `drain_timeout`
+    seconds to finish.
+    Updates still queued after that were acknowledged and are lost.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        host: str = WebhookConfig.HOST,
+        port: int = WebhookConfig.PORT,
+        path: str = WebhookConfig.PATH,
+        secret_token: Optional[str] = None,
+        max_concurrent: int = RunnerConfig.MAX_CONCURRENT_HANDLERS,
+        max_queue: int = WebhookConfig.MAX_QUEUE,
+        drain_timeout: float = RunnerConfig.DRAIN_TIMEOUT,
+        recorder: Optional[UpdateRecorder] = None,
+    ) -> None:
+        """
+        Initializes the WebhookServer.
+
+        Args:
+            bot: The surfgram bot instance.
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free one.
+            path: URL path updates are posted to.
+            secret_token: Value the `X-Telegram-Bot-Api-Secret-Token` header
+                must carry. None accepts every request.
+            max_concurrent: Maximum number of handlers running at once.
+            max_queue: Updates accepted but not yet handled before requests
+                are rejected with 503.
+            drain_timeout: Seconds queued and running handlers get on shutdown.
+            recorder: Capture every received update is appended to.
+        """
+        self.dispatcher = find_dispatcher(bot)
+        self.host = host
+        self.port = port
+        self.path = "/" + path.lstrip("/")
+        self.secret_token = secret_token
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.drain_timeout = drain_timeout
+        self.recorder = recorder
+
+        self.received = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Future] = {}
+        # Connections waiting for their next request
+        self._idle: Set[asyncio.StreamWriter] = set()
+
+    async def _handle(self, update: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        failed = False
+        self.in_flight += 1
+        metrics.in_flight.inc()
+        try:
+            await dispatch_update(self.dispatcher, update)
+        except Exception as e:
+            failed = True
+            message = errors.report(e, f"Handler failed: {e!r}")
+            if message is not None:
+                debugger.log(message, LevelsEnum.ERROR)
+        finally:
+            self.in_flight -= 1
+            metrics.in_flight.dec()
+            metrics.observe_handler(time.perf_counter() - started, failed)
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self._handle(update)
+            finally:
+                self._queue.task_done()
+
+    def _accept(self, body: bytes) -> int:
+        """Queues the update in a request body; returns the HTTP status."""
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(update, dict) or "update_id" not in update:
+            return 400
+        if self._queue.full() or self._stopping.is_set():
+            self.rejected += 1
+            return 503
+
+        self._queue.put_nowait(update)
+        self.received += 1
+        if metrics.enabled:
+            metrics.updates_received.inc()
+        if self.recorder is not None:
+            self.recorder.record([update])
+        return 200
+
+    async def _read_request(
+        self, line: bytes, reader: asyncio.StreamReader
+    ) -> Tuple[str, str, Dict[str, str], bytes]:
+        """Reads the rest of the request starting with request line `line`."""
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= WebhookConfig.MAX_HEADERS:
+                raise _HTTPError(431)
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > WebhookConfig.MAX_BODY_BYTES:
+            raise _HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return method, target.split("?", 1)[0], headers, body
+
+    def _route(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> int:
+        if path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if self.secret_token is not None and not hmac.compare_digest(
+            headers.get(WebhookConfig.SECRET_HEADER, "").encode(),
+            self.secret_token.encode(),
+        ):
+            return 401
+        return self._accept(body)
+
+    async def _connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while not self._stopping.is_set():
+                keep_alive = True
+                try:
+                    self._idle.add(writer)
+                    line = await asyncio.wait_for(
+                        reader.readline(), WebhookConfig.IDLE_TIMEOUT
+                    )
+                    self._idle.discard(writer)
+                    if not line:
+                        break
+                    method, path, headers, body = await asyncio.wait_for(
+                        self._read_request(line, reader), WebhookConfig.IDLE_TIMEOUT
+                    )
+                    status = self._route(method, path, headers, body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                except _HTTPError as e:
+                    status, keep_alive = e.status, False
+                except ValueError:
+                    # Malformed request line, header or Content-Length
+                    status, keep_alive = 400, False
+
+                response = [
+                    f"HTTP/1.1 {status} {REASONS[status]}",
+                    "Content-Length: 0",
+                ]
+                if status == 503:
+                    response.append(f"Retry-After: {WebhookConfig.RETRY_AFTER}")
+                if self._stopping.is_set():
+                    keep_alive = False
+                if not keep_alive:
+                    response.append("Connection: close")
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode("latin-1"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            self._idle.discard(writer)
+            writer.close()
+
+    def request_stop(self) -> None:
+        """Stops accepting requests and starts draining. Thread-safe."""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def serve(self) -> Dict[str, int]:
+        """
+        Serves updates until `request_stop()`, SIGINT or SIGTERM, then drains.
+
+        Returns:
+            Counts of received updates and of updates rejected with 503.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.max_queue)
+        self._stopping = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(signum, self._stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        workers = [
+            asyncio.ensure_future(self._worker()) for _ in range(self.max_concurrent)
+        ]
+        lag_probe = None
+        if metrics.enabled:
+            lag_probe = asyncio.ensure_future(metrics.watch_loop_lag())
+
+        server = await asyncio.start_server(
+            self._connection, self.host, self.port, limit=WebhookConfig.MAX_BODY_BYTES
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        debugger.log(
+            f"Webhook listening on http://{self.host}:{self.port}{self.path}",
+            LevelsEnum.INFO,
+        )
+        metrics.mark_ready("webhook listening")
+
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            await self._close_connections()
+            await self._drain()
+            for worker in workers:
+                worker.cancel()
+            if lag_probe is not None:
+                lag_probe.cancel()
+        return {"received": self.received, "rejected": self.rejected}
+
+    async def _close_connections(self) -> None:
+        """
+        Closes idle connections and lets requests being read get their 503.
+
+        Requests arriving after the stop are rejected by `_accept`, so every
+        update that was not acknowledged is delivered again by Telegram.
+        """
+        for writer in list(self._idle):
+            writer.close()
+        busy = [
+            task
+            for writer, task in self._connections.items()
+            if writer not in self._idle
+        ]
+        if busy:
+            await asyncio.wait(busy, timeout=WebhookConfig.SHUTDOWN_TIMEOUT)
+        for writer in list(self._connections):
+            writer.close()
+
+    async def _drain(self) -> None:
+        """Waits for queued and running handlers up to the drain timeout."""
+        pending = self._queue.qsize() + self.in_flight
+        if not pending:
+            return
+        debugger.log(f"Draining {pending} update(s)...", LevelsEnum.INFO)
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            debugger.log(
+                f"{self._queue.qsize()} queued update(s) dropped and running "
+                f"handlers cancelled after {self.drain_timeout}s",
+                LevelsEnum.ERROR,
+            )
+
+    def run(self) -> Dict[str, int]:
+        """Serves on a new event loop. Blocks."""
+        return asyncio.run(self.serve())
@@ -0,0 +1,68 @@
+import pytest
+
+# surfgram needs its native client (surfgram_internal) to be importable
+surfgram = pytest.importorskip("surfgram")
+
+from surfgram import Bot, configs  # noqa: E402
+from surfgram.core.listeners import BaseListener  # noqa: E402
+
+from surfgram_cli.bench import Benchmark, synthetic_updates  # noqa: E402
+from surfgram_cli.bench.replay import Replayer  # noqa: E402
+from surfgram_cli.utils.capture import UpdateRecorder  # noqa: E402
+
+TOKEN = "123456:" + "A" * 35
+
+
+class ReplyingListener(BaseListener):
+    async def on_update(self, update, bot) -> None:
+        await bot.send_message(chat_id=1, text="hi")
+
+
+class ReplyingConfig(configs.BaseConfig):
+    __bot_token__ = TOKEN
+    __listener__ = ReplyingListener
+
+
+class FailingListener(BaseListener):
+    async def on_update(self, update, bot) -> None:
+        raise ValueError("broken handler")
+
+
+class FailingConfig(configs.BaseConfig):
+    __bot_token__ = TOKEN
+    __listener__ = FailingListener
+
+
+def test_handler_api_calls_stay_in_process():
+    report = Benchmark(Bot(ReplyingConfig), synthetic_updates(20), warmup=5).run()
+
+    assert report["errors"] == {}
+    assert report["api_calls"] == {"sendMessage": 20}
+
+
+def test_run_fails_when_every_update_fails():
+    benchmark = Benchmark(Bot(FailingConfig), synthetic_updates(5), warmup=0)
+
+    with pytest.raises(RuntimeError, match="ValueError: 5"):
+        benchmark.run()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / "updates.sgupd")
+    recorder = UpdateRecorder(path)
+    recorder.record(synthetic_updates(10))
+    recorder.close()
+    return path
+
+
+def test_replay_stays_in_process(capture):
+    report = Replayer(Bot(ReplyingConfig), capture).run()
+
+    assert report["updates"] == 10
+    assert report["api_calls"] == {"sendMessage": 10}
+
+
+def test_replay_fails_when_every_update_fails(capture):
+    with pytest.raises(RuntimeError, match="ValueError: 10"):
+        Replayer(Bot(FailingConfig), capture).run()
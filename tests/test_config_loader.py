@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from surfgram_cli.manager.config_loader import ConfigSchema, parse_env_file
+
+
+def test_values_are_cast_to_their_annotations():
+    class Config:
+        DEBUG: bool = "yes"
+        WORKERS: int = " 4 "
+        RATE: float = 2
+        ADMINS: List[int] = "1, 2,3,"
+        TAGS: Tuple[str, ...] = ["a", "b"]
+        DATA_DIR: Path = "data"
+        NOTE: Optional[str] = None
+        PORT: int
+
+    ConfigSchema(Config).apply(Config, environ={"PORT": "8080"})
+
+    assert Config.DEBUG is True
+    assert Config.WORKERS == 4
+    assert Config.RATE == 2.0 and isinstance(Config.RATE, float)
+    assert Config.ADMINS == [1, 2, 3]
+    assert Config.TAGS == ("a", "b")
+    assert Config.DATA_DIR == Path("data")
+    assert Config.NOTE is None
+    assert Config.PORT == 8080
+
+
+def test_every_invalid_field_is_reported_at_once():
+    class Config:
+        DEBUG: bool = "maybe"
+        WORKERS: int = True
+        NAME: str = None
+        TOKEN: str
+        PORT: int = "8080"
+
+    with pytest.raises(ValueError) as info:
+        ConfigSchema(Config).apply(Config, environ={})
+
+    message = str(info.value)
+    assert message.startswith("Invalid config Config:")
+    for field in ("DEBUG", "WORKERS", "NAME", "TOKEN"):
+        assert f"  - {field}: " in message
+    assert "no environment variable TOKEN" in message
+    # Nothing is converted while the config is invalid
+    assert Config.PORT == "8080"
+
+
+def test_env_files_are_reparsed_only_when_changed(tmp_path):
+    pytest.importorskip("dotenv")
+    path = tmp_path / ".env"
+    path.write_text("BOT_TOKEN=1:abc\nEMPTY\n")
+    first = parse_env_file(path)
+    assert first == {"BOT_TOKEN": "1:abc"}
+    assert parse_env_file(path) is first
+
+    path.write_text("BOT_TOKEN=2:abcd\n")
+    os.utime(path, ns=(0, 0))
+    assert parse_env_file(path) == {"BOT_TOKEN": "2:abcd"}
+    assert parse_env_file(tmp_path / "missing.env") == {}
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from surfgram_cli.config import CrashConfig
+from surfgram_cli.utils.crash import ErrorReporter, fingerprint, redact_argv
+
+
+def raise_from(kind, message="boom"):
+    try:
+        raise kind(message)
+    except Exception as e:
+        return e
+
+
+@pytest.fixture(autouse=True)
+def crash_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(CrashConfig.DIR_ENV_VAR, str(tmp_path))
+    return tmp_path
+
+
+def test_fingerprint_ignores_the_message_but_not_the_type():
+    first = raise_from(ValueError, "one")
+    second = raise_from(ValueError, "two")
+    other = raise_from(KeyError)
+    assert fingerprint(first) == fingerprint(second)
+    assert fingerprint(first) != fingerprint(other)
+
+
+def test_redact_argv_hides_secret_option_values():
+    argv = [
+        "surfgram-cli",
+        "run",
+        "--webhook-secret",
+        "s3cr3t",
+        "--api-token=abc",
+        "--bot",
+        "mybot",
+    ]
+    assert redact_argv(argv) == [
+        "surfgram-cli",
+        "run",
+        "--webhook-secret",
+        "***",
+        "--api-token=***",
+        "--bot",
+        "mybot",
+    ]
+
+
+def test_repeats_are_counted_and_summarized_with_the_new_message(crash_dir):
+    reporter = ErrorReporter(window=0.05, summary_interval=None)
+    first = reporter.record(raise_from(ValueError), "first")
+    assert first.message == "first"
+    assert first.dump is not None and first.dump.parent == crash_dir
+
+    assert reporter.record(raise_from(ValueError), "second") is None
+    time.sleep(0.06)
+    report = reporter.record(raise_from(ValueError), "third")
+    assert report.message.startswith("third (1 more occurrence(s)")
+
+
+def test_due_summarizes_a_burst_that_stopped():
+    reporter = ErrorReporter(window=0.05, summary_interval=None)
+    for _ in range(3):
+        reporter.report(raise_from(ValueError), "burst")
+    assert reporter.due() == []
+    time.sleep(0.06)
+    [summary] = reporter.due()
+    assert summary.startswith("burst (2 more occurrence(s)")
+    # The next occurrence is reported again, without a stale count
+    assert reporter.report(raise_from(ValueError), "again") == "again"
+
+
+def test_expected_errors_get_no_crash_dump(crash_dir):
+    reporter = ErrorReporter()
+    report = reporter.record(raise_from(FileNotFoundError), "missing", dump=False)
+    assert report.message == "missing"
+    assert report.dump is None
+    assert list(crash_dir.iterdir()) == []
+
+
+def test_old_dumps_are_rotated(crash_dir):
+    reporter = ErrorReporter(max_dumps=2)
+    for kind in (ValueError, KeyError, TypeError, IndexError):
+        reporter.report(raise_from(kind), kind.__name__)
+    assert len(list(crash_dir.glob("crash-*.txt"))) <= 2
@@ -0,0 +1,64 @@
+import os
+import socket
+
+import pytest
+
+from surfgram_cli.daemon import client
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets"
+)
+
+
+@pytest.fixture
+def listening(tmp_path):
+    os.chmod(tmp_path, 0o700)
+    path = str(tmp_path / "daemon.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    yield path
+    server.close()
+
+
+def test_own_socket_is_used(listening):
+    sock = client.connect(listening)
+
+    assert sock is not None
+    if hasattr(socket, "SO_PEERCRED"):
+        assert client.peer_uid(sock) == os.getuid()
+    sock.close()
+
+
+def test_socket_of_another_user_is_not_used(listening, monkeypatch):
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+
+    assert not client.is_private(listening)
+    assert client.connect(listening) is None
+
+
+def test_socket_in_a_directory_others_can_write_is_not_used(listening):
+    os.chmod(os.path.dirname(listening), 0o777)
+
+    assert client.connect(listening) is None
+
+
+def test_socket_in_a_sticky_shared_directory_is_used(listening):
+    os.chmod(os.path.dirname(listening), 0o1777)
+
+    assert client.is_private(listening)
+
+
+def test_regular_file_is_not_a_daemon(tmp_path):
+    path = tmp_path / "daemon.sock"
+    path.write_text("")
+
+    assert client.connect(str(path)) is None
+
+
+def test_default_socket_lives_in_a_private_directory(monkeypatch):
+    monkeypatch.delenv(client.SOCKET_ENV_VAR, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+
+    assert os.path.dirname(client.socket_path()) == client.private_dir()
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from surfgram_cli.config import CacheConfig
+from surfgram_cli.manager.discovery import StaticConfigFinder, discover_config_classes
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(CacheConfig.DIR_ENV_VAR, str(tmp_path / "cache"))
+    monkeypatch.delenv(CacheConfig.DISABLE_ENV_VAR, raising=False)
+
+
+def write_package(root: Path, files) -> Path:
+    package = root / "mybot"
+    for name, source in files.items():
+        path = package / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    return package
+
+
+BOT = {
+    "__init__.py": (
+        "from surfgram import BaseConfig\n"
+        "from .configs.config import Config\n"
+        "from .configs.extra import *\n"
+    ),
+    "configs/__init__.py": "",
+    "configs/config.py": (
+        "from surfgram import configs\n"
+        "class Config(configs.BaseConfig):\n"
+        "    pass\n"
+        "class Hidden(configs.BaseConfig):\n"
+        "    pass\n"
+    ),
+    "configs/extra.py": (
+        "from .config import Config\n"
+        "class Staging(Config):\n"
+        "    pass\n"
+        "class _Private(Config):\n"
+        "    pass\n"
+        "class Helper:\n"
+        "    pass\n"
+    ),
+}
+
+
+def test_exported_configs_are_found_through_imports_and_subclasses(tmp_path):
+    package = write_package(tmp_path, BOT)
+    # BaseConfig itself, unexported and private classes are left out
+    assert StaticConfigFinder(package).find() == ["Config", "Staging"]
+
+
+def test_results_are_cached_until_a_file_changes(tmp_path):
+    package = write_package(tmp_path, BOT)
+    assert discover_config_classes(package) == ["Config", "Staging"]
+    entries = list((tmp_path / "cache" / CacheConfig.DISCOVERY_SUBDIR).iterdir())
+    assert len(entries) == 1
+
+    (package / "configs" / "extra.py").write_text("")
+    assert discover_config_classes(package) == ["Config"]
+
+
+def test_inconclusive_discovery_returns_none(tmp_path):
+    package = write_package(tmp_path, {"__init__.py": "class Config:\n    pass\n"})
+    assert discover_config_classes(package) is None
+
+    (package / "broken.py").write_text("class (:\n")
+    assert discover_config_classes(package) is None
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+# surfgram needs its native client (surfgram_internal) to be importable
+surfgram = pytest.importorskip("surfgram")
+
+from surfgram import Bot, configs  # noqa: E402
+from surfgram.core.listeners import BaseListener  # noqa: E402
+from surfgram.types import CallbackQuery  # noqa: E402
+
+from surfgram_cli.mock_api import MockBotAPI  # noqa: E402
+from surfgram_cli.utils.dispatch import (  # noqa: E402
+    dispatch_update,
+    find_dispatcher,
+    redirect_api_calls,
+)
+
+TOKEN = "123456:" + "A" * 35
+
+
+class RecordingListener(BaseListener):
+    def __init__(self) -> None:
+        super().__init__()
+        self.received = []
+
+    async def on_update(self, update, bot) -> None:
+        self.received.append((update, bot))
+
+
+class RecordingConfig(configs.BaseConfig):
+    __bot_token__ = TOKEN
+    __listener__ = RecordingListener
+
+
+class ListenerConfig(configs.BaseConfig):
+    __bot_token__ = TOKEN
+    __listener__ = BaseListener
+
+
+handled = []
+
+
+class DispatchTestQuery(CallbackQuery):
+    @property
+    def __names__(self):
+        return ["surfgram-cli-dispatch-test"]
+
+    @property
+    def __callback__(self):
+        async def callback(update, bot):
+            handled.append((update.callback_query.data, bot))
+
+        return callback
+
+
+def test_dispatch_goes_through_the_listener():
+    bot = Bot(RecordingConfig)
+    update = {"update_id": 1, "message": {"chat": {"id": 1}, "text": "hi"}}
+
+    asyncio.run(dispatch_update(find_dispatcher(bot), update))
+
+    [(received, received_bot)] = bot.listener.received
+    assert received.message.text == "hi"
+    assert received_bot is bot
+
+
+def test_dispatch_runs_registered_handlers():
+    bot = Bot(ListenerConfig)
+    update = {
+        "update_id": 2,
+        "callback_query": {
+            "id": "1",
+            "from": {"id": 1},
+            "data": "surfgram-cli-dispatch-test",
+        },
+    }
+
+    asyncio.run(dispatch_update(find_dispatcher(bot), update))
+
+    assert handled == [("surfgram-cli-dispatch-test", bot)]
+
+
+def test_bot_without_listener_is_rejected():
+    class NoListener:
+        def __getattr__(self, name):
+            # Like surfgram's Bot, any missing name is an API method
+            async def method(**kwargs):
+                return {}
+
+            return method
+
+    with pytest.raises(RuntimeError):
+        find_dispatcher(NoListener())
+
+
+def test_api_calls_go_to_the_redirected_server():
+    api = MockBotAPI(port=0, rate=0)
+    api.start()
+    try:
+        bot = Bot(RecordingConfig)
+        redirect_api_calls(bot, RecordingConfig, api.url)
+
+        response = asyncio.run(bot.send_message(chat_id=1, text="hi"))
+    finally:
+        api.stop()
+
+    assert response["ok"] is True
+    assert "sendMessage" in api.stats()["methods"]
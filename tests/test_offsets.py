@@ -0,0 +1,40 @@
+import json
+import time
+
+from surfgram_cli.config import RunnerConfig
+from surfgram_cli.utils.offsets import OffsetStore
+
+TOKEN = "123456:secret"
+
+
+def test_saved_offsets_are_loaded_back_without_the_token(tmp_path):
+    path = tmp_path / "state" / "offset.json"
+    OffsetStore(str(path), TOKEN).save(42, force=True)
+
+    state = json.loads(path.read_text())
+    assert state["bot_id"] == "123456"
+    assert "secret" not in path.read_text()
+    assert OffsetStore(str(path), TOKEN).load() == 42
+
+
+def test_writes_are_throttled_unless_forced(tmp_path):
+    store = OffsetStore(str(tmp_path / "offset.json"), TOKEN, interval=60)
+    assert store.save(1)
+    assert not store.save(2)
+    assert not store.save(None, force=True)
+    assert store.save(3, force=True)
+    assert not store.save(3, force=True)
+    assert store.saved == 3
+
+
+def test_offsets_of_other_bots_or_too_old_are_ignored(tmp_path):
+    path = tmp_path / "offset.json"
+    OffsetStore(str(path), "654321:other").save(7, force=True)
+    assert OffsetStore(str(path), TOKEN).load() is None
+
+    stale = time.time() - RunnerConfig.OFFSET_MAX_AGE - 1
+    path.write_text(json.dumps({"bot_id": "123456", "offset": 7, "time": stale}))
+    assert OffsetStore(str(path), TOKEN).load() is None
+
+    path.write_text("{not json")
+    assert OffsetStore(str(path), TOKEN).load() is None
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+# surfgram needs its native client (surfgram_internal) to be importable
+surfgram = pytest.importorskip("surfgram")
+
+from surfgram import Bot, configs  # noqa: E402
+from surfgram.core.listeners import BaseListener  # noqa: E402
+from surfgram.types import CallbackQuery  # noqa: E402
+
+from surfgram_cli.utils.dispatch import dispatch_update, find_dispatcher  # noqa: E402
+from surfgram_cli.utils.registries import HandlerScope, install_scopes  # noqa: E402
+
+TOKEN = "123456:" + "A" * 35
+
+
+class ListenerConfig(configs.BaseConfig):
+    __bot_token__ = TOKEN
+    __listener__ = BaseListener
+
+
+def define_handlers(seen, bot_name):
+    class Named(CallbackQuery):
+        @property
+        def __names__(self):
+            return ["scoped_named"]
+
+        @property
+        def __callback__(self):
+            return self.handle
+
+        async def handle(self, update, bot):
+            seen.append((bot_name, "named"))
+
+    class Fallback(CallbackQuery):
+        @property
+        def __names__(self):
+            return []
+
+        @property
+        def __callback__(self):
+            return self.handle
+
+        async def handle(self, update, bot):
+            seen.append((bot_name, "fallback"))
+
+
+def callback_update(data):
+    return {
+        "update_id": 1,
+        "callback_query": {"id": "1", "from": {"id": 7}, "data": data},
+    }
+
+
+def test_bots_only_see_their_own_handlers():
+    install_scopes()
+    seen = []
+    scopes = {name: HandlerScope(name) for name in ("first", "second")}
+    for name, scope in scopes.items():
+        with scope.active():
+            define_handlers(seen, name)
+        assert scope.handler_count() == 2
+
+    async def serve(scope, data):
+        scope.enter()
+        dispatcher = find_dispatcher(Bot(config=ListenerConfig))
+        await asyncio.sleep(0)
+        await dispatch_update(dispatcher, callback_update(data))
+
+    async def main():
+        await asyncio.gather(
+            *(
+                serve(scope, data)
+                for scope in scopes.values()
+                for data in ("scoped_named", "other")
+            )
+        )
+
+    asyncio.run(main())
+    assert sorted(seen) == [
+        ("first", "fallback"),
+        ("first", "named"),
+        ("second", "fallback"),
+        ("second", "named"),
+    ]
+
+
+def test_handlers_outside_a_scope_stay_process_wide():
+    install_scopes()
+    from surfgram.types.callback_query.factory import CallbackQueriesFactory
+
+    scope = HandlerScope("scoped")
+    with scope.active():
+        assert CallbackQueriesFactory.CALLBACKQUERIES_REGISTRY.get("x") is None
+        CallbackQueriesFactory.CALLBACKQUERIES_REGISTRY["x"] = int
+    assert CallbackQueriesFactory.CALLBACKQUERIES_REGISTRY.get("x") is None
+    with scope.active():
+        assert CallbackQueriesFactory.CALLBACKQUERIES_REGISTRY["x"] is int
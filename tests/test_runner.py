@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+# surfgram needs its native client (surfgram_internal) to be importable
+pytest.importorskip("surfgram")
+
+from surfgram_cli.runner import UpdateRunner  # noqa: E402
+
+
+class SlowFirstListener:
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.handled = []
+
+    async def on_update(self, update, bot) -> None:
+        if update.update_id == 1:
+            await self.release.wait()
+        self.handled.append(update.update_id)
+
+
+class FakeBot:
+    def __init__(self, listener) -> None:
+        self.listener = listener
+
+
+class BacklogClient:
+    """Answers like the Bot API: every update from `offset` on, at once."""
+
+    def __init__(self, count: int) -> None:
+        self.updates = [{"update_id": i, "message": {}} for i in range(1, count + 1)]
+        self.offsets = []
+
+    async def get_updates(self, offset=None, timeout=0, limit=100):
+        self.offsets.append(offset)
+        await asyncio.sleep(0.01)
+        return [u for u in self.updates if u["update_id"] >= (offset or 0)][:limit]
+
+
+def serve(runner, listener, until):
+    async def main():
+        serving = asyncio.ensure_future(runner.serve())
+        while not until():
+            await asyncio.sleep(0.01)
+        listener.release.set()
+        while len(listener.handled) < 5:
+            await asyncio.sleep(0.01)
+        runner.request_stop()
+        await serving
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_unfinished_updates_are_not_confirmed():
+    listener = SlowFirstListener()
+    client = BacklogClient(5)
+    runner = UpdateRunner(FakeBot(listener), client, poll_timeout=0)
+
+    serve(runner, listener, until=lambda: len(listener.handled) == 4)
+
+    assert sorted(listener.handled) == [1, 2, 3, 4, 5]
+    first_done = client.offsets.index(6)
+    # While update 1 ran, every poll started at it; it was still handled once
+    assert set(client.offsets[1:first_done]) == {1}
+    assert runner.handled_offset == 6
+
+
+def test_polling_waits_once_max_pending_updates_are_received():
+    listener = SlowFirstListener()
+    client = BacklogClient(5)
+    runner = UpdateRunner(FakeBot(listener), client, poll_timeout=0, max_pending=2)
+
+    seen = []
+
+    def until():
+        seen.append(len(listener.handled))
+        return len(client.offsets) > 3
+
+    serve(runner, listener, until)
+
+    # Update 1 and one more were received; nothing else until 1 finished
+    assert max(seen) <= 1
+    assert sorted(listener.handled) == [1, 2, 3, 4, 5]
@@ -0,0 +1,17 @@
+from surfgram_cli.utils.startup import ImportRecord, parse_importtime
+
+
+def test_parse_importtime_reads_nesting_and_skips_other_lines():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       160 |        160 |   _io",
+        "import time:       388 |        966 | _frozen_importlib_external",
+        "import time:        12 |         12 |       encodings.aliases",
+        "Traceback (most recent call last):",
+        "",
+    ]
+    assert parse_importtime(lines) == [
+        ImportRecord("_io", 160, 160, 1),
+        ImportRecord("_frozen_importlib_external", 388, 966, 0),
+        ImportRecord("encodings.aliases", 12, 12, 3),
+    ]
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from surfgram_cli.utils.watch_filter import ContentIndex, GitignoreRules, PathFilter
+
+
+def touch(path: Path, text: str = "") -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_gitignore_rules(tmp_path):
+    rules = GitignoreRules(
+        tmp_path,
+        [
+            "# generated",
+            "*.log",
+            "!keep.log",
+            "build/",
+            "/top.py",
+            "docs/**/draft.py",
+        ],
+    )
+    assert rules.ignored(tmp_path / "debug.log")
+    assert rules.ignored(tmp_path / "sub" / "debug.log")
+    assert not rules.ignored(tmp_path / "keep.log")
+    # Directory-only patterns ignore what's below, not a file of that name
+    assert rules.ignored(tmp_path / "build" / "out.py")
+    assert not rules.ignored(tmp_path / "build")
+    # Anchored patterns only match relative to the .gitignore
+    assert rules.ignored(tmp_path / "top.py")
+    assert not rules.ignored(tmp_path / "sub" / "top.py")
+    assert rules.ignored(tmp_path / "docs" / "a" / "b" / "draft.py")
+    assert rules.ignored(tmp_path / "docs" / "draft.py")
+    assert not rules.ignored(tmp_path.parent / "debug.log")
+
+
+def test_path_filter_includes_excludes_and_gitignores(tmp_path):
+    (tmp_path / ".git").mkdir()
+    touch(tmp_path / ".gitignore", "generated/\n")
+    bot = tmp_path / "bot"
+    handler = touch(bot / "handlers" / "start.py")
+    env = touch(bot / ".env")
+    cached = touch(bot / "__pycache__" / "start.cpython-311.pyc")
+    compiled = touch(bot / "__pycache__" / "start.py")
+    generated = touch(bot / "generated" / "schema.py")
+    notes = touch(bot / "notes.txt")
+
+    path_filter = PathFilter(str(bot), ["*.py", ".env"], ["__pycache__", ".*.swp"])
+
+    assert path_filter.accepts(handler)
+    assert path_filter.accepts(env)
+    assert not path_filter.accepts(cached)
+    assert not path_filter.accepts(compiled)
+    assert not path_filter.accepts(generated)
+    assert not path_filter.accepts(notes)
+    assert not path_filter.accepts(str(tmp_path / "outside.py"))
+    assert sorted(path_filter.walk()) == sorted([handler, env])
+
+    assert PathFilter(str(bot), ["*.py"], [], use_gitignore=False).accepts(generated)
+
+
+def test_content_index_ignores_saves_without_changes(tmp_path):
+    path = touch(tmp_path / "bot.py", "a = 1\n")
+    index = ContentIndex()
+    index.index([path])
+
+    assert not index.changed(path)
+    touch(tmp_path / "bot.py", "a = 2\n")
+    assert index.changed(path)
+    assert not index.changed(path)
+    # New and deleted files count as changes
+    new = touch(tmp_path / "new.py")
+    assert index.changed(new)
+    Path(new).unlink()
+    assert index.changed(new)
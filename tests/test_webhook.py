@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import pytest
+
+import surfgram_cli.webhook as webhook
+from surfgram_cli.webhook import WebhookServer
+
+
+class BlockingHandlers:
+    """Stands in for the bot's dispatcher; handlers wait for `release`."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.handled = []
+
+    async def dispatch(self, update):
+        await self.release.wait()
+        self.handled.append(update["update_id"])
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    handlers = BlockingHandlers()
+    monkeypatch.setattr(webhook, "find_dispatcher", lambda bot: handlers.dispatch)
+    return handlers
+
+
+def request(update_id, secret=None, body=None):
+    if body is None:
+        body = json.dumps({"update_id": update_id}).encode()
+    headers = [
+        "POST /webhook HTTP/1.1",
+        "Host: localhost",
+        f"Content-Length: {len(body)}",
+    ]
+    if secret is not None:
+        headers.append(f"X-Telegram-Bot-Api-Secret-Token: {secret}")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if line)
+    return int(lines[0].split()[1]), headers
+
+
+def serve(server, client):
+    async def main():
+        serving = asyncio.ensure_future(server.serve())
+        while server._stopping is None or not server.port:
+            await asyncio.sleep(0.01)
+        try:
+            return await client(server.port)
+        finally:
+            server.request_stop()
+            await serving
+
+    return asyncio.run(asyncio.wait_for(main(), 10))
+
+
+async def post(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    try:
+        return await read_response(reader)
+    finally:
+        writer.close()
+
+
+def test_requests_without_the_secret_are_rejected(handlers):
+    server = WebhookServer(object(), port=0, secret_token="s3cr3t", drain_timeout=0)
+
+    async def client(port):
+        return [
+            (await post(port, request(1)))[0],
+            (await post(port, request(2, secret="wrong")))[0],
+            (await post(port, request(3, secret="s3cr3t")))[0],
+        ]
+
+    assert serve(server, client) == [401, 401, 200]
+    assert server.received == 1
+
+
+def test_a_full_queue_answers_503_with_retry_after(handlers):
+    server = WebhookServer(
+        object(), port=0, max_concurrent=1, max_queue=1, drain_timeout=1
+    )
+
+    async def client(port):
+        responses = [await post(port, request(i)) for i in (1, 2)]
+        # Update 1 is running and update 2 fills the queue
+        while server.in_flight == 0:
+            await asyncio.sleep(0.01)
+        responses.append(await post(port, request(3)))
+        handlers.release.set()
+        return responses
+
+    [first, second, (status, headers)] = serve(server, client)
+    assert first[0] == second[0] == 200
+    assert status == 503
+    assert headers["Retry-After"] == str(webhook.WebhookConfig.RETRY_AFTER)
+    assert handlers.handled == [1, 2]
+    assert server.rejected == 1
+
+
+def test_requests_being_read_on_shutdown_get_503(handlers):
+    server = WebhookServer(object(), port=0, drain_timeout=0)
+
+    async def client(port):
+        idle_reader, _ = await asyncio.open_connection("127.0.0.1", port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        data = request(1)
+        writer.write(data[:-5])
+        await writer.drain()
+        while len(server._idle) != 1:
+            await asyncio.sleep(0.01)
+
+        server.request_stop()
+        await asyncio.sleep(0.05)
+        writer.write(data[-5:])
+        response = await read_response(reader)
+        writer.close()
+        return response, await idle_reader.read()
+
+    (status, headers), idle = serve(server, client)
+    assert status == 503
+    assert headers["Connection"] == "close"
+    assert "Retry-After" in headers
+    # The idle keep-alive connection was closed without a response
+    assert idle == b""
+    assert server.received == 0